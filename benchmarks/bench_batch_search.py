@@ -0,0 +1,62 @@
+"""
+Batch taam sequence search on all five books: every taam doubled (what the
+double ta'amim finder looks for, one taam at a time) plus a few teaching
+patterns, searched one query at a time by scanning every verse, one query at
+a time with the n-gram index, and all at once with
+`TaamSearchEngine.find_verses_with_taam_sequences`.
+
+Run from the repository root with `python -m benchmarks.bench_batch_search`.
+"""
+
+import time
+
+from parsing import TaamSearchEngine, load_books
+from parsing.symbols import TAAMIM_NAMES_TO_CODES
+
+BOOK_NAMES = ["Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy"]
+PATTERNS = [[name, name] for name in TAAMIM_NAMES_TO_CODES] + [
+    ["maarikh", "tarha"],
+    ["maarikh", "tarha", "atnah"],
+    ["shofar_holekh", "zaqef_qaton"],
+    ["darga", "tevir"],
+    ["azla", "gerish"],
+    ["zarqa", "segolta"],
+    ["qadma", "pashta", "shofar_holekh", "zaqef_qaton"],
+]
+
+
+def main():
+    books = load_books(BOOK_NAMES)
+
+    start = time.perf_counter()
+    for pattern in PATTERNS:
+        for book in books:
+            for parasha in book.parshiot:
+                parasha.find_verses_with_taam_sequence(pattern)
+    scanned = time.perf_counter() - start
+
+    # build the indexes outside of the timings
+    engine = TaamSearchEngine(books)
+    for book in books:
+        book.taam_ngram_index
+    engine.stream.letter_codes
+    engine.stream.code_table
+
+    start = time.perf_counter()
+    for pattern in PATTERNS:
+        for book in books:
+            book.find_verses_with_taam_sequence(pattern)
+    indexed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine.find_verses_with_taam_sequences(PATTERNS)
+    batched = time.perf_counter() - start
+
+    print(f"{len(PATTERNS)} patterns over {len(BOOK_NAMES)} books")
+    print(f"{'one at a time, scanning':<32} {scanned * 1000:>8.0f} ms")
+    print(f"{'one at a time, n-gram index':<32} {indexed * 1000:>8.0f} ms")
+    print(f"{'batch':<32} {batched * 1000:>8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Loading the five books: parsing the text files one after another in this
+process, and with `load_books` on more and more workers, with the books sent
+back as columnar views (the default) and rebuilt into Letter/Word/Verse objects
+in this process. On a single CPU:
+
+                    columnar     objects   speedup
+    serial parse         2076 ms     2076 ms      1.0x
+    2 workers            1634 ms     3458 ms      1.3x
+
+Run from the repository root with `python -m benchmarks.bench_load_books`.
+"""
+
+import os
+import time
+
+from parsing import Book, load_books
+from parsing.loader import book_file_path
+
+BOOK_NAMES = ["Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy"]
+
+
+def timed(run):
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def main():
+    serial = timed(
+        lambda: [Book.from_text_file(book_file_path(name)) for name in BOOK_NAMES]
+    )
+    rows = [("serial parse", serial, serial)]
+    max_workers = max(2, min(os.cpu_count() or 1, len(BOOK_NAMES)))
+    for workers in range(2, max_workers + 1):
+        rows.append(
+            (
+                f"{workers} workers",
+                timed(lambda: load_books(BOOK_NAMES, workers)),
+                timed(lambda: load_books(BOOK_NAMES, workers, columnar=False)),
+            )
+        )
+
+    print(f"{'':<16}{'columnar':>12}{'objects':>12}{'speedup':>10}")
+    for label, columnar, objects in rows:
+        print(
+            f"{label:<16}{columnar * 1000:>9.0f} ms{objects * 1000:>9.0f} ms"
+            f"{serial / columnar:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Taam n-gram counting on all five books for every n from 2 to 8 (what the
+sequence distribution widget asks for): the way `count_n_taam_sequences` used
+to count them (a tuple per window, with the Counters of the aliyot and parshiot
+added up), and with `TaamNGramCounts` (all lengths in one pass, then every n
+read off the counts).
+
+Run from the repository root with `python -m benchmarks.bench_ngram_counts`.
+"""
+
+import time
+from collections import Counter
+
+from parsing import load_books
+from parsing.taam_ngram_counts import TaamNGramCounts
+
+BOOK_NAMES = ["Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy"]
+LENGTHS = range(2, 9)
+
+
+def count_by_merging(book, n):
+    totals = Counter()
+    for parasha in book.parshiot:
+        parasha_totals = Counter()
+        for aliyah in parasha.aliyot:
+            counts = Counter()
+            for verse in aliyah.verses:
+                taamim = verse.taamim
+                for i in range(len(taamim) - n + 1):
+                    counts[tuple(taam.name for taam in taamim[i : i + n])] += 1
+            parasha_totals += counts
+        totals += parasha_totals
+    return totals
+
+
+def main():
+    books = load_books(BOOK_NAMES)
+    # encode the verses outside of the timings
+    for book in books:
+        book.taam_codes
+
+    start = time.perf_counter()
+    for book in books:
+        for n in LENGTHS:
+            count_by_merging(book, n)
+    merged = time.perf_counter() - start
+
+    start = time.perf_counter()
+    all_counts = [TaamNGramCounts.from_verses(book.verses) for book in books]
+    for counts in all_counts:
+        for n in LENGTHS:
+            counts.counts(n)
+    one_pass = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for counts in all_counts:
+        for n in LENGTHS:
+            counts.counts(n)
+    counted = time.perf_counter() - start
+
+    print(f"n = {LENGTHS.start}..{LENGTHS.stop - 1} over {len(BOOK_NAMES)} books")
+    print(f"{'tuples and Counter additions':<32} {merged * 1000:>8.0f} ms")
+    print(f"{'one pass (with counting)':<32} {one_pass * 1000:>8.0f} ms")
+    print(f"{'one pass (already counted)':<32} {counted * 1000:>8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
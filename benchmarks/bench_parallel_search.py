@@ -0,0 +1,100 @@
+"""
+Search and counting on the five books (laid out several times over, to stand in
+for a larger corpus) in one process, and with a `ParallelTaamSearch` with more
+and more workers: a batch of sequences, a few taam patterns, and all the
+n-grams from 2 to 8. The time to start the workers and copy the corpus into
+shared memory is reported separately.
+
+Run from the repository root with `python -m benchmarks.bench_parallel_search`.
+"""
+
+import os
+import time
+
+from parsing import TaamSearchEngine, load_books
+from parsing.parallel_search import ParallelTaamSearch
+from parsing.taam_automaton import find_taam_sequences
+from parsing.taam_ngram_counts import TaamNGramCounts
+from parsing.taam_pattern import compile_taam_pattern
+
+BOOK_NAMES = ["Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy"]
+COPIES = 4
+SEQUENCES = [
+    ["maarikh", "tarha"],
+    ["qadma", "azla"],
+    ["pashta", "zaqef_qaton"],
+    ["darga", "tevir"],
+    ["maarikh", "tarha", "atnah"],
+    ["zarqa", "segolta"],
+]
+PATTERNS = ["{tevir|tarha} darga{1,2}", "^ maarikh tarha", "pashta . zaqef_qaton $"]
+LENGTHS = range(2, 9)
+
+
+def timed(run):
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+def run_serial(books):
+    engine = TaamSearchEngine(books)
+    stream = engine.stream
+    stream.letter_codes
+    return {
+        "sequences": timed(lambda: find_taam_sequences(stream, SEQUENCES)),
+        "patterns": timed(
+            lambda: [compile_taam_pattern(p).find(stream) for p in PATTERNS]
+        ),
+        "n-grams": timed(
+            lambda: TaamNGramCounts.from_verses(
+                (
+                    verse
+                    for book in books
+                    for parasha in book.parshiot
+                    for aliyah in parasha.aliyot
+                    for verse in aliyah.verses
+                ),
+                max_n=LENGTHS.stop - 1,
+            )
+        ),
+    }
+
+
+def run_parallel(search):
+    # let every worker attach and warm up before the timings
+    search.find_all_matches(SEQUENCES)
+    for pattern in PATTERNS:
+        search.find_pattern(pattern)
+    return {
+        "sequences": timed(lambda: search.find_all_matches(SEQUENCES)),
+        "patterns": timed(lambda: [search.find_pattern(p) for p in PATTERNS]),
+        "n-grams": timed(lambda: search.ngrams(LENGTHS)),
+    }
+
+
+def main():
+    books = load_books(BOOK_NAMES) * COPIES
+    for book in books:
+        book.taam_codes
+
+    rows = [("1 process", run_serial(books))]
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        with ParallelTaamSearch(books, workers) as search:
+            setup = time.perf_counter() - start
+            rows.append((f"{workers} workers (+{setup:.2f} s)", run_parallel(search)))
+        workers *= 2
+
+    print(f"{len(BOOK_NAMES)} books x {COPIES}")
+    print(f"{'':<24}" + "".join(f"{name:>12}" for name in rows[0][1]))
+    for label, timings in rows:
+        print(
+            f"{label:<24}"
+            + "".join(f"{seconds * 1000:>9.0f} ms" for seconds in timings.values())
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Whole-book taam sequence search on all five books: scanning every verse
+with and without the memoized `Verse.taam_words`/`Verse.words` views, and
+answering from the book's taam n-gram index (`Book.find_verses_with_taam_sequence`,
+once the index is built).
+
+Run from the repository root with `python -m benchmarks.bench_sequence_search`.
+"""
+
+import time
+from typing import Callable
+
+from parsing import Book, load_books
+
+BOOK_NAMES = ["Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy"]
+SEQUENCES = [
+    ["maarikh", "tarha"],
+    ["azla", "gerish"],
+    ["zarqa", "segolta"],
+    ["darga", "tevir"],
+    ["shalshelet"],
+]
+REPEATS = 3
+
+
+def forget_word_views(book: Book):
+    """
+    Drop the memoized word views of every verse, as if they had never been
+    computed (which is how every query behaved before they were memoized).
+    """
+    for verse in book.verses:
+        verse._taam_words = None
+        verse._words_without_maqafs = None
+
+
+def best_time(run: Callable[[], None]) -> float:
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    books = load_books(BOOK_NAMES)
+
+    def scan(book: Book, memoized: bool):
+        for sequence in SEQUENCES:
+            if not memoized:
+                forget_word_views(book)
+            for parasha in book.parshiot:
+                parasha.find_verses_with_taam_sequence(sequence)
+
+    def search(book: Book):
+        for sequence in SEQUENCES:
+            book.find_verses_with_taam_sequence(sequence)
+
+    print(f"{'book':<12} {'recomputed':>11} {'memoized':>10} {'indexed':>10}")
+    for book in books:
+        recomputed = best_time(lambda: scan(book, memoized=False))
+        memoized = best_time(lambda: scan(book, memoized=True))
+        # build the index outside of the timings
+        book.taam_ngram_index
+        indexed = best_time(lambda: search(book))
+        print(
+            f"{book.name:<12} {recomputed * 1000:>8.0f} ms {memoized * 1000:>7.0f} ms "
+            f"{indexed * 1000:>7.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Parse-throughput benchmark of the single-pass word tokenizer against the
+previous per-letter rescanning implementation, on all five books.
+
+Run from the repository root with `python -m benchmarks.bench_tokenizer`.
+"""
+
+import time
+from typing import Callable, List
+
+from parsing.letter import Letter
+from parsing.loader import book_file_path
+from parsing.symbols import LETTERS, MAQAF
+from parsing.tokenizer import tokenize_word
+from utils.text_parsing_utils import TextParsingUtils
+
+BOOK_NAMES = ["Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy"]
+REPEATS = 5
+
+
+def rescanning_tokenize_word(word: str) -> List[Letter]:
+    """
+    The previous implementation of `Word.from_string`: for every letter, rescan
+    the rest of the word for its marks and parse them with `Letter.from_string`.
+    """
+    letters = []
+    for i, letter in enumerate(word):
+        if letter in LETTERS:
+            curr_letter = [letter]
+            for j in range(i + 1, len(word)):
+                if word[j] in LETTERS:
+                    break
+                curr_letter.append(word[j])
+            letters.append(Letter.from_string("".join(curr_letter)))
+    return letters
+
+
+def book_words(book_name: str) -> List[str]:
+    """
+    Split the verses of a book into words the way `Verse.from_string` does.
+    """
+    with open(book_file_path(book_name), "r", encoding="utf-8") as book:
+        lines = book.read().split("\n")
+    return [
+        subword
+        for line in lines
+        if TextParsingUtils.is_line_start_of_verse(line)
+        for word in line.split()
+        for subword in word.split(MAQAF)
+    ]
+
+
+def best_time(tokenize: Callable[[str], List[Letter]], words: List[str]) -> float:
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for word in words:
+            tokenize(word)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    print(f"{'book':<12} {'words':>7} {'rescan w/s':>12} {'1-pass w/s':>12} {'speedup':>8}")
+    for book_name in BOOK_NAMES:
+        words = book_words(book_name)
+        for word in words:
+            assert repr(tokenize_word(word)) == repr(rescanning_tokenize_word(word))
+
+        old = best_time(rescanning_tokenize_word, words)
+        new = best_time(tokenize_word, words)
+        print(
+            f"{book_name:<12} {len(words):>7} {len(words) / old:>12,.0f} "
+            f"{len(words) / new:>12,.0f} {old / new:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
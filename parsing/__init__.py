@@ -1,10 +1,14 @@
 from parsing.aliyah import Aliyah
 from parsing.book import Book
 from parsing.chapter import Chapter
+from parsing.corpus import Corpus
 from parsing.letter import Letter
+from parsing.loader import load_books
 from parsing.metadata import *
 from parsing.niqud import Niqud
 from parsing.parasha import Parasha
+from parsing.stream import iter_verses
 from parsing.taam import Taam
+from parsing.taam_search import TaamSearchEngine
 from parsing.verse import Verse
 from parsing.word import Word
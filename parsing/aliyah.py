@@ -1,6 +1,11 @@
 from typing import Counter, Iterator, List, Tuple
 
+import numpy as np
+
+from parsing.taam_codes import concatenate_taam_codes, taam_frequencies
+from parsing.taam_ngram_counts import TaamNGramCounts
 from parsing.verse import VerseTaamSequenceResult, Verse
+from parsing.verse_index import VerseRange
 
 
 class AliyahTaamSequenceResult:
@@ -31,9 +36,13 @@ class Aliyah:
     one chapter.
     """
 
-    def __init__(self, idx: int, verses: List[Verse]):
+    def __init__(self, idx: int, verses: VerseRange):
         self._idx = idx
         self._verses = verses
+        # computed on first use
+        self._taam_codes = None
+        self._taam_codes_without_meshartim = None
+        self._taam_ngram_counts = {}
 
     @property
     def idx(self) -> int:
@@ -45,7 +54,7 @@ class Aliyah:
         return self._idx
 
     @property
-    def verses(self) -> List[Verse]:
+    def verses(self) -> VerseRange:
         """
         Gets the verses in the aliyah.
 
@@ -53,6 +62,64 @@ class Aliyah:
         """
         return self._verses
 
+    @property
+    def start(self) -> int:
+        """
+        Gets the ordinal (within the book) of the first verse in the aliyah.
+
+        :return: The ordinal of the first verse.
+        """
+        return self._verses.start
+
+    @property
+    def stop(self) -> int:
+        """
+        Gets the ordinal (within the book) after the last verse in the aliyah.
+
+        :return: The ordinal after the last verse.
+        """
+        return self._verses.stop
+
+    @property
+    def taam_codes(self) -> np.ndarray:
+        """
+        Get the integer codes of the Taamim in the Aliyah.
+
+        :return: A read-only array with the code of each Taam in the Aliyah.
+        """
+        if self._taam_codes is None:
+            self._taam_codes = concatenate_taam_codes(
+                verse.taam_codes for verse in self.verses
+            )
+        return self._taam_codes
+
+    @property
+    def taam_codes_without_meshartim(self) -> np.ndarray:
+        """
+        Get the integer codes of the Taamim in the Aliyah without the Meshartim.
+
+        :return: A read-only array with the code of each Taam in the Aliyah
+                 that is not a Mesharet.
+        """
+        if self._taam_codes_without_meshartim is None:
+            self._taam_codes_without_meshartim = concatenate_taam_codes(
+                verse.taam_codes_without_meshartim for verse in self.verses
+            )
+        return self._taam_codes_without_meshartim
+
+    def taam_frequencies(self, include_meshartim: bool = True) -> np.ndarray:
+        """
+        Count the occurrences of each Taam in the Aliyah.
+
+        :param include_meshartim: Whether to count the Meshartim, defaults to True
+        :return: An array with the number of occurrences of each taam code at its
+                 index (see `parsing.taam_codes.frequencies_by_name`).
+        """
+        codes = (
+            self.taam_codes if include_meshartim else self.taam_codes_without_meshartim
+        )
+        return taam_frequencies(codes)
+
     def find_verses_with_taam_sequence(
         self, taam_sequence: List[str], include_meshartim: bool = True
     ) -> AliyahTaamSequenceResult:
@@ -70,6 +137,50 @@ class Aliyah:
                 results.append((verse, result))
         return results
 
+    def count_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> int:
+        """
+        Count the matches of a sequence of Taamim in the verses of the Aliyah.
+
+        :param taam_sequence: The sequence of Taamim.
+        :param include_meshartim: Whether to include Meshartim in the search.
+        :return: The number of matches.
+        """
+        return sum(
+            verse.count_taam_sequence(taam_sequence, include_meshartim)
+            for verse in self.verses
+        )
+
+    def has_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> bool:
+        """
+        Check whether a verse of the Aliyah contains a sequence of Taamim,
+        stopping at the first match.
+
+        :param taam_sequence: The sequence of Taamim.
+        :param include_meshartim: Whether to include Meshartim in the search.
+        :return: Whether the sequence is found.
+        """
+        return any(
+            verse.has_taam_sequence(taam_sequence, include_meshartim)
+            for verse in self.verses
+        )
+
+    def taam_ngram_counts(self, include_meshartim: bool = True) -> TaamNGramCounts:
+        """
+        Get the counts of the taam n-grams in the Aliyah (counted on first use).
+
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :return: The n-gram counts.
+        """
+        if include_meshartim not in self._taam_ngram_counts:
+            self._taam_ngram_counts[include_meshartim] = TaamNGramCounts.from_verses(
+                self.verses, include_meshartim
+            )
+        return self._taam_ngram_counts[include_meshartim]
+
     def count_n_taam_sequences(self, n: int, include_meshartim: bool = True) -> Counter:
         """
         Count the number of n-Taam sequences in the Aliyah.
@@ -78,19 +189,7 @@ class Aliyah:
         :param include_meshartim: Whether to include Meshartim in the search.
         :return: A Counter mapping taam sequences to their counts.
         """
-        taam_sequence_counts = Counter()
-        for verse in self.verses:
-            taamim = (
-                verse.taamim if include_meshartim else verse.taamim_without_meshartim
-            )
-            for i in range(len(taamim) - n + 1):
-                taam_sequence = []
-                for j in range(n):
-                    if i + j < len(taamim):
-                        taam_sequence.append(taamim[i + j].name)
-                if len(taam_sequence) == n:
-                    taam_sequence_counts[tuple(taam_sequence)] += 1
-        return taam_sequence_counts
+        return self.taam_ngram_counts(include_meshartim).counts(n)
 
     def __len__(self) -> int:
         return len(self._verses)
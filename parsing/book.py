@@ -1,14 +1,33 @@
+import hashlib
+from bisect import bisect_left
 from collections import Counter
-from typing import Dict, List
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, TypeVar
 
-import tqdm
+import numpy as np
 
 from parsing.chapter import Chapter
+from parsing.columnar import ColumnarBook
+from parsing.compiled import CompiledBook
+from parsing.lazy import LazyVerse, VerseCache
 from parsing.metadata import BookMetadata
 from parsing.parasha import Parasha, ParashaTaamSequenceResult
-from parsing.verse import Verse
+from parsing.progress import NULL_REPORTER, ParseReporter
+from parsing.query_cache import QUERY_CACHE, QueryCache, normalize_sequence
+from parsing.taam_automaton import find_taam_sequences
+from parsing.taam_codes import (concatenate_taam_codes, sequence_codes,
+                                 taam_frequencies)
+from parsing.taam_ngram_counts import TaamNGramCounts
+from parsing.taam_ngrams import TaamNGramIndex
+from parsing.taam_pages import (DEFAULT_PAGE_SIZE, TaamSearchPage, TaamSequenceHit,
+                                 iter_hits, paginate)
+from parsing.taam_pattern import compile_taam_pattern
+from parsing.taam_stream import TaamStream
+from parsing.verse import Verse, VerseTaamSequenceResult
+from parsing.verse_index import VerseIndex
 from utils.text_parsing_utils import TextParsingUtils
 
+T = TypeVar("T")
+
 
 class BookTaamSequenceResult:
     """
@@ -36,26 +55,49 @@ class Book:
 
     @staticmethod
     def _extract_parshiot(
-        chapters: List[Chapter], metadata: BookMetadata
+        verse_index: VerseIndex, metadata: BookMetadata
     ) -> List[Parasha]:
         """
-        Extract the Parshiot from the sequence of chapters and the
+        Extract the Parshiot from the index of the book's verses and the
         book's metadata.
 
-        :param chapters: The sequence of chapters.
+        :param verse_index: The index of the verses in the book.
         :param metadata: The metadata of the book (with information about where
                          aliyot and parshiot start and end).
         :return: A list of parshiot objects that make up this book.
         """
         return [
-            Parasha.from_chapters(metadata, chapters) for metadata in metadata.parshiot
+            Parasha.from_verse_index(metadata, verse_index)
+            for metadata in metadata.parshiot
         ]
 
-    def __init__(self, name: str, chapters: List[Chapter], metadata: BookMetadata):
+    def __init__(
+        self,
+        name: str,
+        chapters: List[Chapter],
+        metadata: Optional[BookMetadata] = None,
+        parshiot: Optional[List[Parasha]] = None,
+    ):
+        assert (metadata is None) != (
+            parshiot is None
+        ), "Exactly one of metadata and parshiot must be given"
         self.name = name
         self._chapters = chapters
-        self._parshiot = Book._extract_parshiot(chapters, metadata)
-        self._verses = [verse for chapter in chapters for verse in chapter.verses]
+        self._verse_index = VerseIndex(chapters)
+        if parshiot is None:
+            parshiot = Book._extract_parshiot(self._verse_index, metadata)
+        self._parshiot = parshiot
+        self._verses = self._verse_index.verses
+        # the cache of query results, or None to not cache them
+        self.query_cache: Optional[QueryCache] = QUERY_CACHE
+        # computed on first use
+        self._version = None
+        self._taam_codes = None
+        self._taam_codes_without_meshartim = None
+        self._taam_ngram_counts = {}
+        self._taam_stream = None
+        self._taam_ngram_index = None
+        self._in_aliyot = None
 
     def __repr__(self) -> str:
         parts = []
@@ -66,41 +108,122 @@ class Book:
         return "".join(parts)
 
     @classmethod
-    def chapters_from_string(cls, s: str) -> "Book":
+    def chapters_from_string(
+        cls,
+        s: str,
+        lazy: bool = False,
+        verse_cache: Optional[VerseCache] = None,
+        reporter: ParseReporter = NULL_REPORTER,
+    ) -> "Book":
         """
         Parse a book from a string.
 
         :param s: The string representation of the Book.
+        :param lazy: Whether to only index the verses and parse each one the first
+                     time it is used, defaults to False
+        :param verse_cache: The cache holding lazily parsed verses, defaults to a
+                            new VerseCache for this book
+        :param reporter: Callbacks for progress reporting and profiling, defaults
+                         to doing nothing
         :return: A Book object.
         """
-        chapters = []
+        if lazy and verse_cache is None:
+            verse_cache = VerseCache()
+
+        # first classify the lines, then tokenize the verses
+        chapters, verse_lines = [], []
         book_name = None
-        for line in tqdm.tqdm(s.split("\n")):
-            # LRE symbol indicates the beginning of a verse
-            if TextParsingUtils.is_line_start_of_verse(line):
-                verse_idx = TextParsingUtils.extract_verse_idx(line)
-                verse = Verse.from_string(verse_idx, line)
-                chapters[-1].add_verse(verse)
-            elif TextParsingUtils.is_line_start_of_chapter(line):
-                chapter_idx = TextParsingUtils.extract_chapter_idx(line)
-                chapters.append(Chapter(chapter_idx, []))
-            elif TextParsingUtils.is_line_start_of_book(line):
-                book_name = TextParsingUtils.extract_book_name(line)
-
-        metadata = BookMetadata(book_name)
-        return Book(book_name, chapters, metadata)
+        with reporter.stage("classify_lines"):
+            for line in s.split("\n"):
+                # LRE symbol indicates the beginning of a verse
+                if TextParsingUtils.is_line_start_of_verse(line):
+                    verse_idx = TextParsingUtils.extract_verse_idx(line)
+                    verse_lines.append((chapters[-1], verse_idx, line))
+                elif TextParsingUtils.is_line_start_of_chapter(line):
+                    chapter_idx = TextParsingUtils.extract_chapter_idx(line)
+                    chapters.append(Chapter(chapter_idx, []))
+                elif TextParsingUtils.is_line_start_of_book(line):
+                    book_name = TextParsingUtils.extract_book_name(line)
+
+        reporter.start(len(verse_lines))
+        with reporter.stage("tokenize_verses"):
+            for chapter, verse_idx, line in verse_lines:
+                if lazy:
+                    verse = LazyVerse(verse_idx, line, verse_cache)
+                else:
+                    verse = Verse.from_string(verse_idx, line)
+                chapter.add_verse(verse)
+                reporter.advance(verse)
+
+        with reporter.stage("metadata"):
+            metadata = BookMetadata(book_name)
+        with reporter.stage("extract_parshiot"):
+            book = Book(book_name, chapters, metadata)
+        reporter.finish()
+        return book
 
     @classmethod
-    def from_text_file(cls, file_path: str) -> "Book":
+    def from_text_file(
+        cls,
+        file_path: str,
+        lazy: bool = False,
+        verse_cache: Optional[VerseCache] = None,
+        reporter: ParseReporter = NULL_REPORTER,
+    ) -> "Book":
         """
         Parse a book from a text file.
 
         :param file_path: The path to the text file.
+        :param lazy: Whether to only index the verses and parse each one the first
+                     time it is used, defaults to False
+        :param verse_cache: The cache holding lazily parsed verses, defaults to a
+                            new VerseCache for this book
+        :param reporter: Callbacks for progress reporting and profiling, defaults
+                         to doing nothing
         :return: A Book object.
         """
         with open(file_path, "r", encoding="utf-8") as book:
             lines = book.read()
-            return cls.chapters_from_string(lines)
+            return cls.chapters_from_string(lines, lazy, verse_cache, reporter)
+
+    @classmethod
+    def from_compiled(cls, file_path: str, columnar: bool = True) -> "Book":
+        """
+        Load a book from a compiled corpus file (see `Book.to_compiled`).
+
+        :param file_path: The path to the compiled file.
+        :param columnar: Whether to keep the book in its compiled arrays and expose
+                         its verses as read-only views, defaults to True. Rebuilding
+                         the Letter/Word/Verse objects takes about as long as
+                         parsing the text.
+        :return: A Book object.
+        """
+        return cls.from_compiled_book(CompiledBook.load(file_path), columnar)
+
+    @classmethod
+    def from_compiled_book(cls, compiled: CompiledBook, columnar: bool = True) -> "Book":
+        """
+        Rebuild a book from its compiled arrays.
+
+        :param compiled: The compiled book.
+        :param columnar: Whether to keep the book in its compiled arrays and expose
+                         its verses as read-only views, defaults to True
+        :return: A Book object.
+        """
+        if columnar:
+            chapters, parshiot = ColumnarBook(compiled).to_parts()
+        else:
+            chapters, parshiot = compiled.to_parts()
+        return cls(compiled.name, chapters, parshiot=parshiot)
+
+    def to_compiled(self, file_path: str):
+        """
+        Write the book to a compiled corpus file, which can be loaded without
+        parsing any text or fetching any metadata.
+
+        :param file_path: The path of the file to write.
+        """
+        CompiledBook.from_parts(self.name, self.chapters, self.parshiot).save(file_path)
 
     @property
     def parshiot(self):
@@ -120,6 +243,15 @@ class Book:
         """
         return self._chapters
 
+    @property
+    def verse_index(self) -> VerseIndex:
+        """
+        Get the index from (chapter, verse) numbers to verse ordinals in the Book.
+
+        :return: The verse index of the Book.
+        """
+        return self._verse_index
+
     @property
     def verses(self):
         """
@@ -129,6 +261,67 @@ class Book:
         """
         return self._verses
 
+    @property
+    def version(self) -> str:
+        """
+        Get a fingerprint of the contents of the Book (its taam stream and the
+        ranges of its aliyot), which identifies it in the keys of cached query
+        results.
+
+        :return: The version of the Book.
+        """
+        if self._version is None:
+            stream = self.taam_stream
+            digest = hashlib.blake2b(self.name.encode("utf-8"), digest_size=16)
+            for array in (
+                stream.verses,
+                stream.words,
+                stream.has_mesharet,
+                stream.letter_offsets,
+                stream.codes,
+            ):
+                digest.update(array.tobytes())
+            for parasha in self.parshiot:
+                digest.update(parasha.name.encode("utf-8"))
+                for aliyah in parasha.aliyot:
+                    digest.update(f"{aliyah.start}:{aliyah.stop};".encode("utf-8"))
+            self._version = digest.hexdigest()
+        return self._version
+
+    def _query_key(
+        self, kind: str, query: Hashable, include_meshartim: bool, n: Optional[int] = None
+    ) -> tuple:
+        return self.version, kind, query, include_meshartim, n
+
+    def _cached(self, key: tuple, compute: Callable[[], T]) -> T:
+        if self.query_cache is None:
+            return compute()
+        return self.query_cache.get_or_compute(key, compute)
+
+    @property
+    def taam_stream(self) -> TaamStream:
+        """
+        Get the letters with Taamim in the Book, laid out as flat arrays (built on
+        first use).
+
+        :return: The taam stream of the Book.
+        """
+        if self._taam_stream is None:
+            self._taam_stream = TaamStream.from_verses(self.verses)
+        return self._taam_stream
+
+    @property
+    def taam_ngram_index(self) -> TaamNGramIndex:
+        """
+        Get the positional index of the taam n-grams in the Book (built on first
+        use).
+
+        :return: The taam n-gram index of the Book.
+        """
+        if self._taam_ngram_index is None:
+            self._taam_ngram_index = TaamNGramIndex(self.taam_stream)
+        return self._taam_ngram_index
+
     @property
     def taamim(self):
         """
@@ -149,6 +342,46 @@ class Book:
             taam for verse in self.verses for taam in verse.taamim_without_meshartim
         ]
 
+    @property
+    def taam_codes(self) -> np.ndarray:
+        """
+        Get the integer codes of the Taamim in the Book.
+
+        :return: A read-only array with the code of each Taam in the Book.
+        """
+        if self._taam_codes is None:
+            self._taam_codes = concatenate_taam_codes(
+                verse.taam_codes for verse in self.verses
+            )
+        return self._taam_codes
+
+    @property
+    def taam_codes_without_meshartim(self) -> np.ndarray:
+        """
+        Get the integer codes of the Taamim in the Book without the Meshartim.
+
+        :return: A read-only array with the code of each Taam in the Book
+                 that is not a Mesharet.
+        """
+        if self._taam_codes_without_meshartim is None:
+            self._taam_codes_without_meshartim = concatenate_taam_codes(
+                verse.taam_codes_without_meshartim for verse in self.verses
+            )
+        return self._taam_codes_without_meshartim
+
+    def taam_frequencies(self, include_meshartim: bool = True) -> np.ndarray:
+        """
+        Count the occurrences of each Taam in the Book.
+
+        :param include_meshartim: Whether to count the Meshartim, defaults to True
+        :return: An array with the number of occurrences of each taam code at its
+                 index (see `parsing.taam_codes.frequencies_by_name`).
+        """
+        codes = (
+            self.taam_codes if include_meshartim else self.taam_codes_without_meshartim
+        )
+        return taam_frequencies(codes)
+
     def find_verses_with_taam_sequence(
         self, taam_sequence: List[str], include_meshartim: bool = True
     ) -> Dict[str, ParashaTaamSequenceResult]:
@@ -161,17 +394,264 @@ class Book:
                  of the outer list are the aliyot, and the elements of the inner list are
                  the verses in the aliyah that contain the sequence.)
         """
-        by_parasha = {}
+        key = self._query_key(
+            "sequence",
+            normalize_sequence(taam_sequence, include_meshartim),
+            include_meshartim,
+        )
+        matches = self._cached(
+            key, lambda: self._find_matches(taam_sequence, include_meshartim)
+        )
+        return self.group_matches(matches)
+
+    def _find_matches(
+        self, taam_sequence: List[str], include_meshartim: bool
+    ) -> Dict[int, List[List[int]]]:
+        matches = self.taam_ngram_index.find(taam_sequence, include_meshartim)
+        if matches is not None:
+            return matches
+
+        # the index cannot answer an empty sequence
+        matches = {}
         for parasha in self.parshiot:
-            parasha_results_by_aliyah = parasha.find_verses_with_taam_sequence(
-                taam_sequence, include_meshartim
+            for aliyah in parasha.aliyot:
+                for ordinal, verse in zip(range(aliyah.start, aliyah.stop), aliyah):
+                    result = verse.find_taam_sequence(taam_sequence, include_meshartim)
+                    if result.word_idxs:
+                        matches[ordinal] = result.word_idxs
+        return matches
+
+    def find_verses_with_taam_sequences(
+        self, taam_sequences: List[List[str]], include_meshartim: bool = True
+    ) -> List[Dict[str, ParashaTaamSequenceResult]]:
+        """
+        Find verses with each of several sequences of Taamim, broken down by parasha
+        and aliyah. All the sequences are looked for in a single pass over the
+        Book (see `TaamAutomaton`).
+
+        :param taam_sequences: The taam sequences to find.
+        :param include_meshartim: Whether to include Meshartim in the search, defaults to True
+        :return: The results for each sequence, in order (see
+                 `find_verses_with_taam_sequence`).
+        """
+        keys = [
+            self._query_key(
+                "sequence",
+                normalize_sequence(taam_sequence, include_meshartim),
+                include_meshartim,
+            )
+            for taam_sequence in taam_sequences
+        ]
+        cache = self.query_cache
+        matches = [None if cache is None else cache.get(key) for key in keys]
+        # only the sequences whose matches are not cached are searched for
+        missing = [i for i, found in enumerate(matches) if found is None]
+        for i, sequence_matches in zip(
+            missing,
+            find_taam_sequences(
+                self.taam_stream,
+                [taam_sequences[i] for i in missing],
+                include_meshartim,
+            ),
+        ):
+            if sequence_matches is None:
+                sequence_matches = self._find_matches(
+                    taam_sequences[i], include_meshartim
+                )
+            matches[i] = sequence_matches
+            if cache is not None:
+                cache.put(keys[i], sequence_matches)
+        return [self.group_matches(sequence_matches) for sequence_matches in matches]
+
+    def find_verses_with_taam_pattern(
+        self, pattern: str, include_meshartim: bool = True
+    ) -> Dict[str, ParashaTaamSequenceResult]:
+        """
+        Find verses with a match of a taam pattern (e.g. `{tevir|tarha} darga{1,2}`,
+        see `TaamPattern`) broken down by parasha and aliyah.
+
+        :param pattern: The taam pattern to find.
+        :param include_meshartim: Whether to include Meshartim in the search, defaults to True
+        :return: A dictionary mapping parashiot to a list of lists of verses (see
+                 `find_verses_with_taam_sequence`).
+        """
+        key = self._query_key("pattern", " ".join(pattern.split()), include_meshartim)
+        matches = self._cached(
+            key,
+            lambda: compile_taam_pattern(pattern).find(
+                self.taam_stream, include_meshartim
+            ),
+        )
+        return self.group_matches(matches)
+
+    @property
+    def in_aliyot(self) -> np.ndarray:
+        """
+        Get which verses of the Book are in one of its aliyot (the verses that
+        searches by parasha and aliyah report).
+
+        :return: A read-only boolean array indexed by the ordinals of the verses.
+        """
+        if self._in_aliyot is None:
+            in_aliyot = np.zeros(len(self.verses), dtype=bool)
+            for parasha in self.parshiot:
+                for aliyah in parasha.aliyot:
+                    in_aliyot[aliyah.start : aliyah.stop] = True
+            in_aliyot.flags.writeable = False
+            self._in_aliyot = in_aliyot
+        return self._in_aliyot
+
+    def count_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> int:
+        """
+        Count the matches of a sequence of Taamim in the verses of the Book's
+        aliyot (all the matches `find_verses_with_taam_sequence` finds), without
+        building them.
+
+        :param taam_sequence: The taam sequence to count.
+        :param include_meshartim: Whether to include Meshartim in the search, defaults to True
+        :return: The number of matches.
+        """
+        codes = sequence_codes(taam_sequence, include_meshartim)
+        if codes is None:
+            return 0
+        if len(codes) == 0:
+            # the stream cannot answer an empty sequence
+            return sum(
+                parasha.count_taam_sequence(taam_sequence, include_meshartim)
+                for parasha in self.parshiot
+            )
+
+        def count() -> int:
+            stream = self.taam_stream
+            ordinals = np.unique(
+                stream.verses[stream.occurrences(codes, include_meshartim)]
+            )
+            ordinals = ordinals[self.in_aliyot[ordinals]]
+            return stream.count_matches(ordinals, codes, include_meshartim)
+
+        key = self._query_key("count", tuple(codes), include_meshartim)
+        return self._cached(key, count)
+
+    def has_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> bool:
+        """
+        Check whether a verse of the Book's aliyot contains a sequence of Taamim.
+        The Book is searched a chunk of verses at a time, stopping at the first
+        match (see `iter_verses_with_taam_sequence`).
+
+        :param taam_sequence: The taam sequence to find.
+        :param include_meshartim: Whether to include Meshartim in the search, defaults to True
+        :return: Whether the sequence is found.
+        """
+        codes = sequence_codes(taam_sequence, include_meshartim)
+        if codes is None:
+            return False
+        if len(codes) == 0:
+            return any(
+                parasha.has_taam_sequence(taam_sequence, include_meshartim)
+                for parasha in self.parshiot
             )
-            by_parasha[parasha.name] = parasha_results_by_aliyah
+        hits = self.iter_verses_with_taam_sequence(taam_sequence, include_meshartim)
+        return next(hits, None) is not None
+
+    def iter_verses_with_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True, cursor: int = 0
+    ) -> Iterator[TaamSequenceHit]:
+        """
+        Find verses with a sequence of Taamim one at a time, in the order of
+        `find_verses_with_taam_sequence`. The Book is searched a chunk of verses
+        at a time, so nothing past the last hit that is taken is searched.
+
+        :param taam_sequence: The (non-empty) taam sequence to find.
+        :param include_meshartim: Whether to include Meshartim in the search, defaults to True
+        :param cursor: The ordinal of the verse to start at (e.g. the `next_cursor`
+                       of a page), defaults to 0
+        :return: The hits, in order.
+        """
+        return iter_hits(
+            [self], self.taam_stream, taam_sequence, include_meshartim, cursor
+        )
+
+    def page_verses_with_taam_sequence(
+        self,
+        taam_sequence: List[str],
+        include_meshartim: bool = True,
+        limit: int = DEFAULT_PAGE_SIZE,
+        offset: int = 0,
+        cursor: int = 0,
+    ) -> TaamSearchPage:
+        """
+        Find a page of the verses with a sequence of Taamim (see
+        `iter_verses_with_taam_sequence`), stopping as soon as the page is full.
+
+        :param taam_sequence: The (non-empty) taam sequence to find.
+        :param include_meshartim: Whether to include Meshartim in the search, defaults to True
+        :param limit: The number of verses on the page, defaults to DEFAULT_PAGE_SIZE
+        :param offset: The number of verses to skip (after the cursor), defaults to 0
+        :param cursor: The ordinal of the verse to start at, defaults to 0
+        :return: The page of hits.
+        """
+        hits = self.iter_verses_with_taam_sequence(
+            taam_sequence, include_meshartim, cursor
+        )
+        return paginate(hits, limit, offset)
+
+    def group_matches(
+        self, matches: Dict[int, List[List[int]]]
+    ) -> Dict[str, ParashaTaamSequenceResult]:
+        """
+        Break down the matches of a search (e.g. by a `TaamNGramIndex` or a
+        `TaamSearchEngine`) by parasha and aliyah, like
+        `find_verses_with_taam_sequence`. The results have their own copies of
+        the word indices, so the matches (e.g. cached ones) are left as they are.
+
+        :param matches: The ordinals of the verses with a match mapped to the word
+                        indices of their matches, in order.
+        :return: A dictionary mapping parashiot to a list of lists of verses.
+        """
+        ordinals = list(matches)
+        by_parasha = {}
+        for parasha in self.parshiot:
+            verses_by_aliyah = []
+            for aliyah in parasha.aliyot:
+                lo = bisect_left(ordinals, aliyah.start)
+                hi = bisect_left(ordinals, aliyah.stop)
+                aliyah_results = []
+                for ordinal in ordinals[lo:hi]:
+                    verse = self._verses[ordinal]
+                    word_idxs = [list(idxs) for idxs in matches[ordinal]]
+                    aliyah_results.append(
+                        (verse, VerseTaamSequenceResult(verse, word_idxs))
+                    )
+                if aliyah_results:
+                    verses_by_aliyah.append(aliyah_results)
+            by_parasha[parasha.name] = verses_by_aliyah
         return by_parasha
 
-    def count_n_taam_sequences(
-        self, n: int, include_meshartim: bool = True
-    ) -> Dict[tuple, int]:
+    def taam_ngram_counts(self, include_meshartim: bool = True) -> TaamNGramCounts:
+        """
+        Get the counts of the taam n-grams in the Book (counted on first use,
+        over the verses of its aliyot).
+
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :return: The n-gram counts.
+        """
+        if include_meshartim not in self._taam_ngram_counts:
+            self._taam_ngram_counts[include_meshartim] = TaamNGramCounts.from_verses(
+                (
+                    verse
+                    for parasha in self.parshiot
+                    for aliyah in parasha.aliyot
+                    for verse in aliyah.verses
+                ),
+                include_meshartim,
+            )
+        return self._taam_ngram_counts[include_meshartim]
+
+    def count_n_taam_sequences(self, n: int, include_meshartim: bool = True) -> Counter:
         """
         Count the number of n-Taam sequences in the Book.
 
@@ -181,7 +661,9 @@ class Book:
         :return: The sequence (tuple) mapped to the number of occurrences of that
                  sequence in the Book.
         """
-        taam_sequence_counts = Counter()
-        for parasha in self.parshiot:
-            taam_sequence_counts += parasha.count_n_taam_sequences(n, include_meshartim)
-        return taam_sequence_counts
+        key = self._query_key("ngrams", None, include_meshartim, n)
+        counts = self._cached(
+            key, lambda: self.taam_ngram_counts(include_meshartim).counts(n)
+        )
+        # the cached counts are shared, so callers get a copy
+        return Counter(counts)
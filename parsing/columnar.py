@@ -0,0 +1,332 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from parsing.aliyah import Aliyah
+from parsing.chapter import Chapter
+from parsing.compiled import CompiledBook
+from parsing.letter import Letter
+from parsing.niqud import Niqud
+from parsing.parasha import Parasha
+from parsing.symbols import (CODES_TO_LETTERS, LETTERS_TO_CODES, MAQAF,
+                             NEQUDOT_CODES_TO_NAMES, TAAMIM_CODES_TO_NAMES,
+                             TAAMIM_NAMES_TO_CODES)
+from parsing.taam import Taam
+from parsing.taam_codes import MESHARET_CODES, freeze, without_meshartim
+from parsing.verse import Verse
+from parsing.verse_index import VerseRange
+from parsing.word import Word
+
+TAAMIM_BY_CODE = {code: Taam.from_code(code) for code in TAAMIM_CODES_TO_NAMES}
+NEQUDOT_BY_CODE = {code: Niqud.from_code(code) for code in NEQUDOT_CODES_TO_NAMES}
+MAQAF_CODE = LETTERS_TO_CODES[MAQAF]
+
+
+class ColumnarBook:
+    """
+    A ColumnarBook keeps a whole book in the flat arrays of a CompiledBook and
+    hands out lightweight, read-only views (`VerseView`, `WordView`,
+    `LetterView`) that expose the usual Verse/Word/Letter API on top of them.
+
+    Besides the compiled arrays, it derives `word_taamim` (the clean taam codes
+    of each word, i.e. after the tere_qadmin and qadma rules of `Word`) with
+    `word_taam_offsets` marking where each word's codes start and end.
+    """
+
+    def __init__(self, compiled: CompiledBook):
+        self.name = compiled.name
+        self.compiled = compiled
+        arrays = compiled.arrays
+        self.letters = arrays["letters"]
+        self.letter_taam_offsets = arrays["letter_taam_offsets"]
+        self.taamim = arrays["taamim"]
+        self.letter_niqud_offsets = arrays["letter_niqud_offsets"]
+        self.nequdot = arrays["nequdot"]
+        self.word_offsets = arrays["word_offsets"]
+        self.verse_offsets = arrays["verse_offsets"]
+        self.verse_chapters = arrays["verse_chapters"]
+        self.verse_idxs = arrays["verse_idxs"]
+        self.word_taam_offsets, self.word_taamim = self._clean_word_taamim()
+
+    def _clean_word_taamim(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Apply the clean-up rules of `Word._get_clean_taamim` to every word.
+
+        :return: The offsets and codes of the clean taamim of each word.
+        """
+        pashta = TAAMIM_NAMES_TO_CODES["pashta"]
+        qadma = TAAMIM_NAMES_TO_CODES["qadma"]
+        tere_qadmin = TAAMIM_NAMES_TO_CODES["tere_qadmin"]
+
+        raw = self.taamim.tolist()
+        letter_taam_offsets = self.letter_taam_offsets.tolist()
+        word_offsets = self.word_offsets.tolist()
+
+        clean, offsets = [], [0]
+        for first_letter, stop_letter in zip(word_offsets, word_offsets[1:]):
+            codes = raw[letter_taam_offsets[first_letter] : letter_taam_offsets[stop_letter]]
+            if len(codes) == 2 and codes[0] == pashta and codes[1] == pashta:
+                codes = [tere_qadmin]
+            elif (
+                len(codes) == 1
+                and codes[0] == pashta
+                and pashta
+                not in raw[
+                    letter_taam_offsets[stop_letter - 1] : letter_taam_offsets[stop_letter]
+                ]
+            ):
+                codes = [qadma]
+            clean.extend(codes)
+            offsets.append(len(clean))
+        return np.asarray(offsets, dtype=np.uint32), np.asarray(clean, dtype=np.uint8)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Get the total size of the arrays backing the book.
+
+        :return: The size of the arrays in bytes.
+        """
+        arrays = list(self.compiled.arrays.values())
+        arrays += [self.word_taam_offsets, self.word_taamim]
+        return sum(array.nbytes for array in arrays)
+
+    def letter_taamim(self, i: int) -> List[Taam]:
+        start, stop = self.letter_taam_offsets[i : i + 2].tolist()
+        return [TAAMIM_BY_CODE[code] for code in self.taamim[start:stop].tolist()]
+
+    def letter_nequdot(self, i: int) -> List[Niqud]:
+        start, stop = self.letter_niqud_offsets[i : i + 2].tolist()
+        return [NEQUDOT_BY_CODE[code] for code in self.nequdot[start:stop].tolist()]
+
+    def word_letter_range(self, w: int) -> range:
+        start, stop = self.word_offsets[w : w + 2].tolist()
+        return range(start, stop)
+
+    def word_taam_codes(self, start_word: int, stop_word: int) -> List[int]:
+        """
+        Get the clean taam codes of a range of words.
+
+        :param start_word: The first word.
+        :param stop_word: The word after the last word.
+        :return: The clean taam codes of the words.
+        """
+        start = int(self.word_taam_offsets[start_word])
+        stop = int(self.word_taam_offsets[stop_word])
+        return self.word_taamim[start:stop].tolist()
+
+    def verse_taam_codes(self, v: int) -> np.ndarray:
+        """
+        Get the clean taam codes of a verse, without copying them.
+
+        :param v: The ordinal of the verse.
+        :return: A read-only view of the clean taam codes of the verse.
+        """
+        start_word, stop_word = self.verse_offsets[v : v + 2].tolist()
+        start = int(self.word_taam_offsets[start_word])
+        stop = int(self.word_taam_offsets[stop_word])
+        return freeze(self.word_taamim[start:stop])
+
+    def verse_word_range(self, v: int) -> range:
+        start, stop = self.verse_offsets[v : v + 2].tolist()
+        return range(start, stop)
+
+    def to_parts(self) -> Tuple[List[Chapter], List[Parasha]]:
+        """
+        Build the chapters and parshiot of the book out of verse views.
+
+        :return: The chapters and parshiot of the book.
+        """
+        chapters, verses = [], []
+        for ordinal, chapter_idx in enumerate(self.verse_chapters.tolist()):
+            verse = VerseView(self, ordinal)
+            if len(chapters) == 0 or chapters[-1].idx != chapter_idx:
+                chapters.append(Chapter(chapter_idx, []))
+            chapters[-1].add_verse(verse)
+            verses.append(verse)
+
+        parasha_offsets = self.compiled.arrays["parasha_offsets"].tolist()
+        aliyah_ranges = self.compiled.arrays["aliyah_ranges"].tolist()
+        parshiot = [
+            Parasha(
+                parasha_name,
+                [
+                    Aliyah(aliyah_idx, VerseRange(verses, start, stop))
+                    for aliyah_idx, (start, stop) in enumerate(
+                        aliyah_ranges[parasha_offsets[p] : parasha_offsets[p + 1]]
+                    )
+                ],
+            )
+            for p, parasha_name in enumerate(self.compiled.parasha_names)
+        ]
+        return chapters, parshiot
+
+
+class LetterView(Letter):
+    """
+    A read-only Letter backed by the arrays of a ColumnarBook.
+    """
+
+    def __init__(self, book: ColumnarBook, idx: int):
+        self._book = book
+        self._idx = idx
+
+    @property
+    def letter(self):
+        return CODES_TO_LETTERS[int(self._book.letters[self._idx])]
+
+    @property
+    def taamim(self):
+        return self._book.letter_taamim(self._idx)
+
+    @property
+    def nequdot(self):
+        return self._book.letter_nequdot(self._idx)
+
+    def add_taam(self, taam: Taam):
+        raise TypeError("Columnar letters are read-only")
+
+    def add_niqud(self, niqud: Niqud):
+        raise TypeError("Columnar letters are read-only")
+
+    def rename_taam(self, old_name: str, new_name: str) -> bool:
+        raise TypeError("Columnar letters are read-only")
+
+
+class WordView(Word):
+    """
+    A read-only Word backed by the arrays of a ColumnarBook.
+    """
+
+    def __init__(self, book: ColumnarBook, idx: int):
+        self._book = book
+        self._idx = idx
+
+    @property
+    def is_maqaf(self):
+        letter_range = self._book.word_letter_range(self._idx)
+        return (
+            len(letter_range) == 1
+            and int(self._book.letters[letter_range[0]]) == MAQAF_CODE
+        )
+
+    @property
+    def letters(self):
+        return [
+            LetterView(self._book, i) for i in self._book.word_letter_range(self._idx)
+        ]
+
+    @property
+    def taamim_raw(self):
+        letter_range = self._book.word_letter_range(self._idx)
+        start = int(self._book.letter_taam_offsets[letter_range.start])
+        stop = int(self._book.letter_taam_offsets[letter_range.stop])
+        return [TAAMIM_BY_CODE[code] for code in self._book.taamim[start:stop].tolist()]
+
+    @property
+    def taamim(self):
+        return [
+            TAAMIM_BY_CODE[code]
+            for code in self._book.word_taam_codes(self._idx, self._idx + 1)
+        ]
+
+    @property
+    def taamim_without_meshartim(self):
+        return [
+            TAAMIM_BY_CODE[code]
+            for code in self._book.word_taam_codes(self._idx, self._idx + 1)
+            if code not in MESHARET_CODES
+        ]
+
+    @property
+    def nequdot(self):
+        letter_range = self._book.word_letter_range(self._idx)
+        start = int(self._book.letter_niqud_offsets[letter_range.start])
+        stop = int(self._book.letter_niqud_offsets[letter_range.stop])
+        return [
+            NEQUDOT_BY_CODE[code] for code in self._book.nequdot[start:stop].tolist()
+        ]
+
+    def has_taam(self, taam_name: str) -> bool:
+        code = TAAMIM_NAMES_TO_CODES.get(taam_name)
+        return code in self._book.word_taam_codes(self._idx, self._idx + 1)
+
+    def rename_taam(self, old_name: str, new_name: str) -> bool:
+        raise TypeError("Columnar words are read-only")
+
+    def __len__(self) -> int:
+        return len(self._book.word_letter_range(self._idx))
+
+
+class VerseView(Verse):
+    """
+    A read-only Verse backed by the arrays of a ColumnarBook. Its words and
+    letters are only materialized (as views) when they are asked for.
+    """
+
+    def __init__(self, book: ColumnarBook, ordinal: int):
+        self._book = book
+        self._ordinal = ordinal
+        self.idx = int(book.verse_idxs[ordinal])
+        self._maqaf_indices = []
+
+    @property
+    def _words(self):
+        return [WordView(self._book, w) for w in self._book.verse_word_range(self._ordinal)]
+
+    @property
+    def words(self):
+        # not memoized, so that views stay lightweight
+        return tuple(word for word in self._words if not word.is_maqaf)
+
+    @property
+    def taam_words(self):
+        return Verse.join_maqaf_words(self._words)
+
+    @property
+    def letters(self):
+        word_range = self._book.verse_word_range(self._ordinal)
+        start = int(self._book.word_offsets[word_range.start])
+        stop = int(self._book.word_offsets[word_range.stop])
+        return [LetterView(self._book, i) for i in range(start, stop)]
+
+    @property
+    def taamim(self):
+        word_range = self._book.verse_word_range(self._ordinal)
+        return [
+            TAAMIM_BY_CODE[code]
+            for code in self._book.word_taam_codes(word_range.start, word_range.stop)
+        ]
+
+    @property
+    def taamim_without_meshartim(self):
+        word_range = self._book.verse_word_range(self._ordinal)
+        return [
+            TAAMIM_BY_CODE[code]
+            for code in self._book.word_taam_codes(word_range.start, word_range.stop)
+            if code not in MESHARET_CODES
+        ]
+
+    @property
+    def taam_codes(self):
+        return self._book.verse_taam_codes(self._ordinal)
+
+    @property
+    def taam_codes_without_meshartim(self):
+        return without_meshartim(self._book.verse_taam_codes(self._ordinal))
+
+    @property
+    def nequdot(self):
+        word_range = self._book.verse_word_range(self._ordinal)
+        first_letter = int(self._book.word_offsets[word_range.start])
+        stop_letter = int(self._book.word_offsets[word_range.stop])
+        start = int(self._book.letter_niqud_offsets[first_letter])
+        stop = int(self._book.letter_niqud_offsets[stop_letter])
+        return [
+            NEQUDOT_BY_CODE[code] for code in self._book.nequdot[start:stop].tolist()
+        ]
+
+    def has_taam(self, taam_name: str) -> bool:
+        word_range = self._book.verse_word_range(self._ordinal)
+        code = TAAMIM_NAMES_TO_CODES.get(taam_name)
+        return code in self._book.word_taam_codes(word_range.start, word_range.stop)
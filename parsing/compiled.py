@@ -0,0 +1,254 @@
+import json
+import mmap
+import struct
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from parsing.aliyah import Aliyah
+from parsing.chapter import Chapter
+from parsing.letter import Letter
+from parsing.niqud import Niqud
+from parsing.parasha import Parasha
+from parsing.symbols import (CODES_TO_LETTERS, LETTERS_TO_CODES,
+                             NEQUDOT_CODES_TO_NAMES, TAAMIM_CODES_TO_NAMES)
+from parsing.taam import Taam
+from parsing.verse import Verse
+from parsing.verse_index import VerseRange
+from parsing.word import Word
+
+MAGIC = b"QTKN"
+COMPILED_FORMAT_VERSION = 1
+# magic, format version, header length
+PREAMBLE = struct.Struct("<4sII")
+ALIGNMENT = 8
+
+class CompiledBook:
+    """
+    A CompiledBook is a Book stored as flat, fixed-width arrays:
+
+    - `letters`: the letter code of every letter in the book.
+    - `taamim` / `nequdot`: the taam and niqud codes of every letter, with
+      `letter_taam_offsets` / `letter_niqud_offsets` marking where the marks
+      of each letter start and end.
+    - `word_offsets`: where the letters of each word start and end (a maqaf is
+      a word of its own, as in `Verse`).
+    - `verse_offsets`: where the words of each verse start and end.
+    - `verse_chapters` / `verse_idxs`: the chapter and verse number of each verse.
+    - `aliyah_ranges`: the [start, stop) verse ordinals of each aliyah, with
+      `parasha_offsets` marking which aliyot belong to which parasha.
+
+    The arrays are loaded straight out of a memory-mapped file, so opening a
+    compiled book does not parse any text.
+    """
+
+    ARRAY_DTYPES = {
+        "letters": np.uint8,
+        "letter_taam_offsets": np.uint32,
+        "taamim": np.uint8,
+        "letter_niqud_offsets": np.uint32,
+        "nequdot": np.uint8,
+        "word_offsets": np.uint32,
+        "verse_offsets": np.uint32,
+        "verse_chapters": np.uint16,
+        "verse_idxs": np.uint16,
+        "parasha_offsets": np.uint32,
+        "aliyah_ranges": np.uint32,
+    }
+
+    def __init__(
+        self, name: str, parasha_names: List[str], arrays: Dict[str, np.ndarray]
+    ):
+        self.name = name
+        self.parasha_names = parasha_names
+        self.arrays = arrays
+
+    @classmethod
+    def from_parts(
+        cls, name: str, chapters: List[Chapter], parshiot: List[Parasha]
+    ) -> "CompiledBook":
+        """
+        Encode the parts of a parsed Book.
+
+        :param name: The name of the book.
+        :param chapters: The chapters of the book.
+        :param parshiot: The parshiot of the book.
+        :return: The CompiledBook.
+        """
+        letters, taamim, nequdot = [], [], []
+        letter_taam_offsets, letter_niqud_offsets = [0], [0]
+        word_offsets, verse_offsets = [0], [0]
+        verse_chapters, verse_idxs = [], []
+        for chapter in chapters:
+            for verse in chapter.verses:
+                verse_chapters.append(chapter.idx)
+                verse_idxs.append(verse.idx)
+                for word in verse:
+                    for letter in word.letters:
+                        letters.append(LETTERS_TO_CODES[letter.letter])
+                        taamim.extend(
+                            taam.code for taam in letter.taamim
+                        )
+                        nequdot.extend(niqud.code for niqud in letter.nequdot)
+                        letter_taam_offsets.append(len(taamim))
+                        letter_niqud_offsets.append(len(nequdot))
+                    word_offsets.append(len(letters))
+                verse_offsets.append(len(word_offsets) - 1)
+
+        parasha_offsets, aliyah_ranges = [0], []
+        for parasha in parshiot:
+            for aliyah in parasha.aliyot:
+                aliyah_ranges.append((aliyah.start, aliyah.stop))
+            parasha_offsets.append(len(aliyah_ranges))
+
+        values = {
+            "letters": letters,
+            "letter_taam_offsets": letter_taam_offsets,
+            "taamim": taamim,
+            "letter_niqud_offsets": letter_niqud_offsets,
+            "nequdot": nequdot,
+            "word_offsets": word_offsets,
+            "verse_offsets": verse_offsets,
+            "verse_chapters": verse_chapters,
+            "verse_idxs": verse_idxs,
+            "parasha_offsets": parasha_offsets,
+            "aliyah_ranges": aliyah_ranges,
+        }
+        arrays = {
+            key: np.asarray(value, dtype=CompiledBook.ARRAY_DTYPES[key])
+            for key, value in values.items()
+        }
+        arrays["aliyah_ranges"] = arrays["aliyah_ranges"].reshape(-1, 2)
+        return cls(name, [parasha.name for parasha in parshiot], arrays)
+
+    def save(self, path: str):
+        """
+        Write the CompiledBook to a file.
+
+        :param path: The path of the file to write.
+        """
+        layout, offset = [], 0
+        for key in CompiledBook.ARRAY_DTYPES:
+            array = self.arrays[key]
+            layout.append(
+                {"name": key, "offset": offset, "shape": list(array.shape)}
+            )
+            offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+        header = json.dumps(
+            {"name": self.name, "parshiot": self.parasha_names, "arrays": layout},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        header += b" " * (-(PREAMBLE.size + len(header)) % ALIGNMENT)
+
+        with open(path, "wb") as f:
+            f.write(PREAMBLE.pack(MAGIC, COMPILED_FORMAT_VERSION, len(header)))
+            f.write(header)
+            for key in CompiledBook.ARRAY_DTYPES:
+                data = self.arrays[key].tobytes()
+                f.write(data)
+                f.write(b"\0" * (-len(data) % ALIGNMENT))
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledBook":
+        """
+        Memory-map a compiled book file.
+
+        :param path: The path of the compiled book.
+        :return: The CompiledBook, whose arrays are views into the mapped file.
+        """
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_len = PREAMBLE.unpack_from(buffer)
+        assert magic == MAGIC, f"Not a compiled book: {path}"
+        assert (
+            version == COMPILED_FORMAT_VERSION
+        ), f"Unsupported compiled book version: {version}"
+        header = json.loads(buffer[PREAMBLE.size : PREAMBLE.size + header_len])
+
+        data_start = PREAMBLE.size + header_len
+        arrays = {}
+        for spec in header["arrays"]:
+            dtype = np.dtype(CompiledBook.ARRAY_DTYPES[spec["name"]])
+            shape = tuple(spec["shape"])
+            arrays[spec["name"]] = np.frombuffer(
+                buffer,
+                dtype=dtype,
+                count=int(np.prod(shape)),
+                offset=data_start + spec["offset"],
+            ).reshape(shape)
+        return cls(header["name"], header["parshiot"], arrays)
+
+    def to_parts(self) -> Tuple[List[Chapter], List[Parasha]]:
+        """
+        Rebuild the Chapter/Verse/Word/Letter objects of the book.
+
+        :return: The chapters and parshiot of the book.
+        """
+        # plain lists are much faster to index one element at a time than arrays
+        letters = self.arrays["letters"].tolist()
+        taamim = self.arrays["taamim"].tolist()
+        nequdot = self.arrays["nequdot"].tolist()
+        letter_taam_offsets = self.arrays["letter_taam_offsets"].tolist()
+        letter_niqud_offsets = self.arrays["letter_niqud_offsets"].tolist()
+        word_offsets = self.arrays["word_offsets"].tolist()
+        verse_offsets = self.arrays["verse_offsets"].tolist()
+
+        taam_table = {code: Taam.from_code(code) for code in TAAMIM_CODES_TO_NAMES}
+        niqud_table = {code: Niqud.from_code(code) for code in NEQUDOT_CODES_TO_NAMES}
+
+        def build_letter(i: int) -> Letter:
+            taam_start, taam_stop = letter_taam_offsets[i], letter_taam_offsets[i + 1]
+            niqud_start, niqud_stop = (
+                letter_niqud_offsets[i],
+                letter_niqud_offsets[i + 1],
+            )
+            return Letter(
+                CODES_TO_LETTERS[letters[i]],
+                [taam_table[code] for code in taamim[taam_start:taam_stop]]
+                if taam_start != taam_stop
+                else [],
+                [niqud_table[code] for code in nequdot[niqud_start:niqud_stop]]
+                if niqud_start != niqud_stop
+                else [],
+            )
+
+        chapters, verses = [], []
+        for verse_ordinal, (chapter_idx, verse_idx) in enumerate(
+            zip(self.arrays["verse_chapters"].tolist(), self.arrays["verse_idxs"].tolist())
+        ):
+            words = [
+                Word(
+                    [
+                        build_letter(i)
+                        for i in range(word_offsets[w], word_offsets[w + 1])
+                    ]
+                )
+                for w in range(
+                    verse_offsets[verse_ordinal], verse_offsets[verse_ordinal + 1]
+                )
+            ]
+            verse = Verse(verse_idx, words)
+            if len(chapters) == 0 or chapters[-1].idx != chapter_idx:
+                chapters.append(Chapter(chapter_idx, []))
+            chapters[-1].add_verse(verse)
+            verses.append(verse)
+
+        parasha_offsets = self.arrays["parasha_offsets"].tolist()
+        aliyah_ranges = self.arrays["aliyah_ranges"].tolist()
+        parshiot = [
+            Parasha(
+                parasha_name,
+                [
+                    Aliyah(aliyah_idx, VerseRange(verses, start, stop))
+                    for aliyah_idx, (start, stop) in enumerate(
+                        aliyah_ranges[
+                            parasha_offsets[p] : parasha_offsets[p + 1]
+                        ]
+                    )
+                ],
+            )
+            for p, parasha_name in enumerate(self.parasha_names)
+        ]
+        return chapters, parshiot
@@ -0,0 +1,502 @@
+import pathlib
+from collections import Counter
+from typing import Dict, Hashable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from parsing.book import Book, BookTaamSequenceResult
+from parsing.loader import CANTILLATION_DIR, load_books
+from parsing.query_cache import QueryCache
+from parsing.taam_codes import (
+    NUM_TAAM_CODES,
+    concatenate_taam_codes,
+    sequence_codes,
+)
+from parsing.taam_ngram_counts import TaamNGramCounts
+from parsing.taam_pages import (
+    DEFAULT_PAGE_SIZE,
+    TaamSearchPage,
+    TaamSequenceHit,
+    iter_verse_matches,
+)
+from parsing.taam_search import TaamSearchEngine
+from parsing.taam_stream import TaamStream
+from parsing.taam_suffix_array import TaamSuffixArray
+from parsing.verse import Verse
+
+TORAH_BOOK_NAMES = ["Genesis", "Exodus", "Leviticus", "Numbers", "Deuteronomy"]
+LEVELS = ("book", "parasha")
+
+
+class VerseLocation:
+    """
+    A VerseLocation is where a verse of a Corpus is: its book, parasha and
+    aliyah (if it is in one) and its chapter and verse numbers.
+    """
+
+    def __init__(
+        self,
+        book: str,
+        parasha: Optional[str],
+        aliyah: Optional[int],
+        chapter: int,
+        verse: int,
+    ):
+        self.book = book
+        self.parasha = parasha
+        self.aliyah = aliyah
+        self.chapter = chapter
+        self.verse = verse
+
+    def __repr__(self) -> str:
+        place = f"{self.book} {self.chapter}:{self.verse}"
+        if self.parasha is None:
+            return place
+        return f"{place} ({self.parasha}, aliyah {self.aliyah + 1})"
+
+
+class Corpus:
+    """
+    A Corpus is a sequence of books (e.g. the five books of the Torah) that are
+    searched and counted as one. The letters of all the books share one
+    TaamStream (see `TaamSearchEngine`), their verses are numbered with one
+    sequence of ordinals, and each ordinal is mapped to its book, parasha and
+    aliyah, so that results over the whole corpus can still be broken down by
+    book (or parasha).
+    """
+
+    def __init__(self, books: Sequence[Book]):
+        self.books = list(books)
+        self.engine = TaamSearchEngine(self.books)
+        # the ordinal of the first verse of each book
+        self.verse_starts = self.engine.verse_starts
+
+        # the hierarchy: the book, parasha (across the corpus) and aliyah of each
+        # verse (-1 for the verses that are not in an aliyah)
+        num_verses = int(self.verse_starts[-1])
+        self.parasha_names: List[str] = []
+        self.parasha_books: List[int] = []
+        self.verse_books = np.repeat(
+            np.arange(len(self.books), dtype=np.int32),
+            [len(book.verses) for book in self.books],
+        )
+        self.verse_parshiot = np.full(num_verses, -1, dtype=np.int32)
+        self.verse_aliyot = np.full(num_verses, -1, dtype=np.int32)
+        for book_idx, (book, start) in enumerate(
+            zip(self.books, self.verse_starts.tolist())
+        ):
+            for parasha in book.parshiot:
+                parasha_idx = len(self.parasha_names)
+                for aliyah_idx, aliyah in enumerate(parasha.aliyot):
+                    verses = slice(start + aliyah.start, start + aliyah.stop)
+                    self.verse_parshiot[verses] = parasha_idx
+                    self.verse_aliyot[verses] = aliyah_idx
+                self.parasha_names.append(parasha.name)
+                self.parasha_books.append(book_idx)
+        # whether each verse is in an aliyah (the `in_aliyot` of the books, laid
+        # end to end)
+        self.in_aliyot = self.verse_parshiot >= 0
+        # computed on first use
+        self._taam_ngram_counts = {}
+        self._taam_frequencies = {}
+
+    @classmethod
+    def load(
+        cls,
+        book_names: Sequence[str] = tuple(TORAH_BOOK_NAMES),
+        workers: Optional[int] = None,
+        data_dir: pathlib.Path = CANTILLATION_DIR,
+        columnar: bool = True,
+    ) -> "Corpus":
+        """
+        Load the books of a corpus (see `load_books`).
+
+        :param book_names: The names of the books, defaults to the books of the Torah
+        :param workers: The number of worker processes, defaults to one per CPU
+        :param data_dir: The directory containing the text files.
+        :param columnar: Whether to keep the books in their compiled arrays,
+                         defaults to True
+        :return: The Corpus.
+        """
+        return cls(load_books(list(book_names), workers, data_dir, columnar))
+
+    @property
+    def verses(self) -> List[Verse]:
+        """
+        Get the verses of all the books, in order (indexed by their ordinals).
+
+        :return: The verses.
+        """
+        return self.engine.verses
+
+    @property
+    def stream(self) -> TaamStream:
+        """
+        Get the letters with Taamim of all the books, laid out as one stream.
+
+        :return: The taam stream of the Corpus.
+        """
+        return self.engine.stream
+
+    @property
+    def query_cache(self) -> Optional[QueryCache]:
+        """
+        Get the cache of the results of queries on the Corpus.
+
+        :return: The query cache, or None if results are not cached.
+        """
+        return self.engine.query_cache
+
+    @query_cache.setter
+    def query_cache(self, query_cache: Optional[QueryCache]):
+        self.engine.query_cache = query_cache
+
+    def book(self, name: str) -> Book:
+        """
+        Get a book of the Corpus by name.
+
+        :param name: The name of the book.
+        :return: The book.
+        """
+        for book in self.books:
+            if book.name == name:
+                return book
+        assert False, f"No book named {name}"
+
+    def locate(self, ordinal: int) -> VerseLocation:
+        """
+        Find where a verse is in the Corpus.
+
+        :param ordinal: The ordinal of the verse.
+        :return: The location of the verse.
+        """
+        book_idx = int(self.verse_books[ordinal])
+        book = self.books[book_idx]
+        chapter, verse = book.verse_index.key(
+            ordinal - int(self.verse_starts[book_idx])
+        )
+        parasha_idx = int(self.verse_parshiot[ordinal])
+        if parasha_idx < 0:
+            return VerseLocation(book.name, None, None, chapter, verse)
+        return VerseLocation(
+            book.name,
+            self.parasha_names[parasha_idx],
+            int(self.verse_aliyot[ordinal]),
+            chapter,
+            verse,
+        )
+
+    def find_matches(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> Optional[Dict[int, List[List[int]]]]:
+        """
+        Find the verses of the Corpus that contain a sequence of Taamim (see
+        `TaamSearchEngine.find_matches`).
+
+        :param taam_sequence: The sequence of Taamim.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The ordinals of the verses with a match mapped to the word
+                 indices of their matches, in order, or None if the sequence is
+                 empty (once Meshartim are left out).
+        """
+        return self.engine.find_matches(taam_sequence, include_meshartim)
+
+    def find_verses_with_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> Dict[str, BookTaamSequenceResult]:
+        """
+        Find verses with a sequence of Taamim in the Corpus, broken down by book,
+        parasha and aliyah.
+
+        :param taam_sequence: The taam sequence to find.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The name of each book mapped to its results.
+        """
+        return self.engine.find_verses_with_taam_sequence(
+            taam_sequence, include_meshartim
+        )
+
+    def find_verses_with_taam_sequences(
+        self, taam_sequences: List[List[str]], include_meshartim: bool = True
+    ) -> List[Dict[str, BookTaamSequenceResult]]:
+        """
+        Find verses with each of several sequences of Taamim in the Corpus, in a
+        single pass (see `TaamSearchEngine.find_verses_with_taam_sequences`).
+
+        :param taam_sequences: The taam sequences to find.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The results for each sequence, in order.
+        """
+        return self.engine.find_verses_with_taam_sequences(
+            taam_sequences, include_meshartim
+        )
+
+    def count_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> int:
+        """
+        Count the matches of a sequence of Taamim in the verses of the aliyot of
+        the Corpus, in one pass over its stream (see `Book.count_taam_sequence`).
+
+        :param taam_sequence: The taam sequence to count.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The number of matches.
+        """
+        codes = sequence_codes(taam_sequence, include_meshartim)
+        if codes is None:
+            return 0
+        if len(codes) == 0:
+            # the stream cannot answer an empty sequence
+            return sum(
+                len(word_idxs)
+                for ordinal, word_idxs in iter_verse_matches(
+                    self.books, taam_sequence, include_meshartim
+                )
+                if self.in_aliyot[ordinal]
+            )
+
+        def count() -> int:
+            stream = self.stream
+            ordinals = np.unique(
+                stream.verses[stream.occurrences(codes, include_meshartim)]
+            )
+            ordinals = ordinals[self.in_aliyot[ordinals]]
+            return stream.count_matches(ordinals, codes, include_meshartim)
+
+        if self.query_cache is None:
+            return count()
+        key = self._query_key("count", tuple(codes), include_meshartim, None)
+        return self.query_cache.get_or_compute(key, count)
+
+    def has_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> bool:
+        """
+        Check whether a verse of the aliyot of the Corpus contains a sequence of
+        Taamim. The stream of the Corpus is searched a chunk of verses at a time,
+        stopping at the first match (see `iter_verses_with_taam_sequence`).
+
+        :param taam_sequence: The taam sequence to find.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: Whether the sequence is found.
+        """
+        hits = self.iter_verses_with_taam_sequence(taam_sequence, include_meshartim)
+        return next(hits, None) is not None
+
+    def iter_verses_with_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True, cursor: int = 0
+    ) -> Iterator[TaamSequenceHit]:
+        """
+        Find verses with a sequence of Taamim in the Corpus one at a time, in
+        order (see `TaamSearchEngine.iter_verses_with_taam_sequence`).
+
+        :param taam_sequence: The (non-empty) taam sequence to find.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :param cursor: The ordinal of the verse to start at, defaults to 0
+        :return: The hits, in order.
+        """
+        return self.engine.iter_verses_with_taam_sequence(
+            taam_sequence, include_meshartim, cursor
+        )
+
+    def page_verses_with_taam_sequence(
+        self,
+        taam_sequence: List[str],
+        include_meshartim: bool = True,
+        limit: int = DEFAULT_PAGE_SIZE,
+        offset: int = 0,
+        cursor: int = 0,
+    ) -> TaamSearchPage:
+        """
+        Find a page of the verses with a sequence of Taamim in the Corpus (see
+        `TaamSearchEngine.page_verses_with_taam_sequence`).
+
+        :param taam_sequence: The (non-empty) taam sequence to find.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :param limit: The number of verses on the page, defaults to DEFAULT_PAGE_SIZE
+        :param offset: The number of verses to skip (after the cursor), defaults to 0
+        :param cursor: The ordinal of the verse to start at, defaults to 0
+        :return: The page of hits.
+        """
+        return self.engine.page_verses_with_taam_sequence(
+            taam_sequence, include_meshartim, limit, offset, cursor
+        )
+
+    def find_verses_with_taam_pattern(
+        self, pattern: str, include_meshartim: bool = True
+    ) -> Dict[str, BookTaamSequenceResult]:
+        """
+        Find verses with a match of a taam pattern (see `TaamPattern`) in the
+        Corpus, broken down by book, parasha and aliyah.
+
+        :param pattern: The taam pattern to find.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The name of each book mapped to its results.
+        """
+        return self.engine.find_verses_with_taam_pattern(pattern, include_meshartim)
+
+    def suffix_array(self, include_meshartim: bool = True) -> TaamSuffixArray:
+        """
+        Get the suffix array of the Taamim of the Corpus (see
+        `TaamSearchEngine.suffix_array`).
+
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :return: The suffix array.
+        """
+        return self.engine.suffix_array(include_meshartim)
+
+    def distribution(
+        self,
+        taam_sequence: List[str],
+        include_meshartim: bool = True,
+        level: str = "book",
+    ) -> Dict[str, int]:
+        """
+        Count the matches of a sequence of Taamim in each book or parasha. As in
+        `count_taam_sequence`, only the verses of the aliyot are counted.
+
+        :param taam_sequence: The sequence of Taamim.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :param level: "book" or "parasha", defaults to "book"
+        :return: The name of each book (or parasha) mapped to the number of
+                 matches in it.
+        """
+        assert level in LEVELS, f"Invalid level: {level}"
+        matches = self.find_matches(taam_sequence, include_meshartim)
+        if matches is None:
+            # the stream cannot answer an empty sequence, so each verse is searched
+            matches = dict(
+                iter_verse_matches(self.books, taam_sequence, include_meshartim)
+            )
+        ordinals = np.fromiter(matches, dtype=np.int64, count=len(matches))
+        weights = np.asarray([len(seqs) for seqs in matches.values()], dtype=np.int64)
+        # the verses outside of the aliyot are left out
+        in_aliyot = self.in_aliyot[ordinals]
+        ordinals, weights = ordinals[in_aliyot], weights[in_aliyot]
+        if level == "book":
+            groups, names = self.verse_books[ordinals], [b.name for b in self.books]
+        else:
+            groups, names = self.verse_parshiot[ordinals], self.parasha_names
+        totals = np.bincount(groups, weights=weights, minlength=len(names))
+        return dict(zip(names, totals.astype(np.int64).tolist()))
+
+    def _query_key(
+        self, kind: str, query: Hashable, include_meshartim: bool, n: int
+    ) -> tuple:
+        scope = tuple(book.version for book in self.books)
+        return scope, kind, query, include_meshartim, n
+
+    def taam_ngram_counts(self, include_meshartim: bool = True) -> TaamNGramCounts:
+        """
+        Get the counts of the taam n-grams in the Corpus (counted in one pass over
+        the verses of the aliyot of every book, on first use).
+
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :return: The n-gram counts.
+        """
+        if include_meshartim not in self._taam_ngram_counts:
+            self._taam_ngram_counts[include_meshartim] = TaamNGramCounts.from_verses(
+                (
+                    verse
+                    for book in self.books
+                    for parasha in book.parshiot
+                    for aliyah in parasha.aliyot
+                    for verse in aliyah.verses
+                ),
+                include_meshartim,
+            )
+        return self._taam_ngram_counts[include_meshartim]
+
+    def count_n_taam_sequences(self, n: int, include_meshartim: bool = True) -> Counter:
+        """
+        Count the number of n-Taam sequences in the Corpus (see
+        `Book.count_n_taam_sequences`).
+
+        :param n: The length of the Taam sequences to count.
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :return: A Counter mapping taam sequences to their counts.
+        """
+
+        def count() -> Counter:
+            return self.taam_ngram_counts(include_meshartim).counts(n)
+
+        if self.query_cache is None:
+            return count()
+        key = self._query_key("ngrams", None, include_meshartim, n)
+        # the cached counts are shared, so callers get a copy
+        return Counter(self.query_cache.get_or_compute(key, count))
+
+    def count_n_taam_sequences_by_book(
+        self, n: int, include_meshartim: bool = True
+    ) -> Dict[str, Counter]:
+        """
+        Count the number of n-Taam sequences in each book of the Corpus.
+
+        :param n: The length of the Taam sequences to count.
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :return: The name of each book mapped to its counts.
+        """
+        return {
+            book.name: book.count_n_taam_sequences(n, include_meshartim)
+            for book in self.books
+        }
+
+    def taam_frequencies_by_book(self, include_meshartim: bool = True) -> np.ndarray:
+        """
+        Count the occurrences of each Taam in each book of the Corpus, with a
+        single count over the codes of all the books.
+
+        :param include_meshartim: Whether to count the Meshartim, defaults to True
+        :return: A (books x taam codes) array with the number of occurrences of
+                 each taam code in each book.
+        """
+        if include_meshartim not in self._taam_frequencies:
+            arrays = [
+                book.taam_codes
+                if include_meshartim
+                else book.taam_codes_without_meshartim
+                for book in self.books
+            ]
+            books = np.repeat(
+                np.arange(len(self.books)), [len(codes) for codes in arrays]
+            )
+            codes = concatenate_taam_codes(arrays)
+            frequencies = np.bincount(
+                books * NUM_TAAM_CODES + codes,
+                minlength=len(self.books) * NUM_TAAM_CODES,
+            ).reshape(len(self.books), NUM_TAAM_CODES)
+            frequencies.flags.writeable = False
+            self._taam_frequencies[include_meshartim] = frequencies
+        return self._taam_frequencies[include_meshartim]
+
+    def taam_frequencies(
+        self,
+        include_meshartim: bool = True,
+        book_names: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """
+        Count the occurrences of each Taam in the Corpus (or in some of its books).
+
+        :param include_meshartim: Whether to count the Meshartim, defaults to True
+        :param book_names: The names of the books to count, defaults to all of them
+        :return: An array with the number of occurrences of each taam code at its
+                 index (see `parsing.taam_codes.frequencies_by_name`).
+        """
+        frequencies = self.taam_frequencies_by_book(include_meshartim)
+        if book_names is not None:
+            frequencies = frequencies[
+                [self.books.index(self.book(name)) for name in book_names]
+            ]
+        return frequencies.sum(axis=0)
+
+    def __len__(self) -> int:
+        return len(self.verse_books)
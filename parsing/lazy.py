@@ -0,0 +1,120 @@
+import threading
+from collections import OrderedDict
+
+from parsing.verse import Verse
+
+DEFAULT_MAX_CACHED_VERSES = 512
+
+
+class VerseCache:
+    """
+    A bounded, least-recently-used cache of parsed verses. It can be shared
+    between books to bound the memory of several lazily-loaded books at once.
+    A pickled cache is pickled without its verses, which are parsed again.
+    """
+
+    def __init__(self, max_verses: int = DEFAULT_MAX_CACHED_VERSES):
+        assert max_verses > 0, f"Invalid cache size: {max_verses}"
+        self._max_verses = max_verses
+        self._verses: "OrderedDict[LazyVerse, Verse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, lazy_verse: "LazyVerse") -> Verse:
+        """
+        Get the parsed verse of a lazy verse, parsing it if it is not cached.
+
+        :param lazy_verse: The lazy verse.
+        :return: The parsed verse.
+        """
+        with self._lock:
+            verse = self._verses.get(lazy_verse)
+            if verse is not None:
+                self._verses.move_to_end(lazy_verse)
+                return verse
+
+        verse = Verse.from_string(lazy_verse.idx, lazy_verse.line)
+        with self._lock:
+            self._verses[lazy_verse] = verse
+            if len(self._verses) > self._max_verses:
+                self._verses.popitem(last=False)
+        return verse
+
+    def __getstate__(self) -> dict:
+        return {"max_verses": self._max_verses}
+
+    def __setstate__(self, state: dict):
+        self.__init__(state["max_verses"])
+
+    def __contains__(self, lazy_verse: "LazyVerse") -> bool:
+        return lazy_verse in self._verses
+
+    def __len__(self) -> int:
+        return len(self._verses)
+
+
+class LazyVerse(Verse):
+    """
+    A Verse that only keeps its line of text and parses it into Words and
+    Letters the first time it is touched. Parsed verses live in a VerseCache,
+    so they may be evicted and parsed again later.
+    """
+
+    def __init__(self, idx: int, line: str, cache: VerseCache):
+        self.idx = idx
+        self._line = line
+        self._cache = cache
+        self._maqaf_indices = []
+
+    @property
+    def line(self) -> str:
+        """
+        Get the line of text of the Verse.
+
+        :return: The line of text of the Verse.
+        """
+        return self._line
+
+    @property
+    def is_parsed(self) -> bool:
+        """
+        Check if the Verse is currently parsed (i.e. in its cache).
+
+        :return: True if the Verse is parsed, False otherwise.
+        """
+        return self in self._cache
+
+    @property
+    def _words(self):
+        return self._cache.get(self)._words
+
+    @property
+    def words(self):
+        return self._cache.get(self).words
+
+    @property
+    def taam_words(self):
+        return self._cache.get(self).taam_words
+
+    @property
+    def letters(self):
+        return self._cache.get(self).letters
+
+    @property
+    def taamim(self):
+        return self._cache.get(self).taamim
+
+    @property
+    def taamim_without_meshartim(self):
+        return self._cache.get(self).taamim_without_meshartim
+
+    @property
+    def taam_codes(self):
+        return self._cache.get(self).taam_codes
+
+    @property
+    def taam_codes_without_meshartim(self):
+        return self._cache.get(self).taam_codes_without_meshartim
+
+    @property
+    def nequdot(self):
+        return self._cache.get(self).nequdot
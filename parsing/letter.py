@@ -113,9 +113,9 @@ class Letter:
         :param new_name: The new name of the Taam.
         :return: True if the Taam was renamed, False otherwise.
         """
-        for taam in self.taamim:
+        for i, taam in enumerate(self._taamim):
             if taam.name == old_name:
-                taam.name = new_name
+                self._taamim[i] = taam.renamed(new_name)
                 return True
         return False
 
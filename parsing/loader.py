@@ -0,0 +1,74 @@
+import os
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from parsing.book import Book
+from parsing.compiled import CompiledBook
+
+CANTILLATION_DIR = (
+    pathlib.Path(__file__).parent.parent.resolve() / "data" / "cantillation"
+)
+
+
+def book_file_path(book_name: str, data_dir: pathlib.Path = CANTILLATION_DIR) -> str:
+    """
+    Get the path of the UXLC text file of a book.
+
+    :param book_name: The name of the book.
+    :param data_dir: The directory containing the text files.
+    :return: The path of the text file.
+    """
+    return str(pathlib.Path(data_dir) / f"{book_name.lower()}.txt")
+
+
+def _compile_book_file(file_path: str) -> CompiledBook:
+    """
+    Parse a book in a worker process and encode it for the trip back.
+
+    Only the flat arrays of the CompiledBook are pickled, which is much cheaper
+    than pickling the whole Letter/Word/Verse object graph.
+
+    :param file_path: The path to the text file.
+    :return: The compiled book.
+    """
+    book = Book.from_text_file(file_path)
+    return CompiledBook.from_parts(book.name, book.chapters, book.parshiot)
+
+
+def load_books(
+    book_names: List[str],
+    workers: Optional[int] = None,
+    data_dir: pathlib.Path = CANTILLATION_DIR,
+    columnar: bool = True,
+) -> List[Book]:
+    """
+    Load several books, parsing them in parallel worker processes.
+
+    :param book_names: The names of the books to load.
+    :param workers: The number of worker processes, defaults to one per CPU
+                    (at most one per book). With one worker, the books are
+                    parsed in this process.
+    :param data_dir: The directory containing the text files.
+    :param columnar: Whether to keep the books in their compiled arrays (see
+                     `Book.from_compiled_book`), defaults to True. Otherwise
+                     the parent rebuilds every Letter/Word/Verse object, one
+                     book after another.
+    :return: The books, in the same order as `book_names`.
+    """
+    file_paths = [book_file_path(book_name, data_dir) for book_name in book_names]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(file_paths))
+
+    if workers <= 1 and not columnar:
+        return [Book.from_text_file(file_path) for file_path in file_paths]
+
+    if workers <= 1:
+        compiled_books = [_compile_book_file(file_path) for file_path in file_paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            compiled_books = list(executor.map(_compile_book_file, file_paths))
+    return [
+        Book.from_compiled_book(compiled, columnar) for compiled in compiled_books
+    ]
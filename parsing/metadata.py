@@ -1,8 +1,18 @@
-from typing import List
+import json
+import os
+import pathlib
+import time
+from typing import Dict, List, Optional
 
 import requests
 
 API_BASE_URL = "https://www.sefaria.org/api/v2/raw/index"
+METADATA_FORMAT_VERSION = 1
+SNAPSHOT_DIR = pathlib.Path(__file__).parent.parent.resolve() / "data" / "metadata"
+CACHE_DIR_ENV_VAR = "QUANT_TKN_CACHE_DIR"
+OFFLINE_ENV_VAR = "QUANT_TKN_OFFLINE"
+DEFAULT_CACHE_DIR = pathlib.Path("~/.cache/quant-tkn/metadata").expanduser()
+DEFAULT_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
 
 
 class ChapterVerseMetadata:
@@ -140,31 +150,183 @@ class ParashaMetadata:
         return self._chapter_verse_end
 
 
+class MetadataStore:
+    """
+    A versioned, local store for the raw aliyah/parasha metadata of each book.
+
+    Lookups go through an in-process memo, a read-through on-disk cache (whose
+    entries expire after a TTL), the snapshots bundled with the repository and
+    finally the Sefaria API. A cached entry (e.g. one written by `refresh`)
+    takes precedence over the snapshot of its book. In offline mode the API is
+    never contacted and expired cache entries are used rather than failing.
+    """
+
+    def __init__(
+        self,
+        snapshot_dir: Optional[pathlib.Path] = SNAPSHOT_DIR,
+        cache_dir: Optional[pathlib.Path] = None,
+        ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS,
+        offline: Optional[bool] = None,
+    ):
+        if cache_dir is None:
+            cache_dir = pathlib.Path(
+                os.environ.get(CACHE_DIR_ENV_VAR, DEFAULT_CACHE_DIR)
+            ).expanduser()
+        if offline is None:
+            offline = os.environ.get(OFFLINE_ENV_VAR, "") not in ("", "0")
+
+        self._snapshot_dir = (
+            pathlib.Path(snapshot_dir) if snapshot_dir is not None else None
+        )
+        self._cache_dir = pathlib.Path(cache_dir)
+        self._ttl_seconds = ttl_seconds
+        self._offline = offline
+        self._memo: Dict[str, dict] = {}
+
+    @property
+    def offline(self) -> bool:
+        """
+        Whether the store is forbidden from contacting the Sefaria API.
+
+        :return: True if the store is in offline mode, False otherwise.
+        """
+        return self._offline
+
+    @staticmethod
+    def _file_name(book_name: str) -> str:
+        return f"{book_name.lower()}.json"
+
+    @staticmethod
+    def _read_entry(path: pathlib.Path) -> Optional[dict]:
+        """
+        Read a stored metadata entry, ignoring missing files and entries
+        written with a different format version.
+
+        :param path: The path of the entry.
+        :return: The entry, or None if there is no usable entry at the path.
+        """
+        if not path.is_file():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != METADATA_FORMAT_VERSION:
+            return None
+        return entry
+
+    def _is_fresh(self, path: pathlib.Path) -> bool:
+        return time.time() - path.stat().st_mtime <= self._ttl_seconds
+
+    @staticmethod
+    def _fetch(book_name: str) -> dict:
+        """
+        Fetch the metadata of a book from the Sefaria API.
+
+        :param book_name: The name of the book whose metadata to fetch.
+        :return: The metadata entry of the book.
+        """
+        response = requests.get(f"{API_BASE_URL}/{book_name}", timeout=5)
+        assert response.status_code == 200
+        metadata = response.json()
+
+        return {
+            "version": METADATA_FORMAT_VERSION,
+            "book": metadata.get("title", book_name),
+            "source": f"{API_BASE_URL}/{book_name}",
+            "parshiot": [
+                {"name": parasha["sharedTitle"], "refs": parasha["refs"]}
+                for parasha in metadata["alt_structs"]["Parasha"]["nodes"]
+            ],
+        }
+
+    def _write_cache(self, book_name: str, entry: dict):
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._cache_dir / MetadataStore._file_name(book_name)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def refresh(self, book_name: str) -> dict:
+        """
+        Re-fetch the metadata of a book from the Sefaria API and write it to the
+        cache. (Pointing `cache_dir` at `SNAPSHOT_DIR` regenerates the bundled
+        snapshots.)
+
+        :param book_name: The name of the book whose metadata to refresh.
+        :return: The metadata entry of the book.
+        """
+        assert not self._offline, f"Cannot refresh {book_name} metadata offline"
+        entry = MetadataStore._fetch(book_name)
+        self._write_cache(book_name, entry)
+        self._memo[book_name.lower()] = entry
+        return entry
+
+    def get(self, book_name: str) -> dict:
+        """
+        Get the metadata entry of a book.
+
+        :param book_name: The name of the book (case-insensitive).
+        :return: The metadata entry of the book.
+        """
+        key = book_name.lower()
+        if key in self._memo:
+            return self._memo[key]
+
+        file_name = MetadataStore._file_name(book_name)
+        cache_path = self._cache_dir / file_name
+        entry = MetadataStore._read_entry(cache_path)
+        if entry is not None and not self._offline and not self._is_fresh(cache_path):
+            try:
+                entry = self.refresh(book_name)
+            except (requests.RequestException, AssertionError):
+                # keep serving the expired entry if Sefaria is unreachable
+                pass
+
+        if entry is None and self._snapshot_dir is not None:
+            entry = MetadataStore._read_entry(self._snapshot_dir / file_name)
+
+        if entry is None:
+            assert not self._offline, f"No local metadata for {book_name}"
+            entry = self.refresh(book_name)
+
+        self._memo[key] = entry
+        return entry
+
+
+DEFAULT_METADATA_STORE = MetadataStore()
+
+
 class BookMetadata:
     """
     Metadata for a book. For each book, we have a list of parashiot (parasha metadata).
     """
 
     @staticmethod
-    def _extract_metadata(book_name: str) -> List[ParashaMetadata]:
+    def _extract_metadata(
+        book_name: str, store: MetadataStore
+    ) -> List[ParashaMetadata]:
         """
         Get the metadata of the book.
 
         :param book_name: The name of the book whose metadata to extract.
+        :param store: The metadata store to read from.
         :return: The metadata of the book.
         """
-        response = requests.get(f"{API_BASE_URL}/{book_name}", timeout=5)
-        assert response.status_code == 200
-        metadata = response.json()
+        metadata = store.get(book_name)
 
         return [
-            ParashaMetadata(name=parasha["sharedTitle"], aliya_metadata=parasha["refs"])
-            for parasha in metadata["alt_structs"]["Parasha"]["nodes"]
+            ParashaMetadata(name=parasha["name"], aliya_metadata=parasha["refs"])
+            for parasha in metadata["parshiot"]
         ]
 
-    def __init__(self, book_name: str):
+    def __init__(self, book_name: str, store: Optional[MetadataStore] = None):
+        if store is None:
+            store = DEFAULT_METADATA_STORE
         self._name = book_name
-        self._parshiot = BookMetadata._extract_metadata(book_name)
+        self._parshiot = BookMetadata._extract_metadata(book_name, store)
 
     @property
     def name(self) -> str:
@@ -1,15 +1,31 @@
-from parsing.symbols import (NEQUDOT_NAMES, NEQUDOT_NAMES_TO_SYMBOLS,
+from typing import Dict, Tuple
+
+from parsing.symbols import (NEQUDOT_CODES_TO_NAMES, NEQUDOT_NAMES,
+                             NEQUDOT_NAMES_TO_CODES, NEQUDOT_NAMES_TO_SYMBOLS,
                              NEQUDOT_SYMBOLS, NEQUDOT_SYMBOLS_TO_NAMES)
 
 
 class Niqud:
     """
     A niqud is a vowel symbol in the Hebrew Bible.
+
+    Like Taamim, nequdot are interned, immutable flyweights with an integer code.
     """
 
-    def __init__(self, name: str, symbol: str):
-        self.name = name
-        self.symbol = symbol
+    __slots__ = ("_name", "_symbol", "_code")
+
+    _registry: Dict[Tuple[str, str], "Niqud"] = {}
+
+    def __new__(cls, name: str, symbol: str) -> "Niqud":
+        key = (name, symbol)
+        niqud = cls._registry.get(key)
+        if niqud is None:
+            niqud = super().__new__(cls)
+            niqud._name = name
+            niqud._symbol = symbol
+            niqud._code = NEQUDOT_NAMES_TO_CODES.get(name, 0)
+            cls._registry[key] = niqud
+        return niqud
 
     @classmethod
     def from_symbol(cls, symbol: str) -> "Niqud":
@@ -33,8 +49,52 @@ class Niqud:
         assert name in NEQUDOT_NAMES, f"Invalid niqud name: {name}"
         return cls(name, NEQUDOT_NAMES_TO_SYMBOLS[name])
 
+    @classmethod
+    def from_code(cls, code: int) -> "Niqud":
+        """
+        Create a Niqud object from its integer code.
+
+        :param code: The code of the Niqud.
+        :return: A Niqud object.
+        """
+        assert code in NEQUDOT_CODES_TO_NAMES, f"Invalid niqud code: {code}"
+        return cls.from_name(NEQUDOT_CODES_TO_NAMES[code])
+
+    @property
+    def name(self) -> str:
+        """
+        Get the name of the Niqud.
+
+        :return: The name of the Niqud.
+        """
+        return self._name
+
+    @property
+    def symbol(self) -> str:
+        """
+        Get the symbol of the Niqud.
+
+        :return: The symbol of the Niqud.
+        """
+        return self._symbol
+
+    @property
+    def code(self) -> int:
+        """
+        Get the integer code of the Niqud.
+
+        :return: The code of the Niqud.
+        """
+        return self._code
+
+    def __reduce__(self):
+        return Niqud, (self._name, self._symbol)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def __repr__(self):
         return self.symbol
-
-    def __eq__(self, value: object) -> bool:
-        return self.name == value.name and self.symbol == value.symbol
@@ -0,0 +1,439 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from parsing.book import Book
+from parsing.taam_automaton import find_taam_sequences
+from parsing.taam_codes import concatenate_taam_codes, sequence_codes
+from parsing.taam_ngram_counts import TaamNGramCounts, merge_ngrams, ngram_counter
+from parsing.taam_pattern import compile_taam_pattern
+from parsing.taam_stream import TaamStream
+
+# the arrays of a TaamStream that are shared with the workers
+STREAM_ARRAYS = (
+    "verses",
+    "words",
+    "has_mesharet",
+    "letter_offsets",
+    "codes",
+    "resume",
+    "verse_offsets",
+)
+# the number of verse ranges the work is split into for each worker, so that a
+# worker that finishes early can take another range
+TASKS_PER_WORKER = 4
+# the alignment (in bytes) of the arrays in the shared memory block
+ALIGNMENT = 64
+
+VerseRange = Tuple[int, int]
+
+
+class SharedTaamStream:
+    """
+    A SharedTaamStream keeps the arrays of a TaamStream (with its `code_table`)
+    and other arrays about its verses in one block of shared memory, so that
+    worker processes can search the stream without a copy of it: a worker
+    attaches to the block by its name and layout and views the arrays in place.
+
+    The process that creates the block must `unlink` it once no process needs it.
+    """
+
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        layout: Dict[str, Tuple[str, Tuple[int, ...], int]],
+    ):
+        self.shm = shm
+        # the dtype, shape and offset (in the block) of each array
+        self.layout = layout
+        self.arrays = {
+            name: np.ndarray(shape, np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for name, (dtype, shape, offset) in layout.items()
+        }
+        for array in self.arrays.values():
+            array.flags.writeable = False
+        self.stream = TaamStream(
+            *(self.arrays[name] for name in STREAM_ARRAYS),
+            code_table=self.arrays["code_table"],
+        )
+
+    @classmethod
+    def create(
+        cls, stream: TaamStream, arrays: Dict[str, np.ndarray]
+    ) -> "SharedTaamStream":
+        """
+        Copy a stream and other arrays into a new block of shared memory.
+
+        :param stream: The stream.
+        :param arrays: The other arrays, by name.
+        :return: The shared stream.
+        """
+        arrays = {
+            **{name: np.asarray(getattr(stream, name)) for name in STREAM_ARRAYS},
+            "code_table": stream.code_table,
+            **arrays,
+        }
+        layout, size = {}, 0
+        for name, array in arrays.items():
+            size = -(-size // ALIGNMENT) * ALIGNMENT
+            layout[name] = (array.dtype.str, array.shape, size)
+            size += array.nbytes
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, array in arrays.items():
+            dtype, shape, offset = layout[name]
+            view = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf, offset=offset)
+            view[...] = array
+        return cls(shm, layout)
+
+    @classmethod
+    def attach(
+        cls, name: str, layout: Dict[str, Tuple[str, Tuple[int, ...], int]]
+    ) -> "SharedTaamStream":
+        """
+        Attach to a shared stream created by another process.
+
+        :param name: The name of the shared memory block.
+        :param layout: The layout of the arrays in the block.
+        :return: The shared stream.
+        """
+        return cls(shared_memory.SharedMemory(name=name), layout)
+
+    @property
+    def name(self) -> str:
+        """
+        Get the name of the shared memory block.
+
+        :return: The name of the block.
+        """
+        return self.shm.name
+
+    def close(self):
+        """
+        Stop using the shared memory block in this process.
+        """
+        self.arrays.clear()
+        self.stream = None
+        self.shm.close()
+
+    def unlink(self):
+        """
+        Free the shared memory block (once every process has closed it).
+        """
+        self.shm.unlink()
+
+
+# the shared stream of a worker process
+_WORKER_STREAM: Optional[SharedTaamStream] = None
+
+
+def _attach_worker(name: str, layout: Dict[str, Tuple[str, Tuple[int, ...], int]]):
+    global _WORKER_STREAM
+    _WORKER_STREAM = SharedTaamStream.attach(name, layout)
+
+
+def _letter_range(verse_range: VerseRange) -> Tuple[int, int]:
+    offsets = _WORKER_STREAM.stream.verse_offsets
+    return int(offsets[verse_range[0]]), int(offsets[verse_range[1]])
+
+
+def _find_matches_task(
+    verse_range: VerseRange, codes: List[int], include_meshartim: bool
+) -> Dict[int, List[List[int]]]:
+    stream = _WORKER_STREAM.stream
+    starts = stream.occurrences(codes, include_meshartim, *_letter_range(verse_range))
+    return stream.match_verses(stream.verses[starts], codes, include_meshartim)
+
+
+def _count_task(
+    verse_range: VerseRange, codes: List[int], include_meshartim: bool
+) -> int:
+    stream = _WORKER_STREAM.stream
+    starts = stream.occurrences(codes, include_meshartim, *_letter_range(verse_range))
+    ordinals = np.unique(stream.verses[starts])
+    ordinals = ordinals[_WORKER_STREAM.arrays["in_aliyot"][ordinals]]
+    return stream.count_matches(ordinals, codes, include_meshartim)
+
+
+def _find_all_task(
+    verse_range: VerseRange, taam_sequences: List[List[str]], include_meshartim: bool
+) -> List[Optional[Dict[int, List[List[int]]]]]:
+    return find_taam_sequences(
+        _WORKER_STREAM.stream,
+        taam_sequences,
+        include_meshartim,
+        *_letter_range(verse_range),
+    )
+
+
+def _pattern_task(
+    verse_range: VerseRange, pattern: str, include_meshartim: bool
+) -> Dict[int, List[List[int]]]:
+    stream = _WORKER_STREAM.stream
+    taam_pattern = compile_taam_pattern(pattern)
+    candidates = taam_pattern.candidate_verses(
+        stream, include_meshartim, *_letter_range(verse_range)
+    )
+    matches = {}
+    for ordinal in candidates.tolist():
+        word_idxs = taam_pattern.match_verse(stream, ordinal, include_meshartim)
+        if len(word_idxs) > 0:
+            matches[ordinal] = word_idxs
+    return matches
+
+
+def _ngrams_task(
+    verse_range: VerseRange, lengths: List[int], include_meshartim: bool
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    # the taam codes of the verses (see `Verse.taam_codes`), of which only the
+    # verses in an aliyah are counted
+    arrays = _WORKER_STREAM.arrays
+    suffix = "" if include_meshartim else "_without_meshartim"
+    codes, offsets = arrays["taam_codes" + suffix], arrays["taam_offsets" + suffix]
+    start, stop = verse_range
+    lengths_of_verses = np.diff(offsets[start : stop + 1])
+    in_aliyot = arrays["in_aliyot"][start:stop]
+    keep = np.repeat(in_aliyot, lengths_of_verses)
+    counts = TaamNGramCounts(
+        codes[offsets[start] : offsets[stop]][keep],
+        np.cumsum([0, *lengths_of_verses[in_aliyot]], dtype=np.int64),
+        max(lengths),
+    )
+    return [counts.ngrams(n) for n in lengths]
+
+
+class ParallelTaamSearch:
+    """
+    A ParallelTaamSearch searches and counts several books with a pool of worker
+    processes. The books are laid out as one TaamStream (with the verse ordinals
+    of `TaamSearchEngine`) in shared memory (see `SharedTaamStream`), and each
+    query is split into ranges of whole parshiot of about as many letters, which
+    the workers search side by side. The results of the ranges are merged in
+    order, so they are the same as those of a search in one process.
+
+    The pool and the shared memory are kept until `close` is called (or the
+    `with` block that the search is used in ends).
+    """
+
+    def __init__(self, books: Sequence[Book], workers: Optional[int] = None):
+        self.books = list(books)
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        assert self.workers > 0, f"Invalid number of workers: {self.workers}"
+        stream = TaamStream.concatenate([book.taam_stream for book in self.books])
+        self.ranges = self._split(stream)
+        verses = [verse for book in self.books for verse in book.verses]
+        arrays = {
+            "in_aliyot": np.concatenate(
+                [np.zeros(0, dtype=bool)] + [book.in_aliyot for book in self.books]
+            )
+        }
+        for suffix, include_meshartim in [("", True), ("_without_meshartim", False)]:
+            verse_codes = [
+                verse.taam_codes
+                if include_meshartim
+                else verse.taam_codes_without_meshartim
+                for verse in verses
+            ]
+            arrays["taam_codes" + suffix] = concatenate_taam_codes(verse_codes)
+            arrays["taam_offsets" + suffix] = np.cumsum(
+                [0] + [len(codes) for codes in verse_codes], dtype=np.int64
+            )
+        self.shared = SharedTaamStream.create(stream, arrays)
+        try:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_attach_worker,
+                initargs=(self.shared.name, self.shared.layout),
+            )
+        except BaseException:
+            # the block would outlive this process if it were not freed here
+            self.shared.close()
+            self.shared.unlink()
+            raise
+
+    def _split(self, stream: TaamStream) -> List[VerseRange]:
+        """
+        Split the verses of the books into ranges that start on a parasha and
+        hold about as many letters each.
+
+        :param stream: The letters of the books, laid out as one stream.
+        :return: The ranges of verse ordinals, in order.
+        """
+        boundaries, book_start = {0, stream.num_verses}, 0
+        for book in self.books:
+            boundaries.update(
+                book_start + parasha.aliyot[0].start
+                for parasha in book.parshiot
+                if len(parasha.aliyot) > 0
+            )
+            book_start += len(book.verses)
+        boundaries = np.asarray(sorted(boundaries), dtype=np.int64)
+
+        # the boundaries closest to equal shares of the letters
+        num_ranges = min(self.workers * TASKS_PER_WORKER, len(boundaries) - 1)
+        letters = stream.verse_offsets[boundaries]
+        targets = np.linspace(0, len(stream), num_ranges + 1)
+        closest = np.abs(letters[None, :] - targets[:, None]).argmin(axis=1)
+        cuts = np.unique(
+            np.concatenate([[0], boundaries[closest], [stream.num_verses]])
+        )
+        return list(zip(cuts[:-1].tolist(), cuts[1:].tolist()))
+
+    def _map(self, task, *args) -> list:
+        return list(
+            self.executor.map(
+                task, self.ranges, *([arg] * len(self.ranges) for arg in args)
+            )
+        )
+
+    @property
+    def stream(self) -> TaamStream:
+        """
+        Get the letters of the books, laid out as one stream (in shared memory).
+
+        :return: The taam stream.
+        """
+        return self.shared.stream
+
+    def find_matches(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> Optional[Dict[int, List[List[int]]]]:
+        """
+        Find the verses that contain a sequence of Taamim (see
+        `TaamSearchEngine.find_matches`).
+
+        :param taam_sequence: The sequence of Taamim.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The ordinals of the verses with a match mapped to the word
+                 indices of their matches, in order, or None if the sequence is
+                 empty (once Meshartim are left out).
+        """
+        codes = sequence_codes(taam_sequence, include_meshartim)
+        if codes is None:
+            return {}
+        if len(codes) == 0:
+            return None
+        matches = {}
+        for range_matches in self._map(_find_matches_task, codes, include_meshartim):
+            matches.update(range_matches)
+        return matches
+
+    def find_all_matches(
+        self, taam_sequences: List[List[str]], include_meshartim: bool = True
+    ) -> List[Optional[Dict[int, List[List[int]]]]]:
+        """
+        Find the verses that contain each of several sequences of Taamim, with
+        one pass of a `TaamAutomaton` over each range.
+
+        :param taam_sequences: The sequences of Taamim.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The matches of each sequence (see `find_matches`), in order.
+        """
+        # empty sequences (once Meshartim are left out) cannot be searched
+        all_codes = [
+            sequence_codes(taam_sequence, include_meshartim)
+            for taam_sequence in taam_sequences
+        ]
+        results = [
+            None if codes is not None and len(codes) == 0 else {}
+            for codes in all_codes
+        ]
+        for range_results in self._map(
+            _find_all_task, taam_sequences, include_meshartim
+        ):
+            for matches, range_matches in zip(results, range_results):
+                if matches is not None:
+                    matches.update(range_matches)
+        return results
+
+    def find_pattern(
+        self, pattern: str, include_meshartim: bool = True
+    ) -> Dict[int, List[List[int]]]:
+        """
+        Find the verses with a match of a taam pattern (see `TaamPattern.find`).
+
+        :param pattern: The taam pattern.
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :return: The ordinals of the verses with a match mapped to the word
+                 indices of their matches, in order.
+        """
+        # compile the pattern here first, so that an invalid one fails right away
+        compile_taam_pattern(pattern)
+        matches = {}
+        for range_matches in self._map(_pattern_task, pattern, include_meshartim):
+            matches.update(range_matches)
+        return matches
+
+    def count_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> int:
+        """
+        Count the matches of a sequence of Taamim in the verses of the aliyot
+        (see `Book.count_taam_sequence`).
+
+        :param taam_sequence: The sequence of Taamim.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The number of matches.
+        """
+        codes = sequence_codes(taam_sequence, include_meshartim)
+        if codes is None:
+            return 0
+        if len(codes) == 0:
+            # the stream cannot answer an empty sequence, so the verses of the
+            # aliyot are counted one at a time here
+            return sum(
+                book.count_taam_sequence(taam_sequence, include_meshartim)
+                for book in self.books
+            )
+        return sum(self._map(_count_task, codes, include_meshartim))
+
+    def ngrams(
+        self, lengths: Sequence[int], include_meshartim: bool = True
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Count the taam n-grams of several lengths in the verses of the aliyot
+        (see `TaamNGramCounts.ngrams`).
+
+        :param lengths: The lengths of the n-grams.
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :return: For each length, the codes of the n-grams (one sorted row each)
+                 and their counts.
+        """
+        lengths = list(lengths)
+        assert all(n > 0 for n in lengths), f"Invalid n-gram lengths: {lengths}"
+        parts = self._map(_ngrams_task, lengths, include_meshartim)
+        return [
+            merge_ngrams([range_ngrams[i] for range_ngrams in parts], n)
+            for i, n in enumerate(lengths)
+        ]
+
+    def count_n_taam_sequences(self, n: int, include_meshartim: bool = True) -> Counter:
+        """
+        Count the number of n-Taam sequences in the verses of the aliyot (see
+        `Book.count_n_taam_sequences`).
+
+        :param n: The length of the Taam sequences to count.
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :return: A Counter mapping taam sequences to their counts.
+        """
+        return ngram_counter(*self.ngrams([n], include_meshartim)[0])
+
+    def close(self):
+        """
+        Shut the worker processes down and free the shared memory.
+        """
+        self.executor.shutdown()
+        self.shared.close()
+        self.shared.unlink()
+
+    def __enter__(self) -> "ParallelTaamSearch":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
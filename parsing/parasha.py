@@ -1,8 +1,13 @@
 from typing import Counter, List
 
+import numpy as np
+
 from parsing.aliyah import Aliyah, AliyahTaamSequenceResult
 from parsing.chapter import Chapter
 from parsing.metadata import ParashaMetadata
+from parsing.taam_codes import concatenate_taam_codes, taam_frequencies
+from parsing.taam_ngram_counts import TaamNGramCounts
+from parsing.verse_index import VerseIndex, VerseRange
 
 
 class ParashaTaamSequenceResult:
@@ -33,6 +38,10 @@ class Parasha:
     def __init__(self, name: str, aliyot: List[Aliyah]) -> None:
         self._name = name
         self._aliyot = aliyot
+        # computed on first use
+        self._taam_codes = None
+        self._taam_codes_without_meshartim = None
+        self._taam_ngram_counts = {}
 
     @classmethod
     def from_chapters(
@@ -47,30 +56,27 @@ class Parasha:
         :param chapters: The sequence of chapters in a book.
         :return: The Parasha object.
         """
+        return cls.from_verse_index(metadata, VerseIndex(chapters))
+
+    @classmethod
+    def from_verse_index(
+        cls, metadata: ParashaMetadata, verse_index: VerseIndex
+    ) -> "Parasha":
+        """
+        Extract the Parasha from the verse index of a book and the Parasha's
+        metadata. Each aliyah is a range of the book's verses.
+
+        :param metadata: Metadata of the parasha containing information about
+                         where aliyot start and end.
+        :param verse_index: The index of the verses in a book.
+        :return: The Parasha object.
+        """
         aliyot = []
         for aliyah in metadata.aliyah_metadata:
-            aliyah_start_chapter_idx = aliyah.start_chapter_verse.chapter_idx
-            aliyah_end_chapter_idx = aliyah.end_chapter_verse.chapter_idx
-            aliyah_start_verse_idx = aliyah.start_chapter_verse.verse_idx
-            aliyah_end_verse_idx = aliyah.end_chapter_verse.verse_idx
-            verses = []
-            for chapter in chapters:
-                if chapter.idx < aliyah_start_chapter_idx:
-                    continue
-                if chapter.idx > aliyah_end_chapter_idx:
-                    break
-                for verse in chapter.verses:
-                    if (
-                        chapter.idx == aliyah_start_chapter_idx
-                        and verse.idx < aliyah_start_verse_idx
-                    ):
-                        continue
-                    if (
-                        chapter.idx == aliyah_end_chapter_idx
-                        and verse.idx > aliyah_end_verse_idx
-                    ):
-                        break
-                    verses.append(verse)
+            start, end = aliyah.start_chapter_verse, aliyah.end_chapter_verse
+            verses = verse_index.range(
+                (start.chapter_idx, start.verse_idx), (end.chapter_idx, end.verse_idx)
+            )
             aliyot.append(Aliyah(aliyah.idx, verses))
         return cls(metadata.name, aliyot)
 
@@ -92,6 +98,56 @@ class Parasha:
         """
         return self._aliyot
 
+    @property
+    def verses(self) -> VerseRange:
+        """
+        Get the verses in the Parasha, from the start of its first aliyah to the
+        end of its last aliyah.
+
+        :return: The verses in the Parasha.
+        """
+        return VerseRange.spanning(self._aliyot[0].verses, self._aliyot[-1].verses)
+
+    @property
+    def taam_codes(self) -> np.ndarray:
+        """
+        Get the integer codes of the Taamim in the Parasha.
+
+        :return: A read-only array with the code of each Taam in the Parasha.
+        """
+        if self._taam_codes is None:
+            self._taam_codes = concatenate_taam_codes(
+                aliyah.taam_codes for aliyah in self.aliyot
+            )
+        return self._taam_codes
+
+    @property
+    def taam_codes_without_meshartim(self) -> np.ndarray:
+        """
+        Get the integer codes of the Taamim in the Parasha without the Meshartim.
+
+        :return: A read-only array with the code of each Taam in the Parasha
+                 that is not a Mesharet.
+        """
+        if self._taam_codes_without_meshartim is None:
+            self._taam_codes_without_meshartim = concatenate_taam_codes(
+                aliyah.taam_codes_without_meshartim for aliyah in self.aliyot
+            )
+        return self._taam_codes_without_meshartim
+
+    def taam_frequencies(self, include_meshartim: bool = True) -> np.ndarray:
+        """
+        Count the occurrences of each Taam in the Parasha.
+
+        :param include_meshartim: Whether to count the Meshartim, defaults to True
+        :return: An array with the number of occurrences of each taam code at its
+                 index (see `parsing.taam_codes.frequencies_by_name`).
+        """
+        codes = (
+            self.taam_codes if include_meshartim else self.taam_codes_without_meshartim
+        )
+        return taam_frequencies(codes)
+
     def find_verses_with_taam_sequence(
         self, taam_sequence: List[str], include_meshartim: bool = True
     ) -> ParashaTaamSequenceResult:
@@ -112,6 +168,53 @@ class Parasha:
                 verses_by_aliyah.append(aliyah_verse_match_pairs)
         return verses_by_aliyah
 
+    def count_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> int:
+        """
+        Count the matches of a sequence of Taamim in the verses of the Parasha's
+        aliyot.
+
+        :param taam_sequence: The sequence of Taamim.
+        :param include_meshartim: Whether to include Meshartim in the search.
+        :return: The number of matches.
+        """
+        return sum(
+            aliyah.count_taam_sequence(taam_sequence, include_meshartim)
+            for aliyah in self.aliyot
+        )
+
+    def has_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> bool:
+        """
+        Check whether a verse of the Parasha's aliyot contains a sequence of
+        Taamim, stopping at the first match.
+
+        :param taam_sequence: The sequence of Taamim.
+        :param include_meshartim: Whether to include Meshartim in the search.
+        :return: Whether the sequence is found.
+        """
+        return any(
+            aliyah.has_taam_sequence(taam_sequence, include_meshartim)
+            for aliyah in self.aliyot
+        )
+
+    def taam_ngram_counts(self, include_meshartim: bool = True) -> TaamNGramCounts:
+        """
+        Get the counts of the taam n-grams in the Parasha (counted on first use,
+        over the verses of its aliyot).
+
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :return: The n-gram counts.
+        """
+        if include_meshartim not in self._taam_ngram_counts:
+            self._taam_ngram_counts[include_meshartim] = TaamNGramCounts.from_verses(
+                (verse for aliyah in self.aliyot for verse in aliyah.verses),
+                include_meshartim,
+            )
+        return self._taam_ngram_counts[include_meshartim]
+
     def count_n_taam_sequences(self, n: int, include_meshartim: bool = True) -> Counter:
         """
         Count the number of n-Taam sequences in the Parasha.
@@ -120,10 +223,7 @@ class Parasha:
         :param include_meshartim: Whether to include Meshartim in the search.
         :return: A counter object with the n-Taam sequences and their counts.
         """
-        totals = Counter()
-        for aliyah in self.aliyot:
-            totals += aliyah.count_n_taam_sequences(n, include_meshartim)
-        return totals
+        return self.taam_ngram_counts(include_meshartim).counts(n)
 
     def __len__(self) -> int:
         return sum(len(aliyah) for aliyah in self.aliyot)
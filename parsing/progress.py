@@ -0,0 +1,109 @@
+import contextlib
+import time
+from collections import Counter
+from typing import Dict, Iterator
+
+from parsing.lazy import LazyVerse
+from parsing.verse import Verse
+
+
+class ParseReporter:
+    """
+    Callbacks through which the parsing layer reports its progress. The base
+    class does nothing, so parsing pays no instrumentation cost by default.
+    """
+
+    def start(self, total_verses: int):
+        """
+        Called once the lines of a book have been classified.
+
+        :param total_verses: The number of verses that will be created.
+        """
+
+    def advance(self, verse: Verse):
+        """
+        Called after each verse is created.
+
+        :param verse: The verse that was created.
+        """
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Wrap a stage of parsing (e.g. "classify_lines", "tokenize_verses",
+        "metadata" or "extract_parshiot").
+
+        :param name: The name of the stage.
+        """
+        yield
+
+    def finish(self):
+        """
+        Called once the book has been built.
+        """
+
+
+NULL_REPORTER = ParseReporter()
+
+
+class ProfilingReporter(ParseReporter):
+    """
+    A ParseReporter that records how long each stage takes and how many
+    objects of each kind were created (across every book it is used for).
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = Counter()
+        self.counts: Dict[str, int] = Counter()
+
+    def advance(self, verse: Verse):
+        self.counts["verses"] += 1
+        # counting the words of a lazy verse would parse it
+        if isinstance(verse, LazyVerse):
+            return
+        words = verse._words
+        letters = verse.letters
+        self.counts["words"] += len(words)
+        self.counts["letters"] += len(letters)
+        self.counts["taamim"] += sum(len(letter.taamim) for letter in letters)
+        self.counts["nequdot"] += len(verse.nequdot)
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+
+    def summary(self) -> str:
+        """
+        Summarize the recorded timings and counts.
+
+        :return: A human-readable summary.
+        """
+        lines = [f"{name}: {seconds * 1000:.1f} ms" for name, seconds in self.timings.items()]
+        lines += [f"{kind}: {count}" for kind, count in self.counts.items()]
+        return "\n".join(lines)
+
+
+class TqdmReporter(ParseReporter):
+    """
+    A ParseReporter that shows a tqdm progress bar over the verses of a book.
+    Requires tqdm to be installed.
+    """
+
+    def __init__(self, **tqdm_kwargs):
+        self._tqdm_kwargs = tqdm_kwargs
+        self._bar = None
+
+    def start(self, total_verses: int):
+        import tqdm
+
+        self._bar = tqdm.tqdm(total=total_verses, **self._tqdm_kwargs)
+
+    def advance(self, verse: Verse):
+        self._bar.update()
+
+    def finish(self):
+        self._bar.close()
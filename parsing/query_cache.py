@@ -0,0 +1,180 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import (Any, Callable, Dict, Hashable, Optional, Sequence, Set, Tuple,
+                    TypeVar)
+
+import numpy as np
+
+from parsing.symbols import TAAME_MESHARET
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+T = TypeVar("T")
+
+
+def estimate_size(value: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Estimate the memory held by a query result: containers are counted with
+    everything in them, other objects with `sys.getsizeof`.
+
+    :param value: The result.
+    :param seen: The ids of the objects counted so far, defaults to none
+    :return: The estimated size in bytes.
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + (value.nbytes if value.base is not None else 0)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(
+            estimate_size(key, seen) + estimate_size(item, seen)
+            for key, item in value.items()
+        )
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, seen) for item in value)
+    return size
+
+
+def normalize_sequence(
+    taam_sequence: Sequence[str], include_meshartim: bool = True
+) -> Tuple[str, ...]:
+    """
+    Normalize a sequence of Taamim for a cache key: searches without Meshartim
+    leave them out of the sequence, so the sequences that only differ by their
+    Meshartim are the same query.
+
+    :param taam_sequence: The names of the Taamim in the sequence.
+    :param include_meshartim: Whether Meshartim are included in the query,
+                              defaults to True
+    :return: The normalized sequence.
+    """
+    return tuple(
+        taam_name
+        for taam_name in taam_sequence
+        if include_meshartim or taam_name not in TAAME_MESHARET
+    )
+
+
+class QueryCache:
+    """
+    A QueryCache keeps the results of recent queries (e.g. searches and n-gram
+    counts) under a memory budget, evicting the least recently used results
+    first. Keys should identify the data that was queried (e.g. `Book.version`)
+    as well as the query itself.
+
+    Results are shared by every caller that asks for them, so they must not be
+    modified, and should only be made of plain values (e.g. verse ordinals rather
+    than verses), so that they do not keep anything else alive.
+
+    A pickled cache is pickled without its results: the shared QUERY_CACHE is
+    pickled by reference, and other caches come back empty.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        assert max_bytes >= 0, f"Invalid memory budget: {max_bytes}"
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached result, counting a hit or a miss.
+
+        :param key: The key of the query.
+        :param default: What to return if the result is not cached, defaults to None
+        :return: The cached result, or `default`.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Cache a result, evicting the least recently used results if it does not
+        fit in the budget. (A result larger than the whole budget is not cached.)
+
+        :param key: The key of the query.
+        :param value: The result.
+        """
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], T]) -> T:
+        """
+        Get a cached result, computing and caching it if it is not cached.
+
+        :param key: The key of the query.
+        :param compute: Computes the result.
+        :return: The result.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """
+        Drop every cached result (the statistics are kept).
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the statistics of the cache.
+
+        :return: The number of hits, misses, evictions and cached results, and
+                 the estimated size of the results and the budget (in bytes).
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size": self.size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def __reduce__(self):
+        if self is QUERY_CACHE:
+            return "QUERY_CACHE"
+        return QueryCache, (self.max_bytes,)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# the cache that books and search engines share by default
+QUERY_CACHE = QueryCache()
@@ -0,0 +1,33 @@
+from typing import Iterable, Iterator, Tuple
+
+from parsing.verse import Verse
+from utils.text_parsing_utils import TextParsingUtils
+
+
+def iter_verses_from_lines(lines: Iterable[str]) -> Iterator[Tuple[int, int, Verse]]:
+    """
+    Parse verses one at a time from the lines of a UXLC text.
+
+    :param lines: The lines of the text.
+    :return: An iterator of (chapter index, verse index, Verse) triples.
+    """
+    chapter_idx = None
+    for line in lines:
+        # LRE symbol indicates the beginning of a verse
+        if TextParsingUtils.is_line_start_of_verse(line):
+            verse_idx = TextParsingUtils.extract_verse_idx(line)
+            yield chapter_idx, verse_idx, Verse.from_string(verse_idx, line)
+        elif TextParsingUtils.is_line_start_of_chapter(line):
+            chapter_idx = TextParsingUtils.extract_chapter_idx(line)
+
+
+def iter_verses(file_path: str) -> Iterator[Tuple[int, int, Verse]]:
+    """
+    Stream the verses of a UXLC text file without building a Book, so that
+    aggregations over arbitrarily large inputs run in constant memory.
+
+    :param file_path: The path to the text file.
+    :return: An iterator of (chapter index, verse index, Verse) triples.
+    """
+    with open(file_path, "r", encoding="utf-8") as book:
+        yield from iter_verses_from_lines(book)
@@ -111,3 +111,24 @@ NEQUDOT_SYMBOLS_TO_NAMES = {
 NEQUDOT_NAMES_TO_SYMBOLS = {v: k for k, v in NEQUDOT_SYMBOLS_TO_NAMES.items()}
 NEQUDOT_NAMES = set(NEQUDOT_NAMES_TO_SYMBOLS.keys())
 NEQUDOT_SYMBOLS = set(NEQUDOT_SYMBOLS_TO_NAMES.keys())
+
+# Stable integer codes for letters, taamim and nequdot (code 0 is reserved for "none").
+# These are written to compiled corpus files, so changing them requires bumping
+# the compiled format version.
+LETTERS_TO_CODES = {
+    letter: code for code, letter in enumerate(LETTERS + MAQAF, start=1)
+}
+CODES_TO_LETTERS = {v: k for k, v in LETTERS_TO_CODES.items()}
+# "azla" is not written with its own symbol: it is a qadma that is followed by a gerish.
+TAAMIM_NAMES_TO_CODES = {
+    name: code
+    for code, name in enumerate(
+        list(TAAMIM_SYMBOLS_TO_NAMES.values()) + ["azla"], start=1
+    )
+}
+TAAMIM_CODES_TO_NAMES = {v: k for k, v in TAAMIM_NAMES_TO_CODES.items()}
+NEQUDOT_NAMES_TO_CODES = {
+    name: code
+    for code, name in enumerate(NEQUDOT_SYMBOLS_TO_NAMES.values(), start=1)
+}
+NEQUDOT_CODES_TO_NAMES = {v: k for k, v in NEQUDOT_NAMES_TO_CODES.items()}
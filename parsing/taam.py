@@ -1,14 +1,44 @@
-from parsing.symbols import TAAMIM_NAMES_TO_SYMBOLS, TAAMIM_SYMBOLS_TO_NAMES
+from typing import Dict, Tuple
+
+from parsing.symbols import (TAAMIM_CODES_TO_NAMES, TAAMIM_NAMES_TO_CODES,
+                             TAAMIM_NAMES_TO_SYMBOLS, TAAMIM_SYMBOLS_TO_NAMES)
 
 
 class Taam:
     """
     A Taam is a cantillation symbol in the Hebrew Bible.
+
+    Taamim are interned, immutable flyweights: there is exactly one instance
+    per (name, symbol) pair, so they can be compared by identity and used in
+    sets or as dict keys. Each one carries a small integer code (see
+    `TAAMIM_NAMES_TO_CODES`) shared by all taamim with the same name.
     """
 
-    def __init__(self, name: str, symbol: str):
-        self.name = name
-        self.symbol = symbol
+    __slots__ = ("_name", "_symbol", "_code")
+
+    _registry: Dict[Tuple[str, str], "Taam"] = {}
+    # codes for names that are not in TAAMIM_NAMES_TO_CODES (e.g. after a rename)
+    _extra_codes: Dict[str, int] = {}
+
+    def __new__(cls, name: str, symbol: str) -> "Taam":
+        key = (name, symbol)
+        taam = cls._registry.get(key)
+        if taam is None:
+            taam = super().__new__(cls)
+            taam._name = name
+            taam._symbol = symbol
+            taam._code = Taam._code_for_name(name)
+            cls._registry[key] = taam
+        return taam
+
+    @staticmethod
+    def _code_for_name(name: str) -> int:
+        code = TAAMIM_NAMES_TO_CODES.get(name)
+        if code is None:
+            code = Taam._extra_codes.setdefault(
+                name, len(TAAMIM_NAMES_TO_CODES) + len(Taam._extra_codes) + 1
+            )
+        return code
 
     @classmethod
     def from_symbol(cls, symbol: str) -> "Taam":
@@ -32,8 +62,64 @@ class Taam:
         assert name in TAAMIM_NAMES_TO_SYMBOLS, f"Invalid taam name: {name}"
         return cls(name, TAAMIM_NAMES_TO_SYMBOLS[name])
 
+    @classmethod
+    def from_code(cls, code: int) -> "Taam":
+        """
+        Create a Taam object from its integer code.
+
+        :param code: The code of the Taam.
+        :return: A Taam object.
+        """
+        assert code in TAAMIM_CODES_TO_NAMES, f"Invalid taam code: {code}"
+        name = TAAMIM_CODES_TO_NAMES[code]
+        # an azla is written as a qadma
+        return cls(name, TAAMIM_NAMES_TO_SYMBOLS["qadma" if name == "azla" else name])
+
+    @property
+    def name(self) -> str:
+        """
+        Get the name of the Taam.
+
+        :return: The name of the Taam.
+        """
+        return self._name
+
+    @property
+    def symbol(self) -> str:
+        """
+        Get the symbol of the Taam.
+
+        :return: The symbol of the Taam.
+        """
+        return self._symbol
+
+    @property
+    def code(self) -> int:
+        """
+        Get the integer code of the Taam.
+
+        :return: The code of the Taam.
+        """
+        return self._code
+
+    def renamed(self, name: str) -> "Taam":
+        """
+        Get the Taam with a different name written with the same symbol
+        (e.g. a qadma that is read as an azla).
+
+        :param name: The new name.
+        :return: The renamed Taam.
+        """
+        return Taam(name, self._symbol)
+
+    def __reduce__(self):
+        return Taam, (self._name, self._symbol)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
     def __repr__(self):
         return self.symbol
-
-    def __eq__(self, other):
-        return self.symbol == other.symbol and self.name == other.name
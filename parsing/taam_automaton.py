@@ -0,0 +1,144 @@
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from parsing.taam_codes import NUM_TAAM_CODES, sequence_codes
+from parsing.taam_stream import TaamStream
+
+
+class TaamAutomaton:
+    """
+    A TaamAutomaton is an Aho-Corasick automaton over taam codes: it finds every
+    occurrence of any of a set of sequences of codes in a single pass over the
+    letters of a stream. Its transitions are a full table, so each letter costs
+    one lookup (and letters with more than one taam follow each of them).
+    """
+
+    def __init__(self, patterns: Sequence[Sequence[int]]):
+        self.patterns = [list(pattern) for pattern in patterns]
+        assert all(len(pattern) > 0 for pattern in self.patterns), "Empty pattern"
+
+        # the trie of the patterns
+        goto: List[Dict[int, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for pattern_idx, pattern in enumerate(self.patterns):
+            state = 0
+            for code in pattern:
+                if code not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][code] = len(goto) - 1
+                state = goto[state][code]
+            outputs[state].append(pattern_idx)
+
+        # complete the transitions with the failure links, breadth first
+        self.transitions = [[0] * NUM_TAAM_CODES for _ in goto]
+        fail = [0] * len(goto)
+        queue = deque()
+        for code, state in goto[0].items():
+            self.transitions[0][code] = state
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for code in range(NUM_TAAM_CODES):
+                if code in goto[state]:
+                    child = goto[state][code]
+                    fail[child] = self.transitions[fail[state]][code]
+                    self.transitions[state][code] = child
+                    queue.append(child)
+                else:
+                    self.transitions[state][code] = self.transitions[fail[state]][code]
+        self.outputs = outputs
+
+    def scan(self, stream: TaamStream, letters: np.ndarray) -> List[np.ndarray]:
+        """
+        Find where each pattern occurs on consecutive letters of a verse.
+
+        :param stream: The stream to scan.
+        :param letters: The positions of the letters to scan (e.g. only those
+                        without Meshartim), in order.
+        :return: For each pattern, the sorted indices (in `letters`) of the letters
+                 where it starts.
+        """
+        transitions, outputs = self.transitions, self.outputs
+        letter_codes = stream.letter_codes
+        ends: List[List[int]] = [[] for _ in self.patterns]
+        states, verse = (0,), -1
+        for i, (position, letter_verse) in enumerate(
+            zip(letters.tolist(), stream.verses[letters].tolist())
+        ):
+            # matches do not cross verses
+            if letter_verse != verse:
+                states, verse = (0,), letter_verse
+            codes = letter_codes[position]
+            if len(codes) == 1 and len(states) == 1:
+                states = (transitions[states[0]][codes[0]],)
+            else:
+                states = tuple(
+                    {transitions[state][code] for state in states for code in codes}
+                )
+            for state in states:
+                for pattern_idx in outputs[state]:
+                    ends[pattern_idx].append(i)
+        return [
+            np.unique(np.asarray(pattern_ends, dtype=np.int64)) - len(pattern) + 1
+            for pattern, pattern_ends in zip(self.patterns, ends)
+        ]
+
+
+def find_taam_sequences(
+    stream: TaamStream,
+    taam_sequences: List[List[str]],
+    include_meshartim: bool = True,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> List[Optional[Dict[int, List[List[int]]]]]:
+    """
+    Find several sequences of Taamim in a stream with one pass of a TaamAutomaton
+    (per setting of `include_meshartim`), then match the verses where each one
+    occurs like `Verse.find_taam_sequence` does.
+
+    :param stream: The stream to search.
+    :param taam_sequences: The sequences of Taamim.
+    :param include_meshartim: Whether to include Meshartim in the search,
+                              defaults to True
+    :param start: The position of the first letter to search, defaults to 0
+    :param stop: The position after the last letter to search (the range
+                 should span whole verses), defaults to the end of the stream
+    :return: For each sequence, the ordinals of the verses with a match mapped to
+             the word indices of their matches, in order, or None if the sequence
+             is empty (once Meshartim are left out).
+    """
+    all_codes = [
+        sequence_codes(taam_sequence, include_meshartim)
+        for taam_sequence in taam_sequences
+    ]
+    # sequences with unknown taamim never match, and empty ones cannot be searched
+    patterns = sorted(
+        {tuple(codes) for codes in all_codes if codes is not None and len(codes) > 0}
+    )
+    stop = len(stream) if stop is None else stop
+    if include_meshartim:
+        letters = np.arange(start, stop, dtype=np.int32)
+    else:
+        letters = (start + np.flatnonzero(~stream.has_mesharet[start:stop])).astype(
+            np.int32
+        )
+    starts = {}
+    if len(patterns) > 0:
+        automaton = TaamAutomaton(patterns)
+        for pattern, pattern_starts in zip(patterns, automaton.scan(stream, letters)):
+            starts[pattern] = letters[pattern_starts]
+
+    results = []
+    for codes in all_codes:
+        if codes is None:
+            results.append({})
+        elif len(codes) == 0:
+            results.append(None)
+        else:
+            verses = stream.verses[starts[tuple(codes)]]
+            results.append(stream.match_verses(verses, codes, include_meshartim))
+    return results
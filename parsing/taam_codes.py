@@ -0,0 +1,103 @@
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from parsing.symbols import (TAAME_MESHARET, TAAMIM_CODES_TO_NAMES,
+                             TAAMIM_NAMES_TO_CODES)
+from parsing.taam import Taam
+
+# code 0 is reserved, so the frequency arrays have one slot more than there are taamim
+NUM_TAAM_CODES = len(TAAMIM_NAMES_TO_CODES) + 1
+MESHARET_CODES = frozenset(TAAMIM_NAMES_TO_CODES[name] for name in TAAME_MESHARET)
+MESHARET_MASK = np.isin(np.arange(NUM_TAAM_CODES), list(MESHARET_CODES))
+
+
+def freeze(codes: np.ndarray) -> np.ndarray:
+    """
+    Make an array of taam codes read-only, so that it can be safely cached and
+    shared.
+
+    :param codes: The taam codes.
+    :return: The same array, made read-only.
+    """
+    codes.flags.writeable = False
+    return codes
+
+
+def encode_taamim(taamim: Iterable[Taam]) -> np.ndarray:
+    """
+    Encode a sequence of Taamim as a (read-only) array of their integer codes.
+
+    :param taamim: The Taamim.
+    :return: The codes of the Taamim.
+    """
+    return freeze(np.fromiter((taam.code for taam in taamim), dtype=np.uint8))
+
+
+def concatenate_taam_codes(arrays: Iterable[np.ndarray]) -> np.ndarray:
+    """
+    Concatenate arrays of taam codes (e.g. of consecutive verses) into one
+    (read-only) array.
+
+    :param arrays: The arrays of taam codes.
+    :return: The concatenated taam codes.
+    """
+    arrays = list(arrays)
+    if len(arrays) == 0:
+        return freeze(np.zeros(0, dtype=np.uint8))
+    return freeze(np.concatenate(arrays))
+
+
+def without_meshartim(codes: np.ndarray) -> np.ndarray:
+    """
+    Drop the codes of the Meshartim from an array of taam codes.
+
+    :param codes: The taam codes.
+    :return: The taam codes without the Meshartim.
+    """
+    return freeze(codes[~MESHARET_MASK[codes]])
+
+
+def taam_frequencies(codes: np.ndarray) -> np.ndarray:
+    """
+    Count how often each taam code occurs.
+
+    :param codes: The taam codes.
+    :return: An array with the number of occurrences of each code at its index.
+    """
+    return np.bincount(codes, minlength=NUM_TAAM_CODES)
+
+
+def frequencies_by_name(frequencies: np.ndarray) -> Dict[str, int]:
+    """
+    Convert an array of taam frequencies (see `taam_frequencies`) to a
+    dictionary keyed on taam names, leaving out the taamim that do not occur.
+
+    :param frequencies: The number of occurrences of each taam code.
+    :return: The taam names mapped to their number of occurrences.
+    """
+    return {
+        TAAMIM_CODES_TO_NAMES[code]: int(frequencies[code])
+        for code in np.flatnonzero(frequencies).tolist()
+    }
+
+
+def sequence_codes(
+    taam_sequence: List[str], include_meshartim: bool = True
+) -> Optional[List[int]]:
+    """
+    Get the codes of a sequence of Taamim as `Verse.find_taam_sequence` searches
+    for it, i.e. without its Meshartim if they are not included.
+
+    :param taam_sequence: The names of the Taamim in the sequence.
+    :param include_meshartim: Whether to include Meshartim in the search,
+                              defaults to True
+    :return: The codes of the sequence, or None if one of the names has no code
+             (so the sequence cannot occur).
+    """
+    if not include_meshartim:
+        taam_sequence = [
+            taam_name for taam_name in taam_sequence if taam_name not in TAAME_MESHARET
+        ]
+    codes = [TAAMIM_NAMES_TO_CODES.get(taam_name) for taam_name in taam_sequence]
+    return None if None in codes else codes
@@ -0,0 +1,197 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from parsing.symbols import TAAMIM_CODES_TO_NAMES, TAAMIM_NAMES_TO_CODES
+from parsing.taam_ngrams import CODE_BITS
+from parsing.verse import Verse
+
+DEFAULT_MAX_N = 8
+# the longest n-grams whose codes fit in one int64 key
+MAX_PACKED_LENGTH = 63 // CODE_BITS
+
+
+class TaamNGramCounts:
+    """
+    TaamNGramCounts are the counts of the taam n-grams of a sequence of verses
+    (n-grams do not cross verses), as `Aliyah.count_n_taam_sequences` counts
+    them. The counts for every n up to `max_n` are computed in one pass: the
+    integer key of each n-gram extends the key of the (n - 1)-gram that starts
+    at the same taam with one more code, and the keys of each length are
+    counted with `np.unique`. Other lengths are counted the first time they are
+    asked for.
+    """
+
+    def __init__(
+        self, codes: np.ndarray, verse_offsets: np.ndarray, max_n: int = DEFAULT_MAX_N
+    ):
+        self.codes = codes
+        # the position of the first taam of each verse in `codes`
+        self.verse_offsets = verse_offsets
+        self._ngrams: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._count_lengths(range(1, max_n + 1))
+
+    @classmethod
+    def from_verse_codes(
+        cls, verse_codes: Iterable[np.ndarray], max_n: int = DEFAULT_MAX_N
+    ) -> "TaamNGramCounts":
+        """
+        Count the taam n-grams of a sequence of verses.
+
+        :param verse_codes: The taam codes of each verse (e.g. `Verse.taam_codes`).
+        :param max_n: The greatest length to count right away, defaults to 8
+        :return: The n-gram counts.
+        """
+        verse_codes = list(verse_codes)
+        lengths = [len(codes) for codes in verse_codes]
+        verse_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        codes = (
+            np.concatenate(verse_codes).astype(np.uint8)
+            if len(verse_codes) > 0
+            else np.zeros(0, dtype=np.uint8)
+        )
+        return cls(codes, verse_offsets, max_n)
+
+    @classmethod
+    def from_verses(
+        cls,
+        verses: Iterable[Verse],
+        include_meshartim: bool = True,
+        max_n: int = DEFAULT_MAX_N,
+    ) -> "TaamNGramCounts":
+        """
+        Count the taam n-grams of a sequence of verses.
+
+        :param verses: The verses.
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :param max_n: The greatest length to count right away, defaults to 8
+        :return: The n-gram counts.
+        """
+        return cls.from_verse_codes(
+            (
+                verse.taam_codes
+                if include_meshartim
+                else verse.taam_codes_without_meshartim
+                for verse in verses
+            ),
+            max_n,
+        )
+
+    def _count_lengths(self, lengths: Iterable[int]):
+        """
+        Count the n-grams of several lengths, rolling the keys of the shorter
+        n-grams into those of the longer ones.
+        """
+        lengths = sorted(set(lengths) - set(self._ngrams))
+        if len(lengths) == 0:
+            return
+        total = len(self.codes)
+        # the number of taamim from each position to the end of its verse
+        remaining = np.repeat(self.verse_offsets[1:], np.diff(self.verse_offsets))
+        remaining = remaining - np.arange(total)
+        codes = self.codes.astype(np.int64)
+
+        keys = np.zeros(total, dtype=np.int64)
+        for n in range(1, min(lengths[-1], MAX_PACKED_LENGTH) + 1):
+            next_codes = np.zeros(total, dtype=np.int64)
+            next_codes[: max(total - n + 1, 0)] = codes[n - 1 :]
+            keys = (keys << CODE_BITS) | next_codes
+            if n in lengths:
+                unique_keys, counts = np.unique(
+                    keys[remaining >= n], return_counts=True
+                )
+                shifts = CODE_BITS * np.arange(n - 1, -1, -1)
+                rows = (unique_keys[:, None] >> shifts) & ((1 << CODE_BITS) - 1)
+                self._ngrams[n] = (rows.astype(np.uint8), counts)
+
+        # longer n-grams are counted as rows of codes
+        for n in lengths:
+            if n > MAX_PACKED_LENGTH:
+                starts = np.flatnonzero(remaining >= n)
+                windows = self.codes[starts[:, None] + np.arange(n)]
+                self._ngrams[n] = np.unique(windows, axis=0, return_counts=True)
+
+    def ngrams(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the n-grams of a length and their counts.
+
+        :param n: The length of the n-grams.
+        :return: The codes of the n-grams (one sorted row each) and their counts.
+        """
+        assert n > 0, f"Invalid n-gram length: {n}"
+        self._count_lengths([n])
+        return self._ngrams[n]
+
+    def counts(self, n: int) -> Counter:
+        """
+        Get the counts of the n-grams of a length by the names of their Taamim.
+
+        :param n: The length of the n-grams.
+        :return: A Counter mapping taam sequences to their counts.
+        """
+        return ngram_counter(*self.ngrams(n))
+
+    def count(self, taam_sequence: Sequence[str]) -> int:
+        """
+        Count the occurrences of a sequence of Taamim.
+
+        :param taam_sequence: The (non-empty) sequence of Taamim.
+        :return: The number of occurrences.
+        """
+        codes: List[int] = [
+            TAAMIM_NAMES_TO_CODES.get(taam_name, 0) for taam_name in taam_sequence
+        ]
+        rows, counts = self.ngrams(len(codes))
+        matches = np.flatnonzero((rows == np.asarray(codes, dtype=np.uint8)).all(axis=1))
+        return int(counts[matches[0]]) if len(matches) > 0 else 0
+
+
+def ngram_counter(rows: np.ndarray, counts: np.ndarray) -> Counter:
+    """
+    Map n-grams (see `TaamNGramCounts.ngrams`) to their counts by the names of
+    their Taamim.
+
+    :param rows: The codes of the n-grams, one row each.
+    :param counts: The count of each n-gram.
+    :return: A Counter mapping taam sequences to their counts.
+    """
+    return Counter(
+        {
+            tuple(TAAMIM_CODES_TO_NAMES[code] for code in row): count
+            for row, count in zip(rows.tolist(), counts.tolist())
+        }
+    )
+
+
+def merge_ngrams(
+    parts: Sequence[Tuple[np.ndarray, np.ndarray]], n: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Add up the counts of the n-grams of several sequences of verses (e.g. the
+    parts of a book).
+
+    :param parts: The n-grams of each part and their counts (see
+                  `TaamNGramCounts.ngrams`).
+    :param n: The length of the n-grams.
+    :return: The codes of the n-grams (one sorted row each) and their counts.
+    """
+    rows = np.concatenate(
+        [np.zeros((0, n), dtype=np.uint8)] + [part_rows for part_rows, _ in parts]
+    )
+    counts = np.concatenate(
+        [np.zeros(0, dtype=np.int64)] + [part_counts for _, part_counts in parts]
+    )
+    if n > MAX_PACKED_LENGTH:
+        unique_rows, inverse = np.unique(rows, axis=0, return_inverse=True)
+    else:
+        # rows are much faster to sort as their integer keys
+        shifts = CODE_BITS * np.arange(n - 1, -1, -1)
+        keys = rows.astype(np.int64) @ (np.int64(1) << shifts)
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        unique_rows = (unique_keys[:, None] >> shifts) & ((1 << CODE_BITS) - 1)
+        unique_rows = unique_rows.astype(np.uint8)
+    totals = np.bincount(
+        inverse.reshape(-1), weights=counts, minlength=len(unique_rows)
+    )
+    return unique_rows, totals.astype(np.int64)
@@ -0,0 +1,180 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from parsing.taam_codes import NUM_TAAM_CODES, sequence_codes
+from parsing.taam_stream import TaamStream
+
+MAX_NGRAM_LENGTH = 8
+CODE_BITS = (NUM_TAAM_CODES - 1).bit_length()
+# positions are packed as (verse ordinal << WORD_BITS) | word index
+WORD_BITS = 16
+
+
+def pack_positions(verses: np.ndarray, words: np.ndarray) -> np.ndarray:
+    """
+    Pack (verse ordinal, word index) pairs into single integers.
+
+    :param verses: The verse ordinals.
+    :param words: The word indices (in `Verse.taam_words`).
+    :return: The packed positions.
+    """
+    return (verses.astype(np.int64) << WORD_BITS) | words.astype(np.int64)
+
+
+def unpack_positions(positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Unpack positions packed with `pack_positions`.
+
+    :param positions: The packed positions.
+    :return: The verse ordinals and the word indices.
+    """
+    return positions >> WORD_BITS, positions & ((1 << WORD_BITS) - 1)
+
+
+class _NGramTable:
+    """
+    The n-grams starting at each letter of one view of a TaamStream (all of its
+    letters, or only those without Meshartim), sorted by n-gram.
+    """
+
+    def __init__(self, stream: TaamStream, letters: np.ndarray, max_n: int):
+        # `letters` are the positions (in the stream) of the letters in this view
+        self.letters = letters
+        self.verses = stream.verses[letters]
+        codes = stream.primary_codes[letters].astype(np.int64)
+
+        # the key of each letter packs the codes of the max_n letters starting at
+        # it, the first one in the highest bits; letters past the end of the verse
+        # count as code 0, so the key of a shorter n-gram is a prefix of the key
+        n = len(letters)
+        keys = np.zeros(n, dtype=np.int64)
+        for j in range(max_n):
+            shifted = np.zeros(n, dtype=np.int64)
+            if j < n:
+                same_verse = self.verses[j:] == self.verses[: n - j]
+                shifted[: n - j] = np.where(same_verse, codes[j:], 0)
+            keys = (keys << CODE_BITS) | shifted
+        self.order = np.argsort(keys, kind="stable").astype(np.int32)
+        self.keys = keys[self.order]
+
+        # the keys only use the first taam of letters with more than one, so the
+        # verses with such letters are searched separately
+        multi_taam = np.diff(stream.letter_offsets)[letters] > 1
+        self.multi_taam_verses = np.unique(self.verses[multi_taam])
+        self._letter_codes = stream.letter_codes
+
+    def starts(self, codes: Sequence[int], max_n: int) -> np.ndarray:
+        """
+        Get the indices (in this view) of the letters where an n-gram starts.
+
+        :param codes: The n-gram (at most `max_n` codes).
+        :param max_n: The length of the keys.
+        :return: The sorted indices of the letters.
+        """
+        prefix = 0
+        for code in codes:
+            prefix = (prefix << CODE_BITS) | code
+        shift = CODE_BITS * (max_n - len(codes))
+        lo, hi = np.searchsorted(self.keys, [prefix << shift, (prefix + 1) << shift])
+        return np.union1d(self.order[lo:hi], self._multi_taam_starts(codes))
+
+    def _multi_taam_starts(self, codes: Sequence[int]) -> np.ndarray:
+        """
+        Get the indices of the letters where an n-gram starts in the verses with
+        letters that have more than one taam, by checking every letter.
+        """
+        starts = []
+        for ordinal in self.multi_taam_verses.tolist():
+            lo, hi = np.searchsorted(self.verses, [ordinal, ordinal + 1]).tolist()
+            for i in range(lo, hi - len(codes) + 1):
+                if all(
+                    code in self._letter_codes[self.letters[i + j]]
+                    for j, code in enumerate(codes)
+                ):
+                    starts.append(i)
+        return np.asarray(starts, dtype=np.int32)
+
+
+class TaamNGramIndex:
+    """
+    A TaamNGramIndex is a positional index of the taam n-grams (n up to
+    `max_n`) of a TaamStream, with and without Meshartim. Finding the starts of
+    a sequence of up to `max_n` Taamim is a binary search; longer sequences
+    join the starts of their `max_n`-long chunks.
+
+    Only the verses where a sequence occurs are then matched letter by letter,
+    so that the results are exactly those of `Verse.find_taam_sequence` (which
+    can skip over some occurrences, e.g. ones that overlap).
+    """
+
+    def __init__(self, stream: TaamStream, max_n: int = MAX_NGRAM_LENGTH):
+        assert 0 < max_n * CODE_BITS < 63, f"Invalid n-gram length: {max_n}"
+        self.stream = stream
+        self.max_n = max_n
+        self._tables = {
+            True: _NGramTable(stream, np.arange(len(stream), dtype=np.int32), max_n),
+            False: _NGramTable(
+                stream, np.flatnonzero(~stream.has_mesharet).astype(np.int32), max_n
+            ),
+        }
+
+    def _starts(self, codes: List[int], include_meshartim: bool) -> np.ndarray:
+        """
+        Get the indices (in the view of the stream for `include_meshartim`) of the
+        letters where a sequence of codes starts.
+        """
+        table = self._tables[include_meshartim]
+        starts = table.starts(codes[: self.max_n], self.max_n)
+        for offset in range(self.max_n, len(codes), self.max_n):
+            chunk_starts = table.starts(codes[offset : offset + self.max_n], self.max_n)
+            starts = starts[np.isin(starts + offset, chunk_starts)]
+            # the chunks must be in the same verse
+            starts = starts[table.verses[starts] == table.verses[starts + offset]]
+        return starts
+
+    def positions(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> np.ndarray:
+        """
+        Get the positions of the words where a sequence of Taamim starts, in
+        every verse (regardless of overlaps between occurrences).
+
+        :param taam_sequence: The (non-empty) sequence of Taamim.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The sorted positions, packed with `pack_positions`.
+        """
+        codes = sequence_codes(taam_sequence, include_meshartim)
+        if codes is None or len(codes) == 0:
+            return np.zeros(0, dtype=np.int64)
+        table = self._tables[include_meshartim]
+        letters = table.letters[self._starts(codes, include_meshartim)]
+        # several letters of a word can start the sequence
+        return np.unique(
+            pack_positions(self.stream.verses[letters], self.stream.words[letters])
+        )
+
+    def find(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> Optional[Dict[int, List[List[int]]]]:
+        """
+        Find the verses that contain a sequence of Taamim.
+
+        :param taam_sequence: The sequence of Taamim.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The ordinals of the verses with a match mapped to the word indices
+                 of their matches (see `VerseTaamSequenceResult.word_idxs`), in
+                 order, or None if the sequence is empty (once Meshartim are left
+                 out), which the index cannot answer.
+        """
+        codes = sequence_codes(taam_sequence, include_meshartim)
+        if codes is None:
+            return {}
+        if len(codes) == 0:
+            return None
+
+        table = self._tables[include_meshartim]
+        candidates = table.verses[self._starts(codes, include_meshartim)]
+        return self.stream.match_verses(candidates, codes, include_meshartim)
@@ -0,0 +1,231 @@
+from itertools import islice
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from parsing.taam_codes import sequence_codes
+from parsing.taam_stream import TaamStream
+from parsing.verse import Verse, VerseTaamSequenceResult
+
+if TYPE_CHECKING:
+    from parsing.book import Book
+
+DEFAULT_PAGE_SIZE = 20
+# the number of letters scanned for the first chunk of a search (each later chunk
+# is twice as large, up to MAX_CHUNK_LETTERS)
+FIRST_CHUNK_LETTERS = 2048
+MAX_CHUNK_LETTERS = 1 << 16
+
+
+class TaamSequenceHit:
+    """
+    A TaamSequenceHit is a verse found by a streaming search for a sequence of
+    Taamim, with where it is (its book, parasha and aliyah) and its matches.
+    """
+
+    def __init__(
+        self,
+        ordinal: int,
+        book: str,
+        parasha: str,
+        aliyah: int,
+        verse: Verse,
+        word_idxs: List[List[int]],
+    ):
+        self.ordinal = ordinal
+        self.book = book
+        self.parasha = parasha
+        self.aliyah = aliyah
+        self.verse = verse
+        self.word_idxs = word_idxs
+
+    @property
+    def result(self) -> VerseTaamSequenceResult:
+        """
+        Get the hit as the result of a search in its verse.
+
+        :return: The verse result.
+        """
+        return VerseTaamSequenceResult(self.verse, self.word_idxs)
+
+    def __repr__(self) -> str:
+        return (
+            f"TaamSequenceHit({self.book}, {self.parasha}, aliyah {self.aliyah + 1}, "
+            f"verse {self.ordinal}, {self.word_idxs})"
+        )
+
+
+class TaamSearchPage:
+    """
+    A TaamSearchPage is a page of the hits of a streaming search, with the
+    cursor to pass to get the next page (None if this is the last page).
+    """
+
+    def __init__(self, hits: List[TaamSequenceHit], next_cursor: Optional[int]):
+        self.hits = hits
+        self.next_cursor = next_cursor
+
+    def __iter__(self) -> Iterator[TaamSequenceHit]:
+        return iter(self.hits)
+
+    def __len__(self) -> int:
+        return len(self.hits)
+
+
+def iter_stream_matches(
+    stream: TaamStream,
+    codes: Sequence[int],
+    include_meshartim: bool = True,
+    start: int = 0,
+) -> Iterator[Tuple[int, List[List[int]]]]:
+    """
+    Find a sequence of taam codes in the verses of a stream (like
+    `TaamStream.match_verses`), one chunk of verses at a time and in order, so
+    that the search stops as soon as no more matches are asked for.
+
+    :param stream: The stream to search.
+    :param codes: The (non-empty) sequence of taam codes, without Meshartim if
+                  `include_meshartim` is False.
+    :param include_meshartim: Whether to include Meshartim in the search,
+                              defaults to True
+    :param start: The ordinal of the first verse to search, defaults to 0
+    :return: The ordinals of the verses with a match and the word indices of
+             their matches, in order.
+    """
+    offsets = stream.verse_offsets
+    num_verses = stream.num_verses
+    chunk_letters = FIRST_CHUNK_LETTERS
+    while start < num_verses:
+        # the chunk ends on the first verse boundary after `chunk_letters` letters
+        stop = int(np.searchsorted(offsets, offsets[start] + chunk_letters, "left"))
+        stop = min(max(stop, start + 1), num_verses)
+        positions = stream.occurrences(
+            codes, include_meshartim, int(offsets[start]), int(offsets[stop])
+        )
+        if len(positions) > 0:
+            matches = stream.match_verses(
+                stream.verses[positions], codes, include_meshartim
+            )
+            yield from matches.items()
+        start = stop
+        chunk_letters = min(2 * chunk_letters, MAX_CHUNK_LETTERS)
+
+
+def iter_verse_matches(
+    books: Sequence["Book"],
+    taam_sequence: List[str],
+    include_meshartim: bool = True,
+    start: int = 0,
+) -> Iterator[Tuple[int, List[List[int]]]]:
+    """
+    Find a sequence of Taamim in the verses of some books one verse at a time
+    (with `Verse.find_taam_sequence`), for the sequences a stream cannot search
+    (e.g. one of Meshartim only, without Meshartim).
+
+    :param books: The books, in the order of the stream.
+    :param taam_sequence: The taam sequence to find.
+    :param include_meshartim: Whether to include Meshartim in the search,
+                              defaults to True
+    :param start: The ordinal of the first verse to search, defaults to 0
+    :return: The ordinals of the verses with a match and the word indices of
+             their matches, in order.
+    """
+    book_start = 0
+    for book in books:
+        book_stop = book_start + len(book.verses)
+        for ordinal in range(max(start, book_start), book_stop):
+            verse = book.verses[ordinal - book_start]
+            result = verse.find_taam_sequence(taam_sequence, include_meshartim)
+            if result.word_idxs:
+                yield ordinal, result.word_idxs
+        book_start = book_stop
+
+
+def iter_hits(
+    books: Sequence["Book"],
+    stream: TaamStream,
+    taam_sequence: List[str],
+    include_meshartim: bool = True,
+    cursor: int = 0,
+) -> Iterator[TaamSequenceHit]:
+    """
+    Find the verses with a sequence of Taamim in some books, one at a time, in
+    the order of `Book.find_verses_with_taam_sequence` (book, parasha, aliyah,
+    verse). As there, the verses outside of the aliyot are left out.
+
+    :param books: The books, in the order of the stream.
+    :param stream: The letters of the books, laid out as one stream.
+    :param taam_sequence: The taam sequence to find.
+    :param include_meshartim: Whether to include Meshartim in the search,
+                              defaults to True
+    :param cursor: The ordinal (in the stream) of the verse to start at, defaults
+                   to 0
+    :return: The hits, in order.
+    """
+    codes = sequence_codes(taam_sequence, include_meshartim)
+    if codes is None:
+        return
+    if len(codes) > 0:
+        matches = iter_stream_matches(stream, codes, include_meshartim, cursor)
+    else:
+        # the stream cannot answer an empty sequence
+        matches = iter_verse_matches(books, taam_sequence, include_meshartim, cursor)
+
+    # the aliyot of the books in order, with the range of their verses in the
+    # stream, walked alongside the (increasing) ordinals of the matches
+    def iter_aliyot():
+        book_start = 0
+        for book in books:
+            for parasha in book.parshiot:
+                for aliyah_idx, aliyah in enumerate(parasha.aliyot):
+                    yield (
+                        book_start + aliyah.start,
+                        book_start + aliyah.stop,
+                        book_start,
+                        book,
+                        parasha.name,
+                        aliyah_idx,
+                    )
+            book_start += len(book.verses)
+
+    aliyot = iter_aliyot()
+    aliyah = next(aliyot, None)
+    for ordinal, word_idxs in matches:
+        while aliyah is not None and aliyah[1] <= ordinal:
+            aliyah = next(aliyot, None)
+        if aliyah is None:
+            return
+        start, _, book_start, book, parasha_name, aliyah_idx = aliyah
+        if ordinal < start:
+            continue
+        yield TaamSequenceHit(
+            ordinal,
+            book.name,
+            parasha_name,
+            aliyah_idx,
+            book.verses[ordinal - book_start],
+            word_idxs,
+        )
+
+
+def paginate(
+    hits: Iterator[TaamSequenceHit],
+    limit: int = DEFAULT_PAGE_SIZE,
+    offset: int = 0,
+) -> TaamSearchPage:
+    """
+    Take a page of hits from a streaming search, without looking further than
+    the first hit after the page.
+
+    :param hits: The hits of the search, from its cursor on.
+    :param limit: The number of hits on the page, defaults to DEFAULT_PAGE_SIZE
+    :param offset: The number of hits to skip, defaults to 0
+    :return: The page, whose `next_cursor` is the ordinal of the first hit after
+             it (or None if there is none).
+    """
+    assert limit > 0, f"Invalid limit: {limit}"
+    assert offset >= 0, f"Invalid offset: {offset}"
+    page = list(islice(hits, offset, offset + limit + 1))
+    if len(page) > limit:
+        return TaamSearchPage(page[:limit], page[limit].ordinal)
+    return TaamSearchPage(page, None)
@@ -0,0 +1,383 @@
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from parsing.symbols import TAAMIM_NAMES_TO_CODES
+from parsing.taam_codes import NUM_TAAM_CODES
+from parsing.taam_stream import TaamStream
+
+# zero-width symbols that are added around the letters of a verse for the anchors
+VERSE_START, VERSE_END, AFTER_ATNAH = -1, -2, -3
+ANCHORS = {"^": VERSE_START, "$": VERSE_END, "@": AFTER_ATNAH}
+ANY_TAAM = frozenset(range(1, NUM_TAAM_CODES))
+MAX_CACHED_PATTERNS = 256
+
+TOKEN_RE = re.compile(r"\s*([a-z_]+|\{[^}]*\}|[.?()^$@])")
+REPEAT_RE = re.compile(r"^\{(\d+)(?:,(\d+))?\}$")
+
+# a letter is the tuple of its taam codes; an anchor is one of the ints above
+Symbol = Union[Tuple[int, ...], int]
+Label = Union[FrozenSet[int], int]
+Node = tuple
+
+
+class TaamPattern:
+    """
+    A TaamPattern is a compiled pattern over the Taamim of a verse. Patterns are
+    written as whitespace-separated elements:
+
+    - `tevir`: a Taam, by name,
+    - `.`: any Taam,
+    - `{tevir|tarha}`: any of several Taamim,
+    - `(darga tevir)`: a group,
+    - `x?` and `x{2}`/`x{1,3}`: an optional or (boundedly) repeated element,
+    - `^`, `@` and `$`: anchors at the start of the verse, right after the
+      atnah and at the end of the verse (after the sof_passuq).
+
+    For example, `^ . {tevir|tarha} darga{1,2}` or `tevir maarikh? tarha atnah @`.
+
+    A pattern is compiled into an NFA whose DFAs are built lazily, one
+    transition at a time, and kept with the pattern. A verse is scanned once
+    backwards, with a DFA of the reversed pattern, to find where matches can
+    start; then each match is scanned forwards from its start until the DFA
+    stops. As patterns have no unbounded repetitions, a verse takes linear time.
+    Matches are the leftmost-longest ones, without overlaps.
+    """
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        tokens = TaamPattern._tokenize(pattern)
+        node, rest = TaamPattern._parse_sequence(tokens)
+        assert len(rest) == 0, f"Unexpected {rest[0]!r} in taam pattern: {pattern}"
+        assert TaamPattern._min_length(node) > 0, f"Empty taam pattern: {pattern}"
+        self.required_codes = TaamPattern._required_codes(node)
+
+        self._edges: List[List[Tuple[Label, int]]] = []
+        self._epsilons: List[List[int]] = []
+        self._start = self._new_state()
+        self._accept = self._build(node, self._start)
+        self.start = self._closure({self._start}, self._epsilons)
+        self._transitions: Dict[Tuple[FrozenSet[int], Symbol], FrozenSet[int]] = {}
+
+        # the reversed NFA, whose DFA finds where matches start
+        self._reverse_edges: List[List[Tuple[Label, int]]] = [[] for _ in self._edges]
+        self._reverse_epsilons: List[List[int]] = [[] for _ in self._edges]
+        for state, edges in enumerate(self._edges):
+            for label, target in edges:
+                self._reverse_edges[target].append((label, state))
+            for target in self._epsilons[state]:
+                self._reverse_epsilons[target].append(state)
+        self._reverse_start = self._closure({self._accept}, self._reverse_epsilons)
+        self._reverse_transitions: Dict[
+            Tuple[FrozenSet[int], Symbol], FrozenSet[int]
+        ] = {}
+
+    @staticmethod
+    def _tokenize(pattern: str) -> List[str]:
+        tokens, position = [], 0
+        pattern = pattern.strip()
+        while position < len(pattern):
+            match = TOKEN_RE.match(pattern, position)
+            assert match is not None, f"Invalid taam pattern: {pattern}"
+            tokens.append(match.group(1))
+            position = match.end()
+        return tokens
+
+    @staticmethod
+    def _parse_sequence(tokens: List[str]) -> Tuple[Node, List[str]]:
+        elements = []
+        while len(tokens) > 0 and tokens[0] != ")":
+            element, tokens = TaamPattern._parse_element(tokens)
+            elements.append(element)
+        return ("sequence", elements), tokens
+
+    @staticmethod
+    def _parse_element(tokens: List[str]) -> Tuple[Node, List[str]]:
+        token, tokens = tokens[0], tokens[1:]
+        if token in ANCHORS:
+            return ("anchor", ANCHORS[token]), tokens
+
+        if token == "(":
+            atom, tokens = TaamPattern._parse_sequence(tokens)
+            assert len(tokens) > 0, "Unclosed group in taam pattern"
+            tokens = tokens[1:]
+        elif token == ".":
+            atom = ("taam", ANY_TAAM)
+        elif token.startswith("{") and REPEAT_RE.match(token) is None:
+            names = [name.strip() for name in token[1:-1].split("|")]
+            atom = ("taam", frozenset(TaamPattern._code(name) for name in names))
+        else:
+            atom = ("taam", frozenset([TaamPattern._code(token)]))
+
+        if len(tokens) > 0 and tokens[0] == "?":
+            return ("repeat", atom, 0, 1), tokens[1:]
+        repeat = REPEAT_RE.match(tokens[0]) if len(tokens) > 0 else None
+        if repeat is not None:
+            low = int(repeat.group(1))
+            high = low if repeat.group(2) is None else int(repeat.group(2))
+            assert low <= high, f"Invalid repetition: {tokens[0]}"
+            return ("repeat", atom, low, high), tokens[1:]
+        return atom, tokens
+
+    @staticmethod
+    def _code(taam_name: str) -> int:
+        assert taam_name in TAAMIM_NAMES_TO_CODES, f"Invalid taam name: {taam_name}"
+        return TAAMIM_NAMES_TO_CODES[taam_name]
+
+    @staticmethod
+    def _min_length(node: Node) -> int:
+        """
+        Get the least number of letters that a node matches.
+        """
+        if node[0] == "taam":
+            return 1
+        if node[0] == "anchor":
+            return 0
+        if node[0] == "sequence":
+            return sum(TaamPattern._min_length(element) for element in node[1])
+        return node[2] * TaamPattern._min_length(node[1])
+
+    @staticmethod
+    def _required_codes(node: Node) -> Set[int]:
+        """
+        Get the codes of the Taamim that every match of a node contains.
+        """
+        if node[0] == "taam":
+            return set(node[1]) if len(node[1]) == 1 else set()
+        if node[0] == "anchor":
+            return {TAAMIM_NAMES_TO_CODES["atnah"]} if node[1] == AFTER_ATNAH else set()
+        if node[0] == "sequence":
+            return set().union(*map(TaamPattern._required_codes, node[1]))
+        return TaamPattern._required_codes(node[1]) if node[2] > 0 else set()
+
+    def _new_state(self) -> int:
+        self._edges.append([])
+        self._epsilons.append([])
+        return len(self._edges) - 1
+
+    def _build(self, node: Node, start: int) -> int:
+        """
+        Add the NFA states of a node, starting from a state.
+
+        :param node: The node.
+        :param start: The state to start from.
+        :return: The state reached at the end of the node.
+        """
+        if node[0] in ("taam", "anchor"):
+            end = self._new_state()
+            self._edges[start].append((node[1], end))
+            return end
+        if node[0] == "sequence":
+            for element in node[1]:
+                start = self._build(element, start)
+            return start
+
+        _, atom, low, high = node
+        for _ in range(low):
+            start = self._build(atom, start)
+        ends = [start]
+        for _ in range(high - low):
+            start = self._build(atom, start)
+            ends.append(start)
+        end = self._new_state()
+        for state in ends:
+            self._epsilons[state].append(end)
+        return end
+
+    @staticmethod
+    def _closure(states: Set[int], epsilons: List[List[int]]) -> FrozenSet[int]:
+        stack, closure = list(states), set(states)
+        while stack:
+            for state in epsilons[stack.pop()]:
+                if state not in closure:
+                    closure.add(state)
+                    stack.append(state)
+        return frozenset(closure)
+
+    @staticmethod
+    def _move(
+        states: FrozenSet[int], symbol: Symbol, edges: List[List[Tuple[Label, int]]]
+    ) -> Set[int]:
+        if isinstance(symbol, int):
+            # anchors are zero-width, so every state can also skip them
+            moved = set(states)
+            moved.update(
+                target
+                for state in states
+                for label, target in edges[state]
+                if label == symbol
+            )
+            return moved
+        return {
+            target
+            for state in states
+            for label, target in edges[state]
+            if not isinstance(label, int) and not label.isdisjoint(symbol)
+        }
+
+    def _step(self, states: FrozenSet[int], symbol: Symbol) -> FrozenSet[int]:
+        """
+        Follow a transition of the DFA, computing it the first time.
+
+        :param states: The DFA state (a set of NFA states).
+        :param symbol: A letter (the tuple of its codes) or an anchor.
+        :return: The next DFA state (empty if there is no match).
+        """
+        key = (states, symbol)
+        next_states = self._transitions.get(key)
+        if next_states is None:
+            moved = TaamPattern._move(states, symbol, self._edges)
+            next_states = TaamPattern._closure(moved, self._epsilons)
+            self._transitions[key] = next_states
+        return next_states
+
+    def _step_back(self, states: FrozenSet[int], symbol: Symbol) -> FrozenSet[int]:
+        """
+        Follow a transition of the DFA of the reversed pattern, which can start
+        (i.e. a match can end) at every symbol, computing it the first time.
+
+        :param states: The DFA state (a set of NFA states).
+        :param symbol: A letter (the tuple of its codes) or an anchor.
+        :return: The previous DFA state, which has the start state of the NFA if
+                 a match starts at the symbol.
+        """
+        key = (states, symbol)
+        next_states = self._reverse_transitions.get(key)
+        if next_states is None:
+            moved = TaamPattern._move(
+                states | self._reverse_start, symbol, self._reverse_edges
+            )
+            next_states = TaamPattern._closure(moved, self._reverse_epsilons)
+            self._reverse_transitions[key] = next_states
+        return next_states
+
+    def match_verse(
+        self, stream: TaamStream, ordinal: int, include_meshartim: bool = True
+    ) -> List[List[int]]:
+        """
+        Find the matches of the pattern in a verse.
+
+        :param stream: The stream with the verse.
+        :param ordinal: The ordinal of the verse in the stream.
+        :param include_meshartim: Whether to include Meshartim, defaults to True.
+                                  (Without them, letters with Meshartim are
+                                  skipped, so Meshartim in the pattern do not match.)
+        :return: The indices of the words of each match (see
+                 `VerseTaamSequenceResult.word_idxs`).
+        """
+        atnah = TAAMIM_NAMES_TO_CODES["atnah"]
+        start = int(stream.verse_offsets[ordinal])
+        stop = int(stream.verse_offsets[ordinal + 1])
+        symbols: List[Symbol] = [VERSE_START]
+        words: List[Optional[int]] = [None]
+        for position, word_idx, has_mesharet in zip(
+            range(start, stop),
+            stream.words[start:stop].tolist(),
+            stream.has_mesharet[start:stop].tolist(),
+        ):
+            if has_mesharet and not include_meshartim:
+                continue
+            codes = stream.letter_codes[position]
+            symbols.append(codes)
+            words.append(word_idx)
+            if atnah in codes:
+                symbols.append(AFTER_ATNAH)
+                words.append(None)
+        symbols.append(VERSE_END)
+        words.append(None)
+
+        # whether a match starts at each symbol
+        starts = [False] * len(symbols)
+        states = frozenset()
+        for i in range(len(symbols) - 1, -1, -1):
+            states = self._step_back(states, symbols[i])
+            starts[i] = self._start in states
+
+        seqs, i = [], 0
+        while i < len(symbols):
+            if not starts[i]:
+                i += 1
+                continue
+            # the longest match from its start
+            states, last = self.start, i
+            for j in range(i, len(symbols)):
+                states = self._step(states, symbols[j])
+                if len(states) == 0:
+                    break
+                if self._accept in states:
+                    last = j
+            match_words = set(words[i : last + 1])
+            match_words.discard(None)
+            seqs.append(sorted(match_words))
+            i = last + 1
+        return seqs
+
+    def candidate_verses(
+        self,
+        stream: TaamStream,
+        include_meshartim: bool = True,
+        start: int = 0,
+        stop: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Get the ordinals of the verses that contain every Taam that a match of the
+        pattern needs (among the verses with a letter in a range of the stream).
+
+        :param stream: The stream to search.
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :param start: The position of the first letter to look at, defaults to 0
+        :param stop: The position after the last letter to look at, defaults to
+                     the end of the stream
+        :return: The sorted verse ordinals.
+        """
+        if stop is None:
+            stop = len(stream)
+        candidates = np.unique(stream.verses[start:stop])
+        letter_offsets = stream.letter_offsets[start : stop + 1]
+        codes = stream.codes[letter_offsets[0] : letter_offsets[-1]]
+        code_letters = np.repeat(
+            np.arange(start, stop, dtype=np.int32), np.diff(letter_offsets)
+        )
+        for code in sorted(self.required_codes):
+            letters = code_letters[codes == code]
+            if not include_meshartim:
+                letters = letters[~stream.has_mesharet[letters]]
+            candidates = np.intersect1d(
+                candidates, stream.verses[letters], assume_unique=False
+            )
+        return candidates
+
+    def find(
+        self, stream: TaamStream, include_meshartim: bool = True
+    ) -> Dict[int, List[List[int]]]:
+        """
+        Find the verses of a stream with a match of the pattern.
+
+        :param stream: The stream to search.
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :return: The ordinals of the verses with a match mapped to the word indices
+                 of their matches, in order.
+        """
+        matches = {}
+        for ordinal in self.candidate_verses(stream, include_meshartim).tolist():
+            word_idxs = self.match_verse(stream, ordinal, include_meshartim)
+            if len(word_idxs) > 0:
+                matches[ordinal] = word_idxs
+        return matches
+
+    def __repr__(self) -> str:
+        return f"TaamPattern({self.pattern!r})"
+
+
+@lru_cache(maxsize=MAX_CACHED_PATTERNS)
+def compile_taam_pattern(pattern: str) -> TaamPattern:
+    """
+    Compile a taam pattern (see `TaamPattern`), reusing the compiled pattern (and
+    the DFA built so far) if it was compiled before.
+
+    :param pattern: The pattern.
+    :return: The compiled pattern.
+    """
+    return TaamPattern(pattern)
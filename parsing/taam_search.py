@@ -0,0 +1,312 @@
+from bisect import bisect_left
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from parsing.book import Book, BookTaamSequenceResult
+from parsing.query_cache import QUERY_CACHE, QueryCache, normalize_sequence
+from parsing.taam_automaton import find_taam_sequences
+from parsing.taam_codes import sequence_codes
+from parsing.taam_pages import (DEFAULT_PAGE_SIZE, TaamSearchPage, TaamSequenceHit,
+                                 iter_hits, paginate)
+from parsing.taam_pattern import compile_taam_pattern
+from parsing.taam_stream import TaamStream
+from parsing.taam_suffix_array import TaamSuffixArray
+from parsing.verse import Verse
+
+
+class TaamSearchEngine:
+    """
+    A TaamSearchEngine searches one or several books at once for sequences of
+    Taamim. The books are laid out as a single TaamStream; the occurrences of a
+    sequence are found by comparing every window of letters at once, and only
+    the verses with an occurrence are then matched (in lockstep, see
+    `TaamStream.match_verses`), so that the results are exactly those of
+    `Verse.find_taam_sequence`.
+    """
+
+    def __init__(self, books: Sequence[Book]):
+        self.books = list(books)
+        self.stream = TaamStream.concatenate([book.taam_stream for book in self.books])
+        # the ordinal (in the stream) of the first verse of each book
+        self.verse_starts = np.cumsum([0] + [len(book.verses) for book in self.books])
+        # the cache of query results, or None to not cache them
+        self.query_cache: Optional[QueryCache] = QUERY_CACHE
+        # computed on first use
+        self._suffix_arrays: Dict[bool, TaamSuffixArray] = {}
+
+    def _query_key(self, kind: str, query: Hashable, include_meshartim: bool) -> tuple:
+        scope = tuple(book.version for book in self.books)
+        return scope, kind, query, include_meshartim, None
+
+    def _cached(
+        self,
+        key: tuple,
+        compute: Callable[[], Optional[Dict[int, List[List[int]]]]],
+    ) -> Optional[Dict[int, List[List[int]]]]:
+        if self.query_cache is None:
+            return compute()
+        return self.query_cache.get_or_compute(key, compute)
+
+    @property
+    def verses(self) -> List[Verse]:
+        """
+        Get the verses of all the books, in order.
+
+        :return: The verses.
+        """
+        return [verse for book in self.books for verse in book.verses]
+
+    def suffix_array(self, include_meshartim: bool = True) -> TaamSuffixArray:
+        """
+        Get the suffix array of the Taamim of all the books (built on first use),
+        whose verse ordinals are those of the stream.
+
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :return: The suffix array.
+        """
+        if include_meshartim not in self._suffix_arrays:
+            self._suffix_arrays[include_meshartim] = TaamSuffixArray.from_verses(
+                self.verses, include_meshartim
+            )
+        return self._suffix_arrays[include_meshartim]
+
+    def find_matches(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> Optional[Dict[int, List[List[int]]]]:
+        """
+        Find the verses (of all the books) that contain a sequence of Taamim.
+
+        :param taam_sequence: The sequence of Taamim.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The ordinals (in the stream) of the verses with a match mapped to
+                 the word indices of their matches, in order, or None if the
+                 sequence is empty (once Meshartim are left out).
+        """
+        codes = sequence_codes(taam_sequence, include_meshartim)
+        if codes is None:
+            return {}
+        if len(codes) == 0:
+            return None
+        starts = self.stream.occurrences(codes, include_meshartim)
+        return self.stream.match_verses(
+            self.stream.verses[starts], codes, include_meshartim
+        )
+
+    def find_verses_with_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> Dict[str, BookTaamSequenceResult]:
+        """
+        Find verses with a sequence of Taamim in every book, broken down by parasha
+        and aliyah.
+
+        :param taam_sequence: The taam sequence to find.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The name of each book mapped to its results (see
+                 `Book.find_verses_with_taam_sequence`).
+        """
+        key = self._query_key(
+            "sequence",
+            normalize_sequence(taam_sequence, include_meshartim),
+            include_meshartim,
+        )
+
+        matches = self._cached(
+            key, lambda: self.find_matches(taam_sequence, include_meshartim)
+        )
+        return self._results_by_book(taam_sequence, matches, include_meshartim)
+
+    def find_verses_with_taam_sequences(
+        self, taam_sequences: List[List[str]], include_meshartim: bool = True
+    ) -> List[Dict[str, BookTaamSequenceResult]]:
+        """
+        Find verses with each of several sequences of Taamim in every book. All the
+        sequences are looked for in a single pass over the books (see
+        `TaamAutomaton`).
+
+        :param taam_sequences: The taam sequences to find.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The results for each sequence, in order (see
+                 `find_verses_with_taam_sequence`).
+        """
+        keys = [
+            self._query_key(
+                "sequence",
+                normalize_sequence(taam_sequence, include_meshartim),
+                include_meshartim,
+            )
+            for taam_sequence in taam_sequences
+        ]
+        cache = self.query_cache
+        missing_value = object()
+        matches = [
+            missing_value if cache is None else cache.get(key, missing_value)
+            for key in keys
+        ]
+        # only the sequences whose matches are not cached are searched for
+        missing = [i for i, found in enumerate(matches) if found is missing_value]
+        for i, sequence_matches in zip(
+            missing,
+            find_taam_sequences(
+                self.stream, [taam_sequences[i] for i in missing], include_meshartim
+            ),
+        ):
+            matches[i] = sequence_matches
+            if cache is not None:
+                cache.put(keys[i], sequence_matches)
+        return [
+            self._results_by_book(taam_sequence, sequence_matches, include_meshartim)
+            for taam_sequence, sequence_matches in zip(taam_sequences, matches)
+        ]
+
+    def find_verses_with_taam_pattern(
+        self, pattern: str, include_meshartim: bool = True
+    ) -> Dict[str, BookTaamSequenceResult]:
+        """
+        Find verses with a match of a taam pattern (see `TaamPattern`) in every
+        book, broken down by parasha and aliyah.
+
+        :param pattern: The taam pattern to find.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The name of each book mapped to its results (see
+                 `Book.find_verses_with_taam_pattern`).
+        """
+        key = self._query_key("pattern", " ".join(pattern.split()), include_meshartim)
+
+        matches = self._cached(
+            key,
+            lambda: compile_taam_pattern(pattern).find(self.stream, include_meshartim),
+        )
+        return self._group_by_book(matches)
+
+    def count_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> int:
+        """
+        Count the matches of a sequence of Taamim in every book (see
+        `Book.count_taam_sequence`).
+
+        :param taam_sequence: The taam sequence to count.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The number of matches.
+        """
+        return sum(
+            book.count_taam_sequence(taam_sequence, include_meshartim)
+            for book in self.books
+        )
+
+    def has_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> bool:
+        """
+        Check whether any book contains a sequence of Taamim, stopping at the
+        first match (see `Book.has_taam_sequence`).
+
+        :param taam_sequence: The taam sequence to find.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: Whether the sequence is found.
+        """
+        return any(
+            book.has_taam_sequence(taam_sequence, include_meshartim)
+            for book in self.books
+        )
+
+    def iter_verses_with_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True, cursor: int = 0
+    ) -> Iterator[TaamSequenceHit]:
+        """
+        Find verses with a sequence of Taamim in every book one at a time, in the
+        order of `find_verses_with_taam_sequence` (see
+        `Book.iter_verses_with_taam_sequence`).
+
+        :param taam_sequence: The (non-empty) taam sequence to find.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :param cursor: The ordinal (in the stream) of the verse to start at,
+                       defaults to 0
+        :return: The hits, in order.
+        """
+        return iter_hits(
+            self.books, self.stream, taam_sequence, include_meshartim, cursor
+        )
+
+    def page_verses_with_taam_sequence(
+        self,
+        taam_sequence: List[str],
+        include_meshartim: bool = True,
+        limit: int = DEFAULT_PAGE_SIZE,
+        offset: int = 0,
+        cursor: int = 0,
+    ) -> TaamSearchPage:
+        """
+        Find a page of the verses with a sequence of Taamim in every book,
+        stopping as soon as the page is full.
+
+        :param taam_sequence: The (non-empty) taam sequence to find.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :param limit: The number of verses on the page, defaults to DEFAULT_PAGE_SIZE
+        :param offset: The number of verses to skip (after the cursor), defaults to 0
+        :param cursor: The ordinal (in the stream) of the verse to start at, e.g.
+                       the `next_cursor` of the previous page, defaults to 0
+        :return: The page of hits.
+        """
+        hits = self.iter_verses_with_taam_sequence(
+            taam_sequence, include_meshartim, cursor
+        )
+        return paginate(hits, limit, offset)
+
+    def _results_by_book(
+        self,
+        taam_sequence: List[str],
+        matches: Optional[Dict[int, List[List[int]]]],
+        include_meshartim: bool,
+    ) -> Dict[str, BookTaamSequenceResult]:
+        """
+        Split the matches of a sequence of Taamim (see `find_matches`) by book.
+
+        :param taam_sequence: The taam sequence that was searched for.
+        :param matches: The matches of the sequence in all the books, or None to
+                        search each book (for an empty sequence).
+        :param include_meshartim: Whether Meshartim were included in the search.
+        :return: The name of each book mapped to its results.
+        """
+        if matches is not None:
+            return self._group_by_book(matches)
+        return {
+            book.name: BookTaamSequenceResult(
+                book.find_verses_with_taam_sequence(taam_sequence, include_meshartim)
+            )
+            for book in self.books
+        }
+
+    def _group_by_book(
+        self, matches: Dict[int, List[List[int]]]
+    ) -> Dict[str, BookTaamSequenceResult]:
+        """
+        Split matches in all the books by book (see `Book.group_matches`).
+
+        :param matches: The ordinals (in the stream) of the verses with a match
+                        mapped to the word indices of their matches, in order.
+        :return: The name of each book mapped to its results.
+        """
+        ordinals = list(matches)
+        results = {}
+        for book, start, stop in zip(
+            self.books, self.verse_starts.tolist(), self.verse_starts[1:].tolist()
+        ):
+            book_ordinals = ordinals[
+                bisect_left(ordinals, start) : bisect_left(ordinals, stop)
+            ]
+            results[book.name] = BookTaamSequenceResult(
+                book.group_matches(
+                    {ordinal - start: matches[ordinal] for ordinal in book_ordinals}
+                )
+            )
+        return results
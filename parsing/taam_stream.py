@@ -0,0 +1,360 @@
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from parsing.symbols import TAAME_MESHARET
+from parsing.verse import Verse
+
+
+class TaamStream:
+    """
+    A TaamStream lays out the letters with taamim of a sequence of verses (e.g.
+    the verses of a book) as flat arrays, in the order that
+    `Verse.find_taam_sequence` visits them. For each such letter it records:
+
+    - `verses`: the ordinal of its verse in the sequence of verses,
+    - `words`: the index of its word in the verse's `taam_words`,
+    - `has_mesharet`: whether one of its taamim is a mesharet,
+    - `codes[letter_offsets[i] : letter_offsets[i + 1]]`: the codes of its
+      taamim (a letter can have more than one),
+    - `resume`: where `Verse.find_taam_sequence` carries on after a match
+      that ends on it (it skips the rest of the word, or the whole next word
+      if the match ends on the last letter of a word).
+
+    `verse_offsets[v]` is the position of the first letter of verse `v`.
+    """
+
+    def __init__(
+        self,
+        verses: np.ndarray,
+        words: np.ndarray,
+        has_mesharet: np.ndarray,
+        letter_offsets: np.ndarray,
+        codes: np.ndarray,
+        resume: np.ndarray,
+        verse_offsets: np.ndarray,
+        code_table: Optional[np.ndarray] = None,
+    ):
+        self.verses = verses
+        self.words = words
+        self.has_mesharet = has_mesharet
+        self.letter_offsets = letter_offsets
+        self.codes = codes
+        self.resume = resume
+        self.verse_offsets = verse_offsets
+        # computed on first use (unless the code table is given)
+        self._letter_codes = None
+        self._code_table = code_table
+
+    @classmethod
+    def from_verses(cls, verses: Sequence[Verse]) -> "TaamStream":
+        """
+        Lay out the letters with taamim of a sequence of verses.
+
+        :param verses: The verses.
+        :return: The TaamStream of the verses.
+        """
+        letter_verses: List[int] = []
+        letter_words: List[int] = []
+        has_mesharet: List[bool] = []
+        letter_offsets, codes, resume, verse_offsets = [0], [], [], [0]
+        for ordinal, verse in enumerate(verses):
+            verse_start = len(letter_verses)
+            word_lengths, ends_word = [], []
+            for word_idx, word in enumerate(verse.taam_words):
+                letters = word.letters
+                word_lengths.append(len(letters))
+                for letter_idx, letter in enumerate(letters):
+                    taamim = letter.taamim
+                    if len(taamim) == 0:
+                        continue
+                    letter_verses.append(ordinal)
+                    letter_words.append(word_idx)
+                    has_mesharet.append(any(t.name in TAAME_MESHARET for t in taamim))
+                    codes.extend(taam.code for taam in taamim)
+                    letter_offsets.append(len(codes))
+                    ends_word.append(letter_idx == len(letters) - 1)
+
+            verse_words = letter_words[verse_start:]
+            for word_idx, is_last in zip(verse_words, ends_word):
+                if is_last:
+                    # the next word with letters is where the match is noticed
+                    word_idx = next(
+                        (
+                            next_idx
+                            for next_idx in range(word_idx + 1, len(word_lengths))
+                            if word_lengths[next_idx] > 0
+                        ),
+                        len(word_lengths),
+                    )
+                resume.append(verse_start + bisect_right(verse_words, word_idx))
+            verse_offsets.append(len(letter_verses))
+        return cls(
+            np.asarray(letter_verses, dtype=np.int32),
+            np.asarray(letter_words, dtype=np.int32),
+            np.asarray(has_mesharet, dtype=bool),
+            np.asarray(letter_offsets, dtype=np.int32),
+            np.asarray(codes, dtype=np.uint8),
+            np.asarray(resume, dtype=np.int32),
+            np.asarray(verse_offsets, dtype=np.int32),
+        )
+
+    @classmethod
+    def concatenate(cls, streams: Sequence["TaamStream"]) -> "TaamStream":
+        """
+        Lay out several streams (e.g. of consecutive books) as one stream, whose
+        verse ordinals run across all of them.
+
+        :param streams: The streams.
+        :return: The concatenated stream.
+        """
+        verse_starts = np.cumsum([0] + [s.num_verses for s in streams[:-1]])
+        letter_starts = np.cumsum([0] + [len(s) for s in streams[:-1]])
+        code_starts = np.cumsum([0] + [len(s.codes) for s in streams[:-1]])
+
+        def shifted(arrays: List[np.ndarray], starts: Sequence[int]) -> np.ndarray:
+            return np.concatenate(
+                [np.asarray(array) + start for array, start in zip(arrays, starts)]
+            ).astype(np.int32)
+
+        return cls(
+            shifted([s.verses for s in streams], verse_starts),
+            np.concatenate([s.words for s in streams]),
+            np.concatenate([s.has_mesharet for s in streams]),
+            shifted(
+                [[0]] + [s.letter_offsets[1:] for s in streams], [0, *code_starts]
+            ),
+            np.concatenate([s.codes for s in streams]),
+            shifted([s.resume for s in streams], letter_starts),
+            shifted(
+                [[0]] + [s.verse_offsets[1:] for s in streams], [0, *letter_starts]
+            ),
+        )
+
+    @property
+    def num_verses(self) -> int:
+        """
+        Get the number of verses laid out in the stream.
+
+        :return: The number of verses.
+        """
+        return len(self.verse_offsets) - 1
+
+    @property
+    def code_letters(self) -> np.ndarray:
+        """
+        Get the position of the letter that each code in `codes` belongs to.
+
+        :return: The letter position of each code.
+        """
+        return np.repeat(
+            np.arange(len(self), dtype=np.int32), np.diff(self.letter_offsets)
+        )
+
+    @property
+    def primary_codes(self) -> np.ndarray:
+        """
+        Get the code of the first taam of each letter.
+
+        :return: The first taam code of each letter.
+        """
+        return self.codes[self.letter_offsets[:-1]]
+
+    @property
+    def letter_codes(self) -> List[Tuple[int, ...]]:
+        """
+        Get the codes of the taamim of each letter, as tuples.
+
+        :return: The taam codes of each letter.
+        """
+        if self._letter_codes is None:
+            codes = self.codes.tolist()
+            offsets = self.letter_offsets.tolist()
+            self._letter_codes = [
+                tuple(codes[start:stop]) for start, stop in zip(offsets, offsets[1:])
+            ]
+        return self._letter_codes
+
+    @property
+    def code_table(self) -> np.ndarray:
+        """
+        Get the codes of the taamim of each letter as the rows of a table, padded
+        with code 0 (most letters have a single taam).
+
+        :return: The (letters x most taamim on a letter) table of codes.
+        """
+        if self._code_table is None:
+            counts = np.diff(self.letter_offsets)
+            width = int(counts.max()) if len(counts) > 0 else 1
+            table = np.zeros((len(self), width), dtype=np.uint8)
+            columns = np.arange(len(self.codes)) - np.repeat(
+                self.letter_offsets[:-1], counts
+            )
+            table[self.code_letters, columns] = self.codes
+            self._code_table = table
+        return self._code_table
+
+    def occurrences(
+        self,
+        codes: Sequence[int],
+        include_meshartim: bool = True,
+        start: int = 0,
+        stop: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Find where a sequence of taam codes occurs on consecutive letters of a
+        verse, comparing every window of letters at once. (Unlike
+        `match_verses`, this includes occurrences that overlap.)
+
+        :param codes: The (non-empty) sequence of taam codes, without Meshartim if
+                      `include_meshartim` is False.
+        :param include_meshartim: Whether letters with Meshartim are part of the
+                                  stream, defaults to True
+        :param start: The position of the first letter to search, defaults to 0
+        :param stop: The position after the last letter to search (the range
+                     should span whole verses), defaults to the end of the stream
+        :return: The sorted positions of the letters where the sequence starts.
+        """
+        stop = len(self) if stop is None else stop
+        if include_meshartim:
+            letters = np.arange(start, stop, dtype=np.int32)
+        else:
+            letters = (start + np.flatnonzero(~self.has_mesharet[start:stop])).astype(
+                np.int32
+            )
+        n = len(codes)
+        if len(letters) < n:
+            return np.zeros(0, dtype=np.int32)
+
+        # windows[i, :, j] holds the codes of the j-th letter after letter i
+        windows = sliding_window_view(self.code_table[letters], n, axis=0)
+        query = np.asarray(codes, dtype=np.uint8)
+        hits = (windows == query).any(axis=1).all(axis=1)
+        # the letters of a match must be in the same verse
+        verses = self.verses[letters]
+        hits &= verses[: len(verses) - n + 1] == verses[n - 1 :]
+        return letters[np.flatnonzero(hits)]
+
+    def _scan_verses(
+        self,
+        ordinals: Sequence[int],
+        codes: Sequence[int],
+        include_meshartim: bool,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Scan several verses for a sequence of taam codes in lockstep, one letter
+        of each at a time (see `match_verses`).
+
+        :param ordinals: The ordinals of the verses.
+        :param codes: The (non-empty) sequence of taam codes.
+        :param include_meshartim: Whether to include Meshartim in the search.
+        :return: The sorted unique ordinals, and for each match (in the order
+                 they were found) the index of its verse among them and the
+                 positions of its first letter and after its last letter.
+        """
+        ordinals = np.unique(np.asarray(ordinals, dtype=np.int64))
+        starts = self.verse_offsets[ordinals].astype(np.int64)
+        lengths = self.verse_offsets[ordinals + 1] - starts
+        query = np.asarray(codes, dtype=np.uint8)
+        table = self.code_table
+
+        # the state of each verse: how much of the sequence has been matched,
+        # where the current match started and where the scan carries on
+        seq_idxs = np.zeros(len(ordinals), dtype=np.int64)
+        match_starts = np.zeros(len(ordinals), dtype=np.int64)
+        resume = starts.copy()
+        found_verses = [np.zeros(0, dtype=np.int64)]
+        found_starts = [np.zeros(0, dtype=np.int64)]
+        found_stops = [np.zeros(0, dtype=np.int64)]
+        for step in range(int(lengths.max()) if len(ordinals) > 0 else 0):
+            live = np.flatnonzero((step < lengths) & (starts + step >= resume))
+            positions = starts[live] + step
+            if not include_meshartim:
+                keep = ~self.has_mesharet[positions]
+                live, positions = live[keep], positions[keep]
+
+            hit = (table[positions] == query[seq_idxs[live], None]).any(axis=1)
+            seq_idxs[live[~hit]] = 0
+            live, positions = live[hit], positions[hit]
+            match_starts[live] = np.where(
+                seq_idxs[live] == 0, positions, match_starts[live]
+            )
+            seq_idxs[live] += 1
+
+            done = seq_idxs[live] == len(query)
+            live, positions = live[done], positions[done]
+            found_verses.append(live)
+            found_starts.append(match_starts[live])
+            found_stops.append(positions + 1)
+            seq_idxs[live] = 0
+            resume[live] = self.resume[positions]
+
+        return (
+            ordinals,
+            np.concatenate(found_verses),
+            np.concatenate(found_starts),
+            np.concatenate(found_stops),
+        )
+
+    def match_verses(
+        self,
+        ordinals: Sequence[int],
+        codes: Sequence[int],
+        include_meshartim: bool = True,
+    ) -> Dict[int, List[List[int]]]:
+        """
+        Find a sequence of taam codes in several verses, exactly like
+        `Verse.find_taam_sequence` does (which, e.g., does not look for a new
+        match on the letter that broke off a partial match). All the verses are
+        scanned in lockstep, one letter of each at a time.
+
+        :param ordinals: The ordinals of the verses.
+        :param codes: The (non-empty) sequence of taam codes, without Meshartim if
+                      `include_meshartim` is False.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The ordinals of the verses with a match mapped to the word indices
+                 of their matches (see `VerseTaamSequenceResult.word_idxs`), in
+                 order.
+        """
+        ordinals, found_verses, found_starts, found_stops = self._scan_verses(
+            ordinals, codes, include_meshartim
+        )
+        matches: Dict[int, List[List[int]]] = {}
+        # matches were found step by step, so sort them by verse (stably)
+        order = np.argsort(found_verses, kind="stable")
+        for verse, start, stop in zip(
+            ordinals[found_verses[order]].tolist(),
+            found_starts[order].tolist(),
+            found_stops[order].tolist(),
+        ):
+            words = self.words[start:stop]
+            if not include_meshartim:
+                words = words[~self.has_mesharet[start:stop]]
+            matches.setdefault(verse, []).append(sorted(set(words.tolist())))
+        return matches
+
+    def count_matches(
+        self,
+        ordinals: Sequence[int],
+        codes: Sequence[int],
+        include_meshartim: bool = True,
+    ) -> int:
+        """
+        Count the matches of a sequence of taam codes in several verses (the
+        number of matches `match_verses` finds), without building them.
+
+        :param ordinals: The ordinals of the verses.
+        :param codes: The (non-empty) sequence of taam codes, without Meshartim if
+                      `include_meshartim` is False.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The number of matches.
+        """
+        _, found_verses, _, _ = self._scan_verses(ordinals, codes, include_meshartim)
+        return len(found_verses)
+
+    def __len__(self) -> int:
+        return len(self.verses)
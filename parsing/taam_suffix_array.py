@@ -0,0 +1,296 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from parsing.symbols import TAAMIM_CODES_TO_NAMES, TAAMIM_NAMES_TO_CODES
+from parsing.verse import Verse
+
+SUFFIX_ARRAY_FORMAT_VERSION = 1
+# code 0 is reserved, so it separates the verses in the text
+SEPARATOR = 0
+
+
+class TaamSuffixArray:
+    """
+    A TaamSuffixArray is a suffix array over the taam codes of a sequence of
+    verses (e.g. every verse of the Torah), the Taamim of each verse (as in
+    `Verse.taam_codes`) followed by a separator. With it:
+
+    - the occurrences of a sequence of Taamim of any length are a range of the
+      suffix array, found by binary search,
+    - `lcp[i]` is the length of the longest sequence of Taamim (within a verse)
+      that suffixes `i - 1` and `i` start with, so the longest repeated
+      sequences and the sequences that occur at least k times can be read off
+      it, without counting every n-gram.
+
+    Occurrences are counted like `Aliyah.count_n_taam_sequences` counts them
+    (i.e. they can overlap, but not cross verses).
+    """
+
+    def __init__(
+        self,
+        text: np.ndarray,
+        suffixes: np.ndarray,
+        lcp: np.ndarray,
+        verse_offsets: np.ndarray,
+    ):
+        self.text = text
+        self.suffixes = suffixes
+        self.lcp = lcp
+        # the position of the first taam of each verse in the text
+        self.verse_offsets = verse_offsets
+        self._bytes = text.tobytes()
+
+    @classmethod
+    def from_verse_codes(cls, verse_codes: Sequence[np.ndarray]) -> "TaamSuffixArray":
+        """
+        Build the suffix array of the taam codes of a sequence of verses.
+
+        :param verse_codes: The taam codes of each verse (e.g. `Verse.taam_codes`).
+        :return: The TaamSuffixArray of the verses.
+        """
+        lengths = np.asarray([len(codes) for codes in verse_codes], dtype=np.int64)
+        verse_offsets = np.concatenate([[0], np.cumsum(lengths + 1)]).astype(np.int64)
+        text = np.full(int(verse_offsets[-1]), SEPARATOR, dtype=np.uint8)
+        for start, codes in zip(verse_offsets.tolist(), verse_codes):
+            text[start : start + len(codes)] = codes
+        suffixes = TaamSuffixArray._sort_suffixes(text)
+        lcp = TaamSuffixArray._longest_common_prefixes(text, suffixes, verse_offsets)
+        return cls(text, suffixes, lcp, verse_offsets)
+
+    @classmethod
+    def from_verses(
+        cls, verses: Sequence[Verse], include_meshartim: bool = True
+    ) -> "TaamSuffixArray":
+        """
+        Build the suffix array of the Taamim of a sequence of verses.
+
+        :param verses: The verses (e.g. of several books, one after the other).
+        :param include_meshartim: Whether to include Meshartim, defaults to True
+        :return: The TaamSuffixArray of the verses.
+        """
+        return cls.from_verse_codes(
+            [
+                verse.taam_codes
+                if include_meshartim
+                else verse.taam_codes_without_meshartim
+                for verse in verses
+            ]
+        )
+
+    @staticmethod
+    def _sort_suffixes(text: np.ndarray) -> np.ndarray:
+        """
+        Sort the suffixes of a text by prefix doubling: after each round, the
+        suffixes are ranked by their first 2k codes (a suffix that ends first
+        comes first).
+        """
+        n = len(text)
+        rank = text.astype(np.int64)
+        suffixes = np.argsort(rank, kind="stable")
+        k = 1
+        while n > 0:
+            second = np.full(n, -1, dtype=np.int64)
+            second[: max(n - k, 0)] = rank[k:]
+            suffixes = np.lexsort((second, rank))
+            sorted_rank, sorted_second = rank[suffixes], second[suffixes]
+            new_group = np.ones(n, dtype=bool)
+            new_group[1:] = (sorted_rank[1:] != sorted_rank[:-1]) | (
+                sorted_second[1:] != sorted_second[:-1]
+            )
+            rank = np.empty(n, dtype=np.int64)
+            rank[suffixes] = np.cumsum(new_group) - 1
+            if new_group.all():
+                break
+            k *= 2
+        return suffixes.astype(np.int32)
+
+    @staticmethod
+    def _longest_common_prefixes(
+        text: np.ndarray, suffixes: np.ndarray, verse_offsets: np.ndarray
+    ) -> np.ndarray:
+        """
+        Compute the LCP array of a suffix array (Kasai et al.), cutting the common
+        prefixes off at the end of their verse.
+        """
+        codes, order = text.tolist(), suffixes.tolist()
+        n = len(codes)
+        rank = [0] * n
+        for i, suffix in enumerate(order):
+            rank[suffix] = i
+        lcp, h = [0] * n, 0
+        for i in range(n):
+            if rank[i] == 0:
+                h = 0
+                continue
+            j = order[rank[i] - 1]
+            while i + h < n and j + h < n and codes[i + h] == codes[j + h]:
+                h += 1
+            lcp[rank[i]] = h
+            h = max(h - 1, 0)
+
+        # the separator after the verse of each suffix
+        separators = verse_offsets[1:] - 1
+        ends = separators[np.searchsorted(separators, suffixes)]
+        return np.minimum(np.asarray(lcp, dtype=np.int32), ends - suffixes).astype(
+            np.int32
+        )
+
+    def save(self, path: str):
+        """
+        Write the suffix array to a file (a NumPy .npz archive).
+
+        :param path: The path of the file to write.
+        """
+        np.savez(
+            path,
+            version=np.asarray(SUFFIX_ARRAY_FORMAT_VERSION),
+            text=self.text,
+            suffixes=self.suffixes,
+            lcp=self.lcp,
+            verse_offsets=self.verse_offsets,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "TaamSuffixArray":
+        """
+        Load a suffix array written with `save`.
+
+        :param path: The path of the file.
+        :return: The TaamSuffixArray.
+        """
+        with np.load(path) as arrays:
+            version = int(arrays["version"])
+            assert (
+                version == SUFFIX_ARRAY_FORMAT_VERSION
+            ), f"Unsupported suffix array version: {version}"
+            return cls(
+                arrays["text"],
+                arrays["suffixes"],
+                arrays["lcp"],
+                arrays["verse_offsets"],
+            )
+
+    def _range(self, codes: Sequence[int]) -> Tuple[int, int]:
+        """
+        Find the range of the suffixes that start with a sequence of codes by
+        binary search.
+        """
+        query = bytes(codes)
+        m = len(query)
+        data, suffixes = self._bytes, self.suffixes
+
+        lo, hi = 0, len(suffixes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = int(suffixes[mid])
+            if data[start : start + m] < query:
+                lo = mid + 1
+            else:
+                hi = mid
+        first, hi = lo, len(suffixes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = int(suffixes[mid])
+            if data[start : start + m] <= query:
+                lo = mid + 1
+            else:
+                hi = mid
+        return first, lo
+
+    @staticmethod
+    def _codes(taam_sequence: Sequence[str]) -> Optional[List[int]]:
+        codes = [TAAMIM_NAMES_TO_CODES.get(taam_name) for taam_name in taam_sequence]
+        return None if None in codes else codes
+
+    def count(self, taam_sequence: Sequence[str]) -> int:
+        """
+        Count the occurrences of a sequence of Taamim.
+
+        :param taam_sequence: The (non-empty) sequence of Taamim.
+        :return: The number of occurrences.
+        """
+        assert len(taam_sequence) > 0, "Empty taam sequence"
+        codes = TaamSuffixArray._codes(taam_sequence)
+        if codes is None:
+            return 0
+        lo, hi = self._range(codes)
+        return hi - lo
+
+    def positions(self, taam_sequence: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the positions of the occurrences of a sequence of Taamim.
+
+        :param taam_sequence: The (non-empty) sequence of Taamim.
+        :return: The ordinals of the verses of the occurrences and the indices (in
+                 the Taamim of each verse) where they start, sorted.
+        """
+        assert len(taam_sequence) > 0, "Empty taam sequence"
+        codes = TaamSuffixArray._codes(taam_sequence)
+        if codes is None:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        lo, hi = self._range(codes)
+        starts = np.sort(self.suffixes[lo:hi]).astype(np.int64)
+        verses = np.searchsorted(self.verse_offsets, starts, side="right") - 1
+        return verses, starts - self.verse_offsets[verses]
+
+    def _names(self, start: int, length: int) -> Tuple[str, ...]:
+        return tuple(
+            TAAMIM_CODES_TO_NAMES[code]
+            for code in self.text[start : start + length].tolist()
+        )
+
+    def longest_repeated_sequences(self, min_count: int = 2) -> List[Tuple[str, ...]]:
+        """
+        Find the longest sequences of Taamim that occur at least a number of times.
+
+        :param min_count: The least number of occurrences, defaults to 2
+        :return: The longest such sequences (all of the same length), sorted.
+        """
+        assert min_count >= 2, f"Invalid number of occurrences: {min_count}"
+        if len(self.lcp) < min_count:
+            return []
+        # the sequence shared by suffixes i - min_count + 1, ..., i
+        shared = sliding_window_view(self.lcp[1:], min_count - 1).min(axis=1)
+        length = int(shared.max())
+        if length == 0:
+            return []
+        starts = self.suffixes[np.flatnonzero(shared == length) + 1]
+        return sorted({self._names(start, length) for start in starts.tolist()})
+
+    def frequent_sequences(
+        self, min_count: int, min_length: int = 1, max_length: Optional[int] = None
+    ) -> Dict[Tuple[str, ...], int]:
+        """
+        Find every sequence of Taamim that occurs at least a number of times, from
+        the intervals of the LCP array (each interval is the set of suffixes that
+        start with the same sequences).
+
+        :param min_count: The least number of occurrences (at least 2).
+        :param min_length: The least length of the sequences, defaults to 1
+        :param max_length: The greatest length of the sequences, defaults to no limit
+        :return: The sequences mapped to their number of occurrences.
+        """
+        assert min_count >= 2, f"Invalid number of occurrences: {min_count}"
+        lcp, suffixes = self.lcp.tolist(), self.suffixes.tolist()
+        counts = {}
+        # the intervals that are still open: (length of their common prefix, start)
+        stack = [(0, 0)]
+        for i in range(1, len(lcp) + 1):
+            current = lcp[i] if i < len(lcp) else 0
+            left = i - 1
+            while stack[-1][0] > current:
+                length, left = stack.pop()
+                parent = max(current, stack[-1][0])
+                if i - left >= min_count:
+                    top = length if max_length is None else min(length, max_length)
+                    for n in range(max(parent + 1, min_length), top + 1):
+                        counts[self._names(suffixes[left], n)] = i - left
+            if stack[-1][0] < current:
+                stack.append((current, left))
+        return counts
+
+    def __len__(self) -> int:
+        return len(self.text)
@@ -0,0 +1,45 @@
+from typing import List
+
+from parsing.letter import Letter
+from parsing.niqud import Niqud
+from parsing.symbols import LETTERS, NEQUDOT_SYMBOLS_TO_NAMES, TAAMIM_SYMBOLS_TO_NAMES
+from parsing.taam import Taam
+
+LETTER_CLASS, TAAM_CLASS, NIQUD_CLASS = range(3)
+
+# Every codepoint we care about, classified once up front. Anything else
+# (e.g. meteg, CGJ or directional marks) is skipped.
+CHAR_CLASSES = {
+    **{letter: LETTER_CLASS for letter in LETTERS},
+    **{
+        symbol: TAAM_CLASS
+        for symbol in TAAMIM_SYMBOLS_TO_NAMES
+        if len(symbol) == 1
+    },
+    **{symbol: NIQUD_CLASS for symbol in NEQUDOT_SYMBOLS_TO_NAMES},
+}
+
+
+def tokenize_word(word: str) -> List[Letter]:
+    """
+    Split a word into Letters in a single pass. Each letter collects the taamim
+    and nequdot that follow it up to the next letter; marks before the first
+    letter are dropped.
+
+    :param word: The string representation of the word.
+    :return: The Letters of the word.
+    """
+    letters = []
+    taamim, nequdot = None, None
+    for char in word:
+        char_class = CHAR_CLASSES.get(char)
+        if char_class == LETTER_CLASS:
+            taamim, nequdot = [], []
+            letters.append(Letter(char, taamim, nequdot))
+        elif taamim is None:
+            continue
+        elif char_class == TAAM_CLASS:
+            taamim.append(Taam.from_symbol(char))
+        elif char_class == NIQUD_CLASS:
+            nequdot.append(Niqud.from_symbol(char))
+    return letters
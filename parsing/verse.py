@@ -1,7 +1,10 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from parsing.symbols import MAQAF, TAAME_MESHARET, TAAMIM_NAMES_TO_SYMBOLS
 from parsing.taam import Taam
+from parsing.taam_codes import encode_taamim
 from parsing.word import Word
 
 
@@ -50,6 +53,37 @@ class Verse:
         ]
         self._nequdot = [niqud for letter in self._letters for niqud in letter.nequdot]
         self._maqaf_indices = maqaf_indices if maqaf_indices is not None else []
+        # computed on first use
+        self._words_without_maqafs = None
+        self._taam_words = None
+        self._taam_codes = None
+        self._taam_codes_without_meshartim = None
+
+    @staticmethod
+    def join_maqaf_words(words: Sequence[Word]) -> Tuple[Word, ...]:
+        """
+        Combine words that have maqafs between them into single words.
+
+        :param words: The words of a verse, including the maqafs.
+        :return: The words connected with maqafs (if they're there).
+        """
+        groups, group_letters = [], []
+        for word in words:
+            letters = word.letters
+            if word.is_maqaf or (
+                len(groups) > 0
+                and len(group_letters[-1]) > 0
+                and group_letters[-1][-1].is_maqaf
+            ):
+                groups[-1].append(word)
+                group_letters[-1].extend(letters)
+            else:
+                groups.append([word])
+                group_letters.append(list(letters))
+        return tuple(
+            group[0] if len(group) == 1 else Word(letters)
+            for group, letters in zip(groups, group_letters)
+        )
 
     @staticmethod
     def trim_word_list(words: List[Word]) -> List[Word]:
@@ -126,6 +160,31 @@ class Verse:
         """
         return self._taamim_without_meshartim
 
+    @property
+    def taam_codes(self) -> np.ndarray:
+        """
+        Get the integer codes of the taamim in the Verse.
+
+        :return: A read-only array with the code of each taam in the Verse.
+        """
+        if self._taam_codes is None:
+            self._taam_codes = encode_taamim(self.taamim)
+        return self._taam_codes
+
+    @property
+    def taam_codes_without_meshartim(self) -> np.ndarray:
+        """
+        Get the integer codes of the taamim in the Verse without the meshartim.
+
+        :return: A read-only array with the code of each taam in the Verse that
+                 is not a mesharet.
+        """
+        if self._taam_codes_without_meshartim is None:
+            self._taam_codes_without_meshartim = encode_taamim(
+                self.taamim_without_meshartim
+            )
+        return self._taam_codes_without_meshartim
+
     @property
     def nequdot(self):
         """
@@ -142,7 +201,11 @@ class Verse:
 
         :return: The words in the Verse.
         """
-        return [word for word in self._words if not word.is_maqaf]
+        if self._words_without_maqafs is None:
+            self._words_without_maqafs = tuple(
+                word for word in self._words if not word.is_maqaf
+            )
+        return self._words_without_maqafs
 
     @property
     def taam_words(self):
@@ -152,13 +215,9 @@ class Verse:
 
         :return: The words in the Verse connected with maqafs (if they're there).
         """
-        words = []
-        for word in self._words:
-            if word.is_maqaf or (len(words) > 0 and words[-1].letters[-1].is_maqaf):
-                words[-1] = Word(words[-1].letters + word.letters)
-            else:
-                words.append(word)
-        return words
+        if self._taam_words is None:
+            self._taam_words = Verse.join_maqaf_words(self._words)
+        return self._taam_words
 
     def has_taam(self, taam_name: str) -> bool:
         """
@@ -169,16 +228,16 @@ class Verse:
         """
         return any(word.has_taam(taam_name) for word in self._words)
 
-    def find_taam_sequence(
-        self, taam_sequence: List[str], include_meshartim: bool = True
-    ) -> VerseTaamSequenceResult:
+    def _iter_taam_sequence_matches(
+        self, taam_sequence: List[str], include_meshartim: bool
+    ) -> Iterator[List[int]]:
         """
-        Check if the Verse contains a sequence of Taamim.
+        Scan the Verse for a sequence of Taamim, yielding each match (the indices
+        of the words of its letters) as soon as it is complete.
 
         :param taam_sequence: The sequence of Taamim.
-        :return: The inner lists are the indices of the words in a sequence.
-                 If there is more than one sequence, the outer list contains
-                 all the sequences.
+        :param include_meshartim: Whether to include Meshartim in the search.
+        :return: The matches, in order.
         """
         # exclude meshartim if necessary
         if not include_meshartim:
@@ -187,12 +246,11 @@ class Verse:
                 for taam_name in taam_sequence
                 if taam_name not in TAAME_MESHARET
             ]
-        seqs = []
         curr_seq, seq_idx = [], 0
         for word_idx, word in enumerate(self.taam_words):
             for letter in word:
                 if seq_idx == len(taam_sequence):
-                    seqs.append(curr_seq)
+                    yield curr_seq
                     curr_seq, seq_idx = [], 0
                     break
 
@@ -209,10 +267,57 @@ class Verse:
                     curr_seq, seq_idx = [], 0
 
         if seq_idx == len(taam_sequence):
-            seqs.append(curr_seq)
-        seqs = [sorted(set(seq)) for seq in seqs]
+            yield curr_seq
+
+    def find_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> VerseTaamSequenceResult:
+        """
+        Check if the Verse contains a sequence of Taamim.
+
+        :param taam_sequence: The sequence of Taamim.
+        :return: The inner lists are the indices of the words in a sequence.
+                 If there is more than one sequence, the outer list contains
+                 all the sequences.
+        """
+        seqs = [
+            sorted(set(seq))
+            for seq in self._iter_taam_sequence_matches(
+                taam_sequence, include_meshartim
+            )
+        ]
         return VerseTaamSequenceResult(self, seqs)
 
+    def count_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> int:
+        """
+        Count the matches of a sequence of Taamim in the Verse (the number of
+        sequences `find_taam_sequence` finds), without building them.
+
+        :param taam_sequence: The sequence of Taamim.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: The number of matches.
+        """
+        matches = self._iter_taam_sequence_matches(taam_sequence, include_meshartim)
+        return sum(1 for _ in matches)
+
+    def has_taam_sequence(
+        self, taam_sequence: List[str], include_meshartim: bool = True
+    ) -> bool:
+        """
+        Check whether the Verse contains a sequence of Taamim, stopping at the
+        first match.
+
+        :param taam_sequence: The sequence of Taamim.
+        :param include_meshartim: Whether to include Meshartim in the search,
+                                  defaults to True
+        :return: Whether the sequence is found.
+        """
+        matches = self._iter_taam_sequence_matches(taam_sequence, include_meshartim)
+        return next(matches, None) is not None
+
     def count_taam(self, taam_name: str) -> int:
         """
         Count the number of occurrences of a Taam in the Verse.
@@ -0,0 +1,126 @@
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, Sequence, Tuple, Union
+
+from parsing.chapter import Chapter
+from parsing.verse import Verse
+
+
+class VerseRange(Sequence):
+    """
+    A VerseRange is a contiguous [start, stop) slice of a book's verses, by
+    ordinal. It refers to the book's list of verses instead of copying it.
+    """
+
+    def __init__(self, verses: List[Verse], start: int, stop: int):
+        assert 0 <= start <= stop <= len(verses), f"Invalid range: [{start}, {stop})"
+        self._verses = verses
+        self._start = start
+        self._stop = stop
+
+    @classmethod
+    def spanning(cls, first: "VerseRange", last: "VerseRange") -> "VerseRange":
+        """
+        Get the range from the start of one range to the end of another range
+        over the same verses.
+
+        :param first: The first range.
+        :param last: The last range.
+        :return: The spanning range.
+        """
+        assert first._verses is last._verses, "Ranges are over different verses"
+        return cls(first._verses, first.start, max(first.start, last.stop))
+
+    @property
+    def start(self) -> int:
+        """
+        Get the ordinal of the first verse in the range.
+
+        :return: The ordinal of the first verse.
+        """
+        return self._start
+
+    @property
+    def stop(self) -> int:
+        """
+        Get the ordinal after the last verse in the range.
+
+        :return: The ordinal after the last verse.
+        """
+        return self._stop
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Verse, List[Verse]]:
+        if isinstance(i, slice):
+            return [self._verses[j] for j in range(self._start, self._stop)[i]]
+        return self._verses[range(self._start, self._stop)[i]]
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __iter__(self) -> Iterator[Verse]:
+        return map(self._verses.__getitem__, range(self._start, self._stop))
+
+    def __repr__(self) -> str:
+        return f"VerseRange({self._start}, {self._stop})"
+
+
+class VerseIndex:
+    """
+    A VerseIndex maps the (chapter, verse) numbers of a book to the ordinal of
+    each verse in the book, so that ranges of verses (e.g. aliyot) can be
+    looked up without walking the chapters.
+    """
+
+    def __init__(self, chapters: List[Chapter]):
+        self._verses = []
+        self._keys = []
+        for chapter in chapters:
+            for verse in chapter.verses:
+                self._verses.append(verse)
+                self._keys.append((chapter.idx, verse.idx))
+        self._ordinals = {key: ordinal for ordinal, key in enumerate(self._keys)}
+
+    @property
+    def verses(self) -> List[Verse]:
+        """
+        Get the verses of the book, in order.
+
+        :return: The verses of the book.
+        """
+        return self._verses
+
+    def ordinal(self, chapter_idx: int, verse_idx: int) -> int:
+        """
+        Get the ordinal of a verse in the book.
+
+        :param chapter_idx: The index of the chapter.
+        :param verse_idx: The index of the verse within the chapter.
+        :return: The ordinal of the verse.
+        """
+        key = (chapter_idx, verse_idx)
+        assert key in self._ordinals, f"No verse {chapter_idx}:{verse_idx}"
+        return self._ordinals[key]
+
+    def key(self, ordinal: int) -> Tuple[int, int]:
+        """
+        Get the (chapter, verse) numbers of a verse.
+
+        :param ordinal: The ordinal of the verse in the book.
+        :return: The index of the chapter and of the verse within the chapter.
+        """
+        return self._keys[ordinal]
+
+    def range(self, start: Tuple[int, int], end: Tuple[int, int]) -> VerseRange:
+        """
+        Get the verses between two (chapter, verse) pairs, inclusive. The pairs
+        do not need to exist in the book.
+
+        :param start: The (chapter, verse) pair of the first verse.
+        :param end: The (chapter, verse) pair of the last verse.
+        :return: The range of verses.
+        """
+        start_ordinal = bisect_left(self._keys, start)
+        stop_ordinal = bisect_right(self._keys, end)
+        return VerseRange(self._verses, start_ordinal, max(start_ordinal, stop_ordinal))
+
+    def __len__(self) -> int:
+        return len(self._verses)
@@ -1,8 +1,9 @@
 from typing import List
 
 from parsing.letter import Letter
-from parsing.symbols import LETTERS, MAQAF, TAAME_MESHARET
+from parsing.symbols import MAQAF, TAAME_MESHARET
 from parsing.taam import Taam
+from parsing.tokenizer import tokenize_word
 
 
 class Word:
@@ -10,6 +11,13 @@ class Word:
     A Word is a sequence of letters.
     """
 
+    def _collect_taamim(self):
+        """
+        Collect the raw and clean taamim of the Word from its letters.
+        """
+        self._taamim_raw = [taam for letter in self._letters for taam in letter.taamim]
+        self._taamim_clean = self._get_clean_taamim()
+
     def _get_clean_taamim(self):
         """
         Get the taamim in the Word.
@@ -32,8 +40,7 @@ class Word:
 
     def __init__(self, letters: List[Letter]):
         self._letters = letters
-        self._taamim_raw = [taam for letter in self._letters for taam in letter.taamim]
-        self._taamim_clean = self._get_clean_taamim()
+        self._collect_taamim()
         self._nequdot = [niqud for letter in self._letters for niqud in letter.nequdot]
 
     @classmethod
@@ -46,16 +53,7 @@ class Word:
         """
         if len(word) == 1 and word[0] == MAQAF:
             return cls([Letter(MAQAF)])
-        letters = []
-        for i, letter in enumerate(word):
-            if letter in LETTERS:
-                curr_letter = [letter]
-                for j in range(i + 1, len(word)):
-                    if word[j] in LETTERS:
-                        break
-                    curr_letter.append(word[j])
-                letters.append(Letter.from_string("".join(curr_letter)))
-        return cls(letters)
+        return cls(tokenize_word(word))
 
     @property
     def is_maqaf(self):
@@ -130,6 +128,8 @@ class Word:
         """
         for letter in self._letters:
             if letter.rename_taam(old_name, new_name):
+                # taamim are immutable, so the letter now holds a different instance
+                self._collect_taamim()
                 return True
         return False
 
@@ -0,0 +1,353 @@
+"""
+A local HTTP service that answers taam queries with JSON, for tools that want
+the parsing engine without Streamlit. The corpus is loaded once, when the
+service starts; queries run in a pool of threads so that the event loop keeps
+serving other clients while a query is computed.
+
+Endpoints (GET with a query string, or POST with a JSON object):
+
+- `/search`: the verses with a sequence of Taamim, a page at a time
+  (`sequence`, `meshartim`, `limit`, `offset`, `cursor`)
+- `/count`: the number of matches of a sequence (`sequence`, `meshartim`)
+- `/ngrams`: the most common n-Taam sequences (`n`, `meshartim`, `top`)
+- `/distribution`: the matches of a sequence in each book or parasha
+  (`sequence`, `meshartim`, `level`)
+- `/batch` (POST only): several of the queries above, as
+  `{"queries": [{"endpoint": "/count", "sequence": [...]}, ...]}`
+
+Sequences are lists of taam names (or comma-separated in a query string).
+
+Run from the repository root with `python -m query_service --port 8000`.
+"""
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from parsing import Corpus
+from parsing.corpus import LEVELS, TORAH_BOOK_NAMES
+from parsing.symbols import TAAME_MESHARET, TAAMIM_NAMES_TO_CODES
+from parsing.taam_pages import DEFAULT_PAGE_SIZE
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_TOP_NGRAMS = 20
+MAX_PAGE_SIZE = 500
+MAX_BATCH_QUERIES = 100
+MAX_BODY_BYTES = 1 << 20
+
+Params = Dict[str, Any]
+
+
+class QueryError(Exception):
+    """
+    A QueryError is raised for a query that cannot be answered (e.g. one with a
+    missing or invalid parameter), and is reported to the client.
+    """
+
+    def __init__(self, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+def _sequence(params: Params) -> Tuple[List[str], bool]:
+    sequence = params.get("sequence")
+    if isinstance(sequence, str):
+        sequence = [name for name in sequence.split(",") if name]
+    if not isinstance(sequence, list) or len(sequence) == 0:
+        raise QueryError("Expected a non-empty taam sequence")
+    for taam_name in sequence:
+        if taam_name not in TAAMIM_NAMES_TO_CODES:
+            raise QueryError(f"Unknown taam: {taam_name}")
+    include_meshartim = _flag(params, "meshartim", True)
+    if not include_meshartim and all(name in TAAME_MESHARET for name in sequence):
+        raise QueryError("The taam sequence is empty without Meshartim")
+    return sequence, include_meshartim
+
+
+def _flag(params: Params, name: str, default: bool) -> bool:
+    value = params.get(name, default)
+    if isinstance(value, str):
+        value = value.lower()
+        if value not in ("true", "false", "1", "0"):
+            raise QueryError(f"Invalid {name}: {value}")
+        value = value in ("true", "1")
+    if not isinstance(value, bool):
+        raise QueryError(f"Invalid {name}: {value}")
+    return value
+
+
+def _integer(
+    params: Params, name: str, default: int, low: int, high: Optional[int] = None
+) -> int:
+    value = params.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise QueryError(f"Invalid {name}: {value}")
+    if value < low or (high is not None and value > high):
+        raise QueryError(f"{name} out of range: {value}")
+    return value
+
+
+class QueryService:
+    """
+    A QueryService answers the queries of the HTTP service on a Corpus. Each
+    endpoint is a method that takes the parameters of a query and returns its
+    JSON-serializable answer; they are blocking, and the server runs them in an
+    executor.
+    """
+
+    def __init__(self, corpus: Corpus):
+        self.corpus = corpus
+        self.endpoints: Dict[str, Callable[[Params], Any]] = {
+            "/search": self.search,
+            "/count": self.count,
+            "/ngrams": self.ngrams,
+            "/distribution": self.distribution,
+            "/batch": self.batch,
+        }
+
+    def handle(self, path: str, params: Params) -> Any:
+        """
+        Answer a query.
+
+        :param path: The path of the endpoint.
+        :param params: The parameters of the query.
+        :return: The answer.
+        """
+        if path not in self.endpoints:
+            raise QueryError(f"Unknown endpoint: {path}", HTTPStatus.NOT_FOUND)
+        return self.endpoints[path](params)
+
+    def search(self, params: Params) -> Dict[str, Any]:
+        """
+        Find a page of the verses with a sequence of Taamim (see
+        `Corpus.page_verses_with_taam_sequence`).
+
+        :param params: The sequence, and whether to include Meshartim, the size
+                       of the page, the number of verses to skip and the cursor.
+        :return: The verses of the page, where they are and the indices of the
+                 words of their matches, and the cursor of the next page.
+        """
+        page = self.corpus.page_verses_with_taam_sequence(
+            *_sequence(params),
+            _integer(params, "limit", DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE),
+            _integer(params, "offset", 0, 0),
+            _integer(params, "cursor", 0, 0, len(self.corpus)),
+        )
+        hits = []
+        for hit in page:
+            location = self.corpus.locate(hit.ordinal)
+            hits.append(
+                {
+                    "book": hit.book,
+                    "parasha": hit.parasha,
+                    "aliyah": hit.aliyah + 1,
+                    "chapter": location.chapter,
+                    "verse": location.verse,
+                    "text": str(hit.verse),
+                    "word_idxs": hit.word_idxs,
+                }
+            )
+        return {"hits": hits, "next_cursor": page.next_cursor}
+
+    def count(self, params: Params) -> Dict[str, Any]:
+        """
+        Count the matches of a sequence of Taamim (see
+        `Corpus.count_taam_sequence`).
+
+        :param params: The sequence, and whether to include Meshartim.
+        :return: The number of matches.
+        """
+        return {"count": self.corpus.count_taam_sequence(*_sequence(params))}
+
+    def ngrams(self, params: Params) -> Dict[str, Any]:
+        """
+        Get the most common n-Taam sequences (see
+        `Corpus.count_n_taam_sequences`).
+
+        :param params: The length of the sequences, whether to include
+                       Meshartim, and how many sequences to return.
+        :return: The total number of sequences of the length, and the most
+                 common ones with their counts.
+        """
+        counts = self.corpus.count_n_taam_sequences(
+            _integer(params, "n", 2, 1, 32), _flag(params, "meshartim", True)
+        )
+        top = _integer(params, "top", DEFAULT_TOP_NGRAMS, 1)
+        return {
+            "total": sum(counts.values()),
+            "ngrams": [
+                {"sequence": list(sequence), "count": count}
+                for sequence, count in counts.most_common(top)
+            ],
+        }
+
+    def distribution(self, params: Params) -> Dict[str, Any]:
+        """
+        Count the matches of a sequence of Taamim in each book or parasha (see
+        `Corpus.distribution`).
+
+        :param params: The sequence, whether to include Meshartim and the level
+                       ("book" or "parasha").
+        :return: The number of matches in each book or parasha, in order.
+        """
+        level = params.get("level", "book")
+        if level not in LEVELS:
+            raise QueryError(f"Invalid level: {level}")
+        counts = self.corpus.distribution(*_sequence(params), level)
+        return {"level": level, "counts": [[name, n] for name, n in counts.items()]}
+
+    def batch(self, params: Params) -> Dict[str, Any]:
+        """
+        Answer several queries, in order. A query that fails does not fail the
+        others: its result is its error.
+
+        :param params: The queries, each with its `endpoint`.
+        :return: The result of each query.
+        """
+        queries = params.get("queries")
+        if not isinstance(queries, list):
+            raise QueryError("Expected a list of queries")
+        if len(queries) > MAX_BATCH_QUERIES:
+            raise QueryError(f"At most {MAX_BATCH_QUERIES} queries per batch")
+        results = []
+        for query in queries:
+            try:
+                if not isinstance(query, dict):
+                    raise QueryError("Expected a query object")
+                path = query.get("endpoint")
+                if path == "/batch":
+                    raise QueryError("Batches cannot be nested")
+                results.append({"result": self.handle(path, query)})
+            except QueryError as error:
+                results.append({"error": str(error)})
+        return {"results": results}
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> Tuple[str, str, Params]:
+    """
+    Read an HTTP request.
+
+    :param reader: The stream of the connection.
+    :return: The method, the path and the parameters of the request (from its
+             query string and its JSON body).
+    """
+    request_line = (await reader.readline()).decode("latin-1").split()
+    if len(request_line) != 3:
+        raise QueryError("Malformed request")
+    method, target, _ = request_line
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    url = urlsplit(target)
+    params: Params = dict(parse_qsl(url.query))
+    length = _integer(headers, "content-length", 0, 0)
+    if length > MAX_BODY_BYTES:
+        raise QueryError("Request body too large", HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    if length > 0:
+        try:
+            body = json.loads(await reader.readexactly(length))
+        except ValueError:
+            raise QueryError("Invalid JSON body")
+        if not isinstance(body, dict):
+            raise QueryError("Expected a JSON object")
+        params.update(body)
+    return method, url.path, params
+
+
+def _response(status: HTTPStatus, body: Any) -> bytes:
+    content = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(content)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    return head.encode("latin-1") + content
+
+
+async def serve(
+    service: QueryService,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> asyncio.AbstractServer:
+    """
+    Start serving the queries of a QueryService over HTTP (one request per
+    connection).
+
+    :param service: The service.
+    :param host: The host to listen on, defaults to DEFAULT_HOST
+    :param port: The port to listen on (0 for any free port), defaults to
+                 DEFAULT_PORT
+    :param executor: The executor to run the queries in, defaults to the event
+                     loop's default executor
+    :return: The server.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def handle_connection(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            method, path, params = await _read_request(reader)
+            if method not in ("GET", "POST") or (path == "/batch" and method != "POST"):
+                raise QueryError(
+                    f"Method not allowed: {method}", HTTPStatus.METHOD_NOT_ALLOWED
+                )
+            body = await loop.run_in_executor(executor, service.handle, path, params)
+            writer.write(_response(HTTPStatus.OK, body))
+        except QueryError as error:
+            writer.write(_response(error.status, {"error": str(error)}))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as error:
+            writer.write(
+                _response(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": repr(error)})
+            )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    return await asyncio.start_server(handle_connection, host, port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--books", nargs="+", default=TORAH_BOOK_NAMES)
+    parser.add_argument(
+        "--threads", type=int, default=None, help="threads that run the queries"
+    )
+    args = parser.parse_args()
+
+    service = QueryService(Corpus.load(args.books))
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            server = await serve(service, args.host, args.port, executor)
+            print(f"Serving on http://{args.host}:{args.port}")
+            async with server:
+                await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,13 @@
 import pathlib
 from collections import Counter
-from typing import List
+from typing import Dict, List, Tuple
 
-import pandas as pd
 import streamlit as st
 
-from parsing import Book
+from parsing import Book, Corpus
+from parsing import load_books as parse_books
 from parsing.symbols import TAAM_HEBREW_TO_ENGLISH_NAMES, TAAME_MESHARET
+from parsing.taam_codes import frequencies_by_name
 from utils.plotting_utils import (
     MIN_OCCURRENCES,
     plot_taamim_frequency_bar_chart,
@@ -19,28 +20,27 @@ HIGHLIGHT_COLOR = "#0362fc"
 
 
 @st.cache_data
-def load_book(book_name: str) -> Book:
+def load_books(book_names: Tuple[str, ...]) -> Dict[str, Book]:
     """
-    Load all books of the Bible.
+    Load several books of the Bible, parsing them in parallel.
 
+    :param book_names: The names of the books to load.
     :return: A dictionary mapping book names to Book objects.
     """
-    return Book.from_text_file(
-        BASE_PATH / "data" / "cantillation" / f"{book_name.lower()}.txt"
+    books = parse_books(
+        list(book_names), data_dir=BASE_PATH / "data" / "cantillation"
     )
+    return dict(zip(book_names, books))
 
 
-def extract_taamim_data(book: Book, include_meshartim: bool = True) -> pd.DataFrame:
+@st.cache_resource
+def load_corpus() -> Corpus:
     """
-    Load the taamim data for a given book.
+    Build a corpus of all books of the Bible, to search and count them as one.
 
-    :param book: The Book object to analyze.
-    :param include_meshartim: Whether to include meshartim in the analysis.
-    :return: A Counter object containing the frequency of each ta'am in the book.
+    :return: The corpus.
     """
-    taamim = book.taamim if include_meshartim else book.taamim_without_meshartim
-    taam_names = [t.name for t in taamim]
-    return Counter(taam_names)
+    return Corpus(list(load_books(tuple(ALL_BOOK_NAMES)).values()))
 
 
 def overall_taam_distribution_widget(include_meshartim: bool):
@@ -57,12 +57,9 @@ def overall_taam_distribution_widget(include_meshartim: bool):
     # create a bar chart showing the frequency of each ta'am in descending order
     # of frequency
     if len(book_names) > 0:
-        total = Counter()
-        for book_name in book_names:
-            book = load_book(book_name)
-            total += extract_taamim_data(book, include_meshartim)
+        total = load_corpus().taam_frequencies(include_meshartim, book_names)
 
-        plot_taamim_frequency_bar_chart(total)
+        plot_taamim_frequency_bar_chart(Counter(frequencies_by_name(total)))
 
 
 def taam_sequence_distribution_widget(include_meshartim: bool):
@@ -81,13 +78,7 @@ def taam_sequence_distribution_widget(include_meshartim: bool):
     top_k = st.number_input("Number of combinations to show", min_value=5, max_value=50)
     most_or_least_common = st.radio("Most or least common", ["Most", "Least"])
 
-    total = Counter()
-    for book_name in ALL_BOOK_NAMES:
-        book = load_book(book_name)
-        taam_sequences = book.count_n_taam_sequences(seq_length, include_meshartim)
-        if len(taam_sequences) == 0:
-            continue
-        total += Counter(taam_sequences)
+    total = load_corpus().count_n_taam_sequences(seq_length, include_meshartim)
 
     if len(total) == 0:
         st.write("No ta'am sequences found.")
@@ -107,17 +98,20 @@ def _highlight_word(word_str: str, color: str):
 
 def _taam_seq_finder_widget(taam_sequence: List[str], include_meshartim: bool):
     if len(taam_sequence) > 0:
-        book_dict = {
-            book_name: load_book(book_name).find_verses_with_taam_sequence(
-                [TAAM_HEBREW_TO_ENGLISH_NAMES[taam] for taam in taam_sequence],
-                include_meshartim,
-            )
-            for book_name in ALL_BOOK_NAMES
-        }
-        if sum(len(v) for v in book_dict.values()) == 0:
+        corpus = load_corpus()
+        taam_names = [TAAM_HEBREW_TO_ENGLISH_NAMES[taam] for taam in taam_sequence]
+        if not corpus.has_taam_sequence(taam_names, include_meshartim):
             st.write("No verses found with the selected ta'amim sequence.")
             return
 
+        book_results = corpus.find_verses_with_taam_sequence(
+            taam_names, include_meshartim
+        )
+        book_dict = {
+            book_name: book_result.parasha_results
+            for book_name, book_result in book_results.items()
+        }
+
         for book_name, verse_dict in book_dict.items():
             with st.expander(book_name):
                 for parasha_name, parasha_result in verse_dict.items():
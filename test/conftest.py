@@ -0,0 +1,16 @@
+import pytest
+
+from parsing import Book
+
+
+@pytest.fixture(scope="session")
+def book_file_path():
+    return "data/cantillation/genesis.txt"
+
+
+@pytest.fixture(scope="session")
+def book(book_file_path):
+    """
+    Genesis, parsed once for every test that uses it. Tests must not modify it.
+    """
+    return Book.from_text_file(book_file_path)
@@ -1,3 +1,5 @@
+import pickle
+
 from parsing import Book
 
 BOOK_STRING = """‪xxxx    Unicode/XML Leningrad Codex [UXLC 2.0]‬
@@ -58,3 +60,51 @@ def test_find_verses_with_taam_sequence():
     verses = book.find_verses_with_taam_sequence(seq2, include_meshartim=True)
     num_verses = len([v for v in verses["Bereshit"][0] if v[1] != []])
     assert num_verses == 1
+
+
+def test_count_and_has_taam_sequence():
+    book = Book.from_text_file(BOOK_FILE_PATH)
+    book.query_cache = None
+    for taam_sequence in [["maarikh", "tarha"], ["zarqa", "segolta"], ["shalshelet"]]:
+        for include_meshartim in [True, False]:
+            results = book.find_verses_with_taam_sequence(
+                taam_sequence, include_meshartim
+            )
+            counts = {
+                parasha_name: sum(
+                    len(verse_result.word_idxs)
+                    for aliyah_results in parasha_results
+                    for _, verse_result in aliyah_results
+                )
+                for parasha_name, parasha_results in results.items()
+            }
+            assert (
+                book.count_taam_sequence(taam_sequence, include_meshartim)
+                == sum(counts.values())
+            )
+            assert book.has_taam_sequence(taam_sequence, include_meshartim)
+            for parasha in book.parshiot[:2]:
+                assert (
+                    parasha.count_taam_sequence(taam_sequence, include_meshartim)
+                    == counts[parasha.name]
+                )
+                assert parasha.has_taam_sequence(
+                    taam_sequence, include_meshartim
+                ) == (counts[parasha.name] > 0)
+    assert book.count_taam_sequence(["karne_farah", "pazer_gadol"]) == 0
+    assert not book.has_taam_sequence(["karne_farah", "pazer_gadol"])
+    assert not book.has_taam_sequence(["not_a_taam"])
+
+
+def test_book_pickle_round_trip(book):
+    book.find_verses_with_taam_sequence(["maarikh", "tarha"])
+    unpickled = pickle.loads(pickle.dumps(book))
+    assert repr(unpickled) == repr(book)
+    assert unpickled.version == book.version
+    assert unpickled.query_cache is book.query_cache
+    results = unpickled.find_verses_with_taam_sequence(["maarikh", "tarha"])
+    verses = {
+        verse for aliyot in results.values() for aliyah in aliyot for verse, _ in aliyah
+    }
+    assert len(verses) > 0
+    assert verses <= set(unpickled.verses)
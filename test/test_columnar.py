@@ -0,0 +1,83 @@
+import pytest
+
+from parsing import Book
+from parsing.columnar import LetterView, VerseView, WordView
+
+BOOK_FILE_PATH = "data/cantillation/genesis.txt"
+
+
+@pytest.fixture(scope="module")
+def books(tmp_path_factory):
+    book = Book.from_text_file(BOOK_FILE_PATH)
+    path = tmp_path_factory.mktemp("compiled") / "genesis.qtkn"
+    book.to_compiled(path)
+    return book, Book.from_compiled(path, columnar=True)
+
+
+def test_columnar_book(books):
+    book, columnar = books
+    assert columnar.name == "Genesis"
+    assert len(columnar.verses) == 1533
+    assert isinstance(columnar.verses[0], VerseView)
+    assert repr(columnar) == repr(book)
+    assert [len(a) for a in columnar.parshiot[0].aliyot] == [34, 16, 27, 21, 4, 28, 16]
+
+
+def test_columnar_verse_views(books):
+    book, columnar = books
+    for verse, view in zip(book.verses, columnar.verses):
+        assert view.idx == verse.idx
+        assert view.taamim == verse.taamim
+        assert view.taamim_without_meshartim == verse.taamim_without_meshartim
+        assert view.nequdot == verse.nequdot
+        assert [str(w) for w in view.taam_words] == [str(w) for w in verse.taam_words]
+        assert len(view.words) == len(verse.words)
+
+
+def test_columnar_word_views(books):
+    book, columnar = books
+    # 1:2 has a tere_qadmin (two pashtas on one word) and a maqaf
+    verse, view = book.verses[1], columnar.verses[1]
+    for word, word_view in zip(verse, view):
+        assert isinstance(word_view, WordView)
+        assert word_view.is_maqaf == word.is_maqaf
+        assert word_view.taamim_raw == word.taamim_raw
+        assert word_view.taamim == word.taamim
+        assert len(word_view) == len(word)
+    assert view.has_taam("tere_qadmin")
+    assert not view.has_taam("pashta")
+
+
+def test_columnar_views_are_read_only(books):
+    _, columnar = books
+    letter = columnar.verses[0].letters[0]
+    assert isinstance(letter, LetterView)
+    with pytest.raises(TypeError):
+        letter.rename_taam("tarha", "tevir")
+    with pytest.raises(TypeError):
+        columnar.verses[0].words[0].rename_taam("tarha", "tevir")
+
+
+def test_columnar_search(books):
+    book, columnar = books
+    assert columnar.count_n_taam_sequences(2) == book.count_n_taam_sequences(2)
+    results = columnar.find_verses_with_taam_sequence(["azla", "gerish"])
+    expected = book.find_verses_with_taam_sequence(["azla", "gerish"])
+    for parasha_name, parasha_result in expected.items():
+        for aliyah_result, columnar_aliyah_result in zip(
+            parasha_result, results[parasha_name]
+        ):
+            assert [r.word_idxs for _, r in aliyah_result] == [
+                r.word_idxs for _, r in columnar_aliyah_result
+            ]
+
+
+def test_columnar_taam_codes(books):
+    book, columnar = books
+    for verse, view in zip(book.verses, columnar.verses):
+        assert view.taam_codes.tolist() == verse.taam_codes.tolist()
+        assert (
+            view.taam_codes_without_meshartim.tolist()
+            == verse.taam_codes_without_meshartim.tolist()
+        )
+    assert (columnar.taam_frequencies() == book.taam_frequencies()).all()
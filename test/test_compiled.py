@@ -0,0 +1,73 @@
+import time
+
+import numpy as np
+import pytest
+
+from parsing import Book
+from parsing.compiled import CompiledBook
+
+BOOK_FILE_PATH = "data/cantillation/genesis.txt"
+
+
+@pytest.mark.parametrize("columnar", [True, False])
+def test_compiled_round_trip(tmp_path, columnar):
+    book = Book.from_text_file(BOOK_FILE_PATH)
+    path = tmp_path / "genesis.qtkn"
+    book.to_compiled(path)
+    compiled = Book.from_compiled(path, columnar=columnar)
+
+    assert compiled.name == "Genesis"
+    assert len(compiled.chapters) == 50
+    assert len(compiled.verses) == 1533
+    assert repr(compiled) == repr(book)
+    for verse, compiled_verse in zip(book.verses, compiled.verses):
+        assert compiled_verse.idx == verse.idx
+        assert compiled_verse.taamim == verse.taamim
+        assert compiled_verse.nequdot == verse.nequdot
+
+    assert [p.name for p in compiled.parshiot] == [p.name for p in book.parshiot]
+    assert [len(a) for a in compiled.parshiot[0].aliyot] == [34, 16, 27, 21, 4, 28, 16]
+    assert compiled.count_n_taam_sequences(3) == book.count_n_taam_sequences(3)
+
+
+def test_compiled_azla_round_trip(tmp_path):
+    book = Book.from_text_file(BOOK_FILE_PATH)
+    path = tmp_path / "genesis.qtkn"
+    book.to_compiled(path)
+    compiled = Book.from_compiled(path)
+
+    # 1:9 has a qadma followed by a gerish, which is renamed to azla
+    verse = compiled.chapters[0].verses[8]
+    assert verse.has_taam("azla")
+    assert verse.find_taam_sequence(["azla", "gerish"]).word_idxs == (
+        book.chapters[0].verses[8].find_taam_sequence(["azla", "gerish"]).word_idxs
+    )
+
+
+def test_compiled_arrays(tmp_path):
+    book = Book.from_text_file(BOOK_FILE_PATH)
+    path = tmp_path / "genesis.qtkn"
+    book.to_compiled(path)
+    compiled = CompiledBook.load(path)
+
+    assert compiled.arrays["verse_idxs"].dtype == np.uint16
+    assert len(compiled.arrays["verse_idxs"]) == 1533
+    assert len(compiled.arrays["letters"]) == len(
+        [letter for verse in book.verses for letter in verse.letters]
+    )
+    assert compiled.arrays["aliyah_ranges"].shape == (12 * 7, 2)
+
+
+def test_compiled_load_is_faster_than_parsing(tmp_path):
+    start = time.perf_counter()
+    book = Book.from_text_file(BOOK_FILE_PATH)
+    parse_time = time.perf_counter() - start
+    path = tmp_path / "genesis.qtkn"
+    book.to_compiled(path)
+
+    start = time.perf_counter()
+    compiled = Book.from_compiled(path)
+    load_time = time.perf_counter() - start
+
+    assert len(compiled.verses) == len(book.verses)
+    assert load_time < parse_time / 2
@@ -0,0 +1,106 @@
+from collections import Counter
+
+import pytest
+
+from parsing import Corpus, TaamSearchEngine
+from parsing.query_cache import QueryCache
+
+BOOK_NAMES = ["Genesis", "Exodus"]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return Corpus.load(BOOK_NAMES)
+
+
+def test_verses_are_numbered_across_books(corpus):
+    assert len(corpus) == sum(len(book.verses) for book in corpus.books)
+    assert corpus.verses[int(corpus.verse_starts[1])] is corpus.books[1].verses[0]
+    assert repr(corpus.locate(0)) == "Genesis 1:1 (Bereshit, aliyah 1)"
+    last = corpus.locate(len(corpus) - 1)
+    assert (last.book, last.chapter, last.verse) == ("Exodus", 40, 38)
+    assert corpus.parasha_names[0] == "Bereshit"
+    assert corpus.parasha_books[-1] == 1
+
+
+def test_counts_add_up_over_books(corpus):
+    for n in [1, 3]:
+        for include_meshartim in [True, False]:
+            expected = sum(
+                corpus.count_n_taam_sequences_by_book(n, include_meshartim).values(),
+                Counter(),
+            )
+            assert corpus.count_n_taam_sequences(n, include_meshartim) == expected
+
+
+def test_taam_frequencies(corpus):
+    for book in corpus.books:
+        for include_meshartim in [True, False]:
+            frequencies = corpus.taam_frequencies(include_meshartim, [book.name])
+            assert (frequencies == book.taam_frequencies(include_meshartim)).all()
+    total = sum(book.taam_frequencies() for book in corpus.books)
+    assert (corpus.taam_frequencies() == total).all()
+
+
+def test_distribution(corpus):
+    taam_sequence = ["maarikh", "tarha"]
+    by_book = corpus.distribution(taam_sequence)
+    for book in corpus.books:
+        assert by_book[book.name] == book.count_taam_sequence(taam_sequence)
+    by_parasha = corpus.distribution(taam_sequence, level="parasha")
+    assert list(by_parasha) == corpus.parasha_names
+    # some verses of Exodus are not in an aliyah, and are left out of both
+    count = corpus.count_taam_sequence(taam_sequence)
+    assert sum(by_parasha.values()) == sum(by_book.values()) == count
+    matches = TaamSearchEngine([corpus.book("Exodus")]).find_matches(taam_sequence)
+    assert by_book["Exodus"] < sum(len(seqs) for seqs in matches.values())
+
+
+@pytest.mark.parametrize("include_meshartim", [True, False])
+@pytest.mark.parametrize(
+    "taam_sequence", [["maarikh", "tarha"], ["shalshelet"], ["maarikh"], ["nope"]]
+)
+def test_counts_are_those_of_the_books(corpus, taam_sequence, include_meshartim):
+    assert corpus.count_taam_sequence(taam_sequence, include_meshartim) == sum(
+        book.count_taam_sequence(taam_sequence, include_meshartim)
+        for book in corpus.books
+    )
+    assert corpus.has_taam_sequence(taam_sequence, include_meshartim) == any(
+        book.has_taam_sequence(taam_sequence, include_meshartim)
+        for book in corpus.books
+    )
+
+
+def test_counts_are_cached(corpus):
+    query_cache, corpus.query_cache = corpus.query_cache, QueryCache()
+    try:
+        count = corpus.count_taam_sequence(["qadma", "azla"])
+        assert corpus.count_taam_sequence(["qadma", "azla"]) == count
+        assert corpus.query_cache.hits == 1
+    finally:
+        corpus.query_cache = query_cache
+
+
+def test_distribution_of_meshartim_only(corpus):
+    by_book = corpus.distribution(["maarikh"], False)
+    for book in corpus.books:
+        assert by_book[book.name] == book.count_taam_sequence(["maarikh"], False)
+    by_parasha = corpus.distribution(["maarikh"], False, level="parasha")
+    assert sum(by_parasha.values()) == corpus.count_taam_sequence(["maarikh"], False)
+
+
+def test_pages_span_books(corpus):
+    taam_sequence = ["pazer_gadol"]
+    hits = list(corpus.iter_verses_with_taam_sequence(taam_sequence))
+    assert [hit.book for hit in hits] == sorted(
+        (hit.book for hit in hits), key=BOOK_NAMES.index
+    )
+    start = int(corpus.verse_starts[1])
+    page = corpus.page_verses_with_taam_sequence(taam_sequence, limit=3, cursor=start)
+    assert [hit.book for hit in page] == ["Exodus"] * 3
+    assert [hit.ordinal for hit in page] == [
+        hit.ordinal for hit in hits if hit.ordinal >= start
+    ][:3]
+    # without Meshartim, a sequence of Meshartim only is searched verse by verse
+    page = corpus.page_verses_with_taam_sequence(["maarikh"], False, limit=3)
+    assert len(page) == 3 and page.next_cursor is not None
@@ -0,0 +1,62 @@
+import pickle
+
+from parsing import Book
+from parsing.lazy import LazyVerse, VerseCache
+
+BOOK_FILE_PATH = "data/cantillation/genesis.txt"
+
+
+def test_lazy_book_only_parses_touched_verses():
+    cache = VerseCache(max_verses=4)
+    book = Book.from_text_file(BOOK_FILE_PATH, lazy=True, verse_cache=cache)
+    assert len(book.verses) == 1533
+    assert isinstance(book.verses[0], LazyVerse)
+    assert len(book.parshiot) == 12
+    assert len(book.parshiot[0]) == 146
+    assert len(cache) == 0
+
+    assert len(book.verses[0].taam_words) == 7
+    assert book.verses[0].is_parsed
+    assert not book.verses[1].is_parsed
+    assert len(cache) == 1
+
+
+def test_lazy_book_cache_is_bounded():
+    cache = VerseCache(max_verses=2)
+    book = Book.from_text_file(BOOK_FILE_PATH, lazy=True, verse_cache=cache)
+    for verse in book.verses[:5]:
+        assert len(verse.taamim) > 0
+    assert len(cache) == 2
+    assert not book.verses[0].is_parsed
+    assert book.verses[4].is_parsed
+
+    # evicted verses are parsed again when they are touched
+    assert book.verses[0].has_taam("tarha")
+    assert book.verses[0].is_parsed
+
+
+def test_lazy_book_matches_eager_book():
+    eager = Book.from_text_file(BOOK_FILE_PATH)
+    lazy = Book.from_text_file(BOOK_FILE_PATH, lazy=True)
+    assert repr(lazy) == repr(eager)
+    seq = ["maarikh", "tarha"]
+    lazy_results = lazy.find_verses_with_taam_sequence(seq)["Bereshit"]
+    eager_results = eager.find_verses_with_taam_sequence(seq)["Bereshit"]
+    assert [[(v.idx, r.word_idxs) for v, r in a] for a in lazy_results] == [
+        [(v.idx, r.word_idxs) for v, r in a] for a in eager_results
+    ]
+    assert lazy_results[0][0][1].verse is lazy.verses[0]
+    assert lazy.count_n_taam_sequences(2) == eager.count_n_taam_sequences(2)
+
+
+def test_lazy_book_pickle_round_trip():
+    cache = VerseCache(max_verses=4)
+    book = Book.from_text_file(BOOK_FILE_PATH, lazy=True, verse_cache=cache)
+    assert len(book.verses[0].taam_words) == 7
+    unpickled = pickle.loads(pickle.dumps(book))
+    # the parsed verses are not pickled, and are parsed again when touched
+    unpickled_cache = unpickled.verses[0]._cache
+    assert unpickled_cache is unpickled.verses[1]._cache
+    assert len(unpickled_cache) == 0
+    assert repr(unpickled) == repr(book)
+    assert len(unpickled_cache) == 4
@@ -0,0 +1,27 @@
+from parsing import load_books
+from parsing.columnar import VerseView
+from parsing.verse import Verse
+
+
+def test_load_books_in_parallel():
+    serial = load_books(["Leviticus", "Deuteronomy"], workers=1)
+    parallel = load_books(["Leviticus", "Deuteronomy"], workers=2)
+
+    assert [book.name for book in parallel] == ["Leviticus", "Deuteronomy"]
+    for book, parallel_book in zip(serial, parallel):
+        assert len(parallel_book.verses) == len(book.verses)
+        assert repr(parallel_book) == repr(book)
+        assert [len(p) for p in parallel_book.parshiot] == [
+            len(p) for p in book.parshiot
+        ]
+
+
+def test_load_books_columnar():
+    columnar, objects = (
+        load_books(["Leviticus"], workers=2, columnar=columnar)[0]
+        for columnar in (True, False)
+    )
+
+    assert isinstance(columnar.verses[0], VerseView)
+    assert type(objects.verses[0]) is Verse
+    assert columnar.count_n_taam_sequences(2) == objects.count_n_taam_sequences(2)
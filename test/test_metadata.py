@@ -33,3 +33,81 @@ def test_book_metadata():
     assert first_aliyah.start_chapter_verse.verse_idx == 1
     assert first_aliyah.end_chapter_verse.chapter_idx == 12
     assert first_aliyah.end_chapter_verse.verse_idx == 13
+
+
+FAKE_ENTRY = {
+    "version": METADATA_FORMAT_VERSION,
+    "book": "Fake",
+    "source": "test",
+    "parshiot": [{"name": "Fake", "refs": [f"Fake 1:{i}-{i}" for i in range(1, 8)]}],
+}
+
+
+def test_metadata_store_uses_snapshot_offline(tmp_path):
+    store = MetadataStore(cache_dir=tmp_path, offline=True)
+    metadata = BookMetadata("Exodus", store=store)
+    assert len(metadata.parshiot) == 11
+    assert metadata.parshiot[0].name == "Shemot"
+
+
+def test_metadata_store_offline_without_local_metadata(tmp_path):
+    store = MetadataStore(snapshot_dir=None, cache_dir=tmp_path, offline=True)
+    with pytest.raises(AssertionError) as exc_info:
+        store.get("Fake")
+    assert str(exc_info.value) == "No local metadata for Fake"
+
+
+def test_metadata_store_read_through_cache(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_fetch(book_name):
+        calls.append(book_name)
+        return FAKE_ENTRY
+
+    monkeypatch.setattr(MetadataStore, "_fetch", staticmethod(fake_fetch))
+
+    store = MetadataStore(snapshot_dir=None, cache_dir=tmp_path)
+    assert store.get("Fake") == FAKE_ENTRY
+    assert (tmp_path / "fake.json").is_file()
+
+    # a new store reads the cached entry instead of fetching it again
+    store = MetadataStore(snapshot_dir=None, cache_dir=tmp_path)
+    assert len(BookMetadata("Fake", store=store).parshiot) == 1
+    assert calls == ["Fake"]
+
+    # expired entries are refetched...
+    store = MetadataStore(snapshot_dir=None, cache_dir=tmp_path, ttl_seconds=-1)
+    store.get("Fake")
+    assert calls == ["Fake", "Fake"]
+
+    # ...unless the store is offline
+    store = MetadataStore(
+        snapshot_dir=None, cache_dir=tmp_path, ttl_seconds=-1, offline=True
+    )
+    assert store.get("Fake") == FAKE_ENTRY
+    assert calls == ["Fake", "Fake"]
+
+
+def test_metadata_store_refreshed_entry_overrides_snapshot(tmp_path, monkeypatch):
+    refreshed = {**FAKE_ENTRY, "book": "Exodus"}
+    calls = []
+
+    def fake_fetch(book_name):
+        calls.append(book_name)
+        return refreshed
+
+    monkeypatch.setattr(MetadataStore, "_fetch", staticmethod(fake_fetch))
+    MetadataStore(cache_dir=tmp_path).refresh("Exodus")
+
+    # a new store serves the refreshed entry instead of the bundled snapshot
+    store = MetadataStore(cache_dir=tmp_path, offline=True)
+    assert store.get("Exodus") == refreshed
+
+    # once it expires, it is refetched
+    store = MetadataStore(cache_dir=tmp_path, ttl_seconds=-1)
+    assert store.get("Exodus") == refreshed
+    assert calls == ["Exodus", "Exodus"]
+
+    # without a cached entry, the snapshot is used
+    store = MetadataStore(cache_dir=tmp_path / "empty", offline=True)
+    assert len(store.get("Exodus")["parshiot"]) == 11
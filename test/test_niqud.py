@@ -34,3 +34,11 @@ def test_niqud_equality():
 
     assert q1 == q2
     assert q1 != p
+
+
+def test_niqud_interning():
+    q1 = Niqud.from_name("qamats")
+    q2 = Niqud.from_symbol("ָ")
+    assert q1 is q2
+    assert Niqud.from_code(q1.code) is q1
+    assert {q1: 1}[q2] == 1
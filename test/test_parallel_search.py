@@ -0,0 +1,119 @@
+from collections import Counter
+from multiprocessing import shared_memory
+
+import pytest
+
+from parsing import TaamSearchEngine, load_books, parallel_search
+from parsing.parallel_search import ParallelTaamSearch, SharedTaamStream
+from parsing.taam_automaton import find_taam_sequences
+from parsing.taam_pattern import compile_taam_pattern
+
+BOOK_NAMES = ["Genesis", "Exodus"]
+TAAM_SEQUENCES = [["maarikh", "tarha"], ["zarqa", "segolta"], ["maarikh"], ["nope"]]
+
+
+@pytest.fixture(scope="module")
+def books():
+    books = load_books(BOOK_NAMES, workers=1)
+    for book in books:
+        book.query_cache = None
+    return books
+
+
+@pytest.fixture(scope="module")
+def engine(books):
+    engine = TaamSearchEngine(books)
+    engine.query_cache = None
+    return engine
+
+
+@pytest.fixture(scope="module")
+def search(books):
+    with ParallelTaamSearch(books, workers=2) as search:
+        yield search
+
+
+def test_ranges_cover_parshiot(books, search):
+    assert search.ranges[0][0] == 0
+    assert search.ranges[-1][1] == sum(len(book.verses) for book in books)
+    for (_, stop), (start, _) in zip(search.ranges, search.ranges[1:]):
+        assert stop == start
+    parasha_starts = {
+        book_start + parasha.aliyot[0].start
+        for book, book_start in zip(books, [0, len(books[0].verses)])
+        for parasha in book.parshiot
+    }
+    assert {start for start, _ in search.ranges[1:]} <= parasha_starts
+
+
+@pytest.mark.parametrize("include_meshartim", [True, False])
+def test_matches_are_those_of_one_process(engine, search, include_meshartim):
+    for taam_sequence in TAAM_SEQUENCES:
+        matches = search.find_matches(taam_sequence, include_meshartim)
+        assert matches == engine.find_matches(taam_sequence, include_meshartim)
+        assert matches is None or list(matches) == sorted(matches)
+    assert search.find_all_matches(
+        TAAM_SEQUENCES, include_meshartim
+    ) == find_taam_sequences(engine.stream, TAAM_SEQUENCES, include_meshartim)
+    for pattern in ["{tevir|tarha} darga{1,2}", "@ pashta"]:
+        assert search.find_pattern(pattern, include_meshartim) == compile_taam_pattern(
+            pattern
+        ).find(engine.stream, include_meshartim)
+
+
+@pytest.mark.parametrize("include_meshartim", [True, False])
+def test_counts_are_those_of_one_process(books, engine, search, include_meshartim):
+    for taam_sequence in TAAM_SEQUENCES[:2]:
+        assert search.count_taam_sequence(
+            taam_sequence, include_meshartim
+        ) == engine.count_taam_sequence(taam_sequence, include_meshartim)
+    for n in [1, 3]:
+        expected = sum(
+            (book.count_n_taam_sequences(n, include_meshartim) for book in books),
+            Counter(),
+        )
+        assert search.count_n_taam_sequences(n, include_meshartim) == expected
+
+
+@pytest.mark.parametrize("taam_sequence", [["maarikh"], ["qadma", "maarikh"]])
+def test_counts_meshartim_only_without_meshartim(books, search, taam_sequence):
+    expected = sum(
+        len(verse.find_taam_sequence(taam_sequence, False).word_idxs)
+        for book in books
+        for parasha in book.parshiot
+        for aliyah in parasha.aliyot
+        for verse in aliyah.verses
+    )
+    assert expected > 0
+    assert search.count_taam_sequence(taam_sequence, False) == expected
+
+
+def test_pattern_candidates_in_a_range(engine, search):
+    pattern = compile_taam_pattern("{tevir|tarha} darga{1,2} @")
+    candidates = pattern.candidate_verses(engine.stream)
+    for start, stop in search.ranges:
+        offsets = engine.stream.verse_offsets
+        in_range = pattern.candidate_verses(
+            engine.stream, True, int(offsets[start]), int(offsets[stop])
+        )
+        expected = candidates[(candidates >= start) & (candidates < stop)]
+        assert in_range.tolist() == expected.tolist()
+
+
+def test_shared_memory_is_freed_if_the_pool_fails(books, monkeypatch):
+    created = []
+    create = SharedTaamStream.create
+
+    def create_and_record(*args):
+        created.append(create(*args))
+        return created[-1]
+
+    def fail(*args, **kwargs):
+        raise OSError("no processes")
+
+    monkeypatch.setattr(SharedTaamStream, "create", create_and_record)
+    monkeypatch.setattr(parallel_search, "ProcessPoolExecutor", fail)
+    with pytest.raises(OSError):
+        ParallelTaamSearch(books, workers=1)
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=created[0].name)
@@ -0,0 +1,54 @@
+from parsing import Book
+from parsing.progress import ParseReporter, ProfilingReporter
+
+BOOK_FILE_PATH = "data/cantillation/genesis.txt"
+
+
+def test_profiling_reporter():
+    reporter = ProfilingReporter()
+    book = Book.from_text_file(BOOK_FILE_PATH, reporter=reporter)
+
+    assert set(reporter.timings) == {
+        "classify_lines",
+        "tokenize_verses",
+        "metadata",
+        "extract_parshiot",
+    }
+    assert all(seconds >= 0 for seconds in reporter.timings.values())
+    assert reporter.counts["verses"] == 1533
+    assert reporter.counts["letters"] == sum(len(v.letters) for v in book.verses)
+    assert reporter.counts["taamim"] == sum(
+        len(letter.taamim) for v in book.verses for letter in v.letters
+    )
+    assert "verses: 1533" in reporter.summary()
+
+
+def test_profiling_reporter_lazy():
+    reporter = ProfilingReporter()
+    book = Book.from_text_file(BOOK_FILE_PATH, lazy=True, reporter=reporter)
+    assert reporter.counts["verses"] == 1533
+    assert "letters" not in reporter.counts
+    assert not book.verses[0].is_parsed
+
+
+def test_custom_reporter(capsys):
+    class VerseCounter(ParseReporter):
+        def __init__(self):
+            self.total, self.seen, self.finished = None, 0, False
+
+        def start(self, total_verses):
+            self.total = total_verses
+
+        def advance(self, verse):
+            self.seen += 1
+
+        def finish(self):
+            self.finished = True
+
+    reporter = VerseCounter()
+    Book.from_text_file(BOOK_FILE_PATH, reporter=reporter)
+    assert reporter.total == reporter.seen == 1533
+    assert reporter.finished
+    # nothing is written to stderr by default
+    Book.from_text_file(BOOK_FILE_PATH)
+    assert capsys.readouterr().err == ""
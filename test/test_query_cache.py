@@ -0,0 +1,161 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from parsing import Book, Verse
+from parsing.query_cache import (QUERY_CACHE, QueryCache, estimate_size,
+                                 normalize_sequence)
+
+
+@pytest.fixture(scope="module")
+def book(book):
+    # the shared book, with a cache of its own while these tests run
+    query_cache, book.query_cache = book.query_cache, QueryCache()
+    yield book
+    book.query_cache = query_cache
+
+
+def test_lru_eviction():
+    cache = QueryCache(max_bytes=3 * estimate_size([0] * 10))
+    for key in "abc":
+        cache.put(key, [0] * 10)
+    assert cache.get("a") is not None
+    cache.put("d", [0] * 10)
+    # "b" is the least recently used
+    assert "b" not in cache
+    assert all(key in cache for key in "acd")
+    assert cache.stats["evictions"] == 1
+    assert cache.size <= cache.max_bytes
+
+
+def test_results_larger_than_budget_are_not_cached():
+    cache = QueryCache(max_bytes=100)
+    assert cache.get_or_compute("key", lambda: np.zeros(1000)).shape == (1000,)
+    assert len(cache) == 0
+    assert cache.stats["misses"] == 1
+
+
+def test_get_or_compute_counts_hits():
+    cache = QueryCache()
+    calls = []
+    for _ in range(3):
+        assert cache.get_or_compute("key", lambda: calls.append(1) or "value") == "value"
+    assert len(calls) == 1
+    assert cache.stats["hits"] == 2
+    assert cache.stats["misses"] == 1
+    cache.clear()
+    assert len(cache) == 0 and cache.size == 0
+
+
+def test_normalize_sequence():
+    assert normalize_sequence(["maarikh", "tarha"]) == ("maarikh", "tarha")
+    assert normalize_sequence(["maarikh", "tarha"], False) == ("tarha",)
+
+
+def flatten(results):
+    return [
+        (parasha_name, verse, verse_result.word_idxs)
+        for parasha_name, parasha_results in results.items()
+        for aliyah_results in parasha_results
+        for verse, verse_result in aliyah_results
+    ]
+
+
+def test_book_queries_are_cached(book):
+    stats = book.query_cache.stats
+    results = book.find_verses_with_taam_sequence(["maarikh", "tarha"])
+    assert flatten(book.find_verses_with_taam_sequence(["maarikh", "tarha"])) == (
+        flatten(results)
+    )
+    assert book.query_cache.stats["hits"] == stats["hits"] + 1
+
+    # without Meshartim, the Meshartim of a sequence do not change the query
+    stats = book.query_cache.stats
+    results = book.find_verses_with_taam_sequence(["tarha"], False)
+    same_query = book.find_verses_with_taam_sequence(["maarikh", "tarha"], False)
+    assert flatten(same_query) == flatten(results)
+    assert book.query_cache.stats["hits"] == stats["hits"] + 1
+
+    stats = book.query_cache.stats
+    counts = book.count_n_taam_sequences(3)
+    assert book.count_n_taam_sequences(3) == counts
+    assert book.query_cache.stats["hits"] == stats["hits"] + 1
+    assert book.count_n_taam_sequences(3, False) != counts
+    assert book.count_n_taam_sequences(2) != counts
+
+    stats = book.query_cache.stats
+    batch = book.find_verses_with_taam_sequences([["maarikh", "tarha"], ["zarqa"]])
+    assert book.query_cache.stats["hits"] == stats["hits"] + 1
+    assert flatten(batch[0]) == flatten(
+        book.find_verses_with_taam_sequence(["maarikh", "tarha"])
+    )
+    assert flatten(batch[1]) == flatten(book.find_verses_with_taam_sequence(["zarqa"]))
+
+
+def test_cached_results_are_not_shared(book):
+    counts = book.count_n_taam_sequences(2)
+    expected = dict(counts)
+    counts.update(counts)
+    assert book.count_n_taam_sequences(2) == expected
+
+    results = book.find_verses_with_taam_sequence(["zarqa", "segolta"])
+    expected = flatten(results)
+    results.clear()
+    assert flatten(book.find_verses_with_taam_sequence(["zarqa", "segolta"])) == (
+        expected
+    )
+    results = book.find_verses_with_taam_sequence(["zarqa", "segolta"])
+    _, _, word_idxs = flatten(results)[0]
+    word_idxs[0].append(-1)
+    assert flatten(book.find_verses_with_taam_sequence(["zarqa", "segolta"])) == (
+        expected
+    )
+
+
+def test_books_with_the_same_contents_share_results(book, book_file_path):
+    other = Book.from_text_file(book_file_path)
+    other.query_cache = book.query_cache
+    assert other.version == book.version
+    expected = flatten(book.find_verses_with_taam_sequence(["maarikh", "tarha"]))
+    stats = book.query_cache.stats
+    results = other.find_verses_with_taam_sequence(["maarikh", "tarha"])
+    assert book.query_cache.stats["hits"] == stats["hits"] + 1
+    # the results refer to the verses of the Book they are asked of
+    assert [(name, verse.idx, idxs) for name, verse, idxs in flatten(results)] == [
+        (name, verse.idx, idxs) for name, verse, idxs in expected
+    ]
+    verses = {verse for _, verse, _ in flatten(results)}
+    assert verses <= set(other.verses)
+
+
+def test_cached_results_do_not_refer_to_verses(book):
+    book.find_verses_with_taam_sequence(["pazer_gadol"])
+    book.find_verses_with_taam_pattern("^ . pashta")
+
+    def values(value):
+        yield value
+        items = value.values() if isinstance(value, dict) else value
+        if isinstance(value, (dict, list, tuple)):
+            for item in items:
+                yield from values(item)
+
+    assert len(book.query_cache) > 0
+    for entry, _ in book.query_cache._entries.values():
+        assert not any(isinstance(value, Verse) for value in values(entry))
+
+
+def test_pickled_caches_are_empty():
+    cache = QueryCache(max_bytes=1000)
+    cache.put("key", [0] * 10)
+    unpickled = pickle.loads(pickle.dumps(cache))
+    assert len(unpickled) == 0 and unpickled.max_bytes == 1000
+    assert pickle.loads(pickle.dumps(QUERY_CACHE)) is QUERY_CACHE
+
+
+def test_uncached_book(book, book_file_path):
+    other = Book.from_text_file(book_file_path)
+    other.query_cache = None
+    first = other.count_n_taam_sequences(2)
+    assert other.count_n_taam_sequences(2) is not first
+    assert first == book.count_n_taam_sequences(2)
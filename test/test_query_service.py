@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+
+from parsing import Corpus
+from query_service import QueryError, QueryService, serve
+
+BOOK_NAMES = ["Genesis", "Exodus"]
+
+
+@pytest.fixture(scope="module")
+def service():
+    return QueryService(Corpus.load(BOOK_NAMES))
+
+
+def test_search_pages(service):
+    first = service.search({"sequence": "maarikh,tarha", "limit": "3"})
+    assert [hit["book"] for hit in first["hits"]] == ["Genesis"] * 3
+    assert first["hits"][0]["chapter"] == 1 and first["hits"][0]["verse"] == 1
+    second = service.search(
+        {"sequence": ["maarikh", "tarha"], "limit": 3, "cursor": first["next_cursor"]}
+    )
+    both = service.search({"sequence": ["maarikh", "tarha"], "limit": 6})
+    assert first["hits"] + second["hits"] == both["hits"]
+
+
+def test_count_and_distribution(service):
+    count = service.count({"sequence": ["maarikh", "tarha"]})["count"]
+    distribution = service.distribution({"sequence": ["maarikh", "tarha"]})
+    assert [name for name, _ in distribution["counts"]] == BOOK_NAMES
+    assert 0 < count == sum(n for _, n in distribution["counts"])
+    by_parasha = service.distribution(
+        {"sequence": "maarikh,tarha", "level": "parasha"}
+    )
+    assert sum(n for _, n in by_parasha["counts"]) == count
+
+
+def test_ngrams(service):
+    ngrams = service.ngrams({"n": "2", "top": "5", "meshartim": "false"})
+    counts = [ngram["count"] for ngram in ngrams["ngrams"]]
+    assert len(counts) == 5 and counts == sorted(counts, reverse=True)
+    assert ngrams["total"] >= sum(counts)
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {},
+        {"sequence": "not_a_taam"},
+        {"sequence": "maarikh", "meshartim": "false"},
+        {"sequence": "tarha", "meshartim": "maybe"},
+        {"sequence": "tarha", "limit": 0},
+    ],
+)
+def test_invalid_queries(service, params):
+    with pytest.raises(QueryError):
+        service.search(params)
+
+
+def test_batch_reports_errors_per_query(service):
+    results = service.batch(
+        {
+            "queries": [
+                {"endpoint": "/count", "sequence": ["tarha"]},
+                {"endpoint": "/nowhere"},
+                {"endpoint": "/count", "sequence": ["zarqa", "segolta"]},
+            ]
+        }
+    )["results"]
+    assert results[0]["result"] == service.count({"sequence": ["tarha"]})
+    assert "error" in results[1]
+    assert results[2]["result"] == service.count({"sequence": ["zarqa", "segolta"]})
+
+
+async def request(port, method, target, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    content = b"" if body is None else json.dumps(body).encode()
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(content)}\r\n\r\n".encode()
+        + content
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(payload)
+
+
+def test_http_service(service):
+    async def run():
+        server = await serve(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            responses = await asyncio.gather(
+                request(port, "GET", "/count?sequence=maarikh,tarha"),
+                request(port, "POST", "/count", {"sequence": ["maarikh", "tarha"]}),
+                request(port, "POST", "/batch", {"queries": []}),
+                request(port, "GET", "/batch"),
+                request(port, "GET", "/nowhere"),
+                request(port, "GET", "/search?sequence=nope"),
+            )
+        return responses
+
+    responses = asyncio.run(run())
+    count = service.count({"sequence": ["maarikh", "tarha"]})
+    assert responses[0] == (200, count)
+    assert responses[1] == (200, count)
+    assert responses[2] == (200, {"results": []})
+    assert [status for status, _ in responses[3:]] == [405, 404, 400]
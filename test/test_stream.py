@@ -0,0 +1,26 @@
+from collections import Counter
+
+from parsing import Book, iter_verses
+
+BOOK_FILE_PATH = "data/cantillation/genesis.txt"
+
+
+def test_iter_verses():
+    verses = iter_verses(BOOK_FILE_PATH)
+    chapter_idx, verse_idx, verse = next(verses)
+    assert (chapter_idx, verse_idx) == (1, 1)
+    assert len(verse.taam_words) == 7
+
+    chapter_idx, verse_idx, _ = next(verses)
+    assert (chapter_idx, verse_idx) == (1, 2)
+    verses.close()
+
+
+def test_iter_verses_taam_frequencies():
+    book = Book.from_text_file(BOOK_FILE_PATH)
+    counts, num_verses = Counter(), 0
+    for _, _, verse in iter_verses(BOOK_FILE_PATH):
+        counts.update(taam.name for taam in verse.taamim)
+        num_verses += 1
+    assert num_verses == 1533
+    assert counts == Counter(taam.name for taam in book.taamim)
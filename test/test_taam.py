@@ -1,3 +1,5 @@
+import pickle
+
 import pytest
 
 from parsing import Taam
@@ -34,3 +36,33 @@ def test_taam_equality():
 
     assert zq1 == zq2
     assert zq1 != zg
+
+
+def test_taam_interning():
+    zq1 = Taam.from_name("zaqef_qaton")
+    zq2 = Taam.from_symbol("֔")
+    assert zq1 is zq2
+    assert Taam.from_code(zq1.code) is zq1
+    assert len({zq1, zq2, Taam.from_name("zaqef_gadol")}) == 2
+
+
+def test_taam_is_immutable():
+    taam = Taam.from_name("qadma")
+    with pytest.raises(AttributeError):
+        taam.name = "azla"
+
+
+def test_taam_renamed():
+    qadma = Taam.from_name("qadma")
+    azla = qadma.renamed("azla")
+    assert azla.name == "azla"
+    assert azla.symbol == qadma.symbol
+    assert azla.code != qadma.code
+    assert qadma.renamed("azla") is azla
+    assert Taam.from_code(azla.code) is azla
+    assert qadma.name == "qadma"
+
+
+def test_taam_pickling():
+    taam = Taam.from_name("tevir")
+    assert pickle.loads(pickle.dumps(taam)) is taam
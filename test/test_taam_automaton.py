@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from parsing.symbols import TAAMIM_NAMES_TO_CODES
+from parsing.taam_automaton import TaamAutomaton
+
+
+def codes(*taam_names):
+    return [TAAMIM_NAMES_TO_CODES[taam_name] for taam_name in taam_names]
+
+
+def test_automaton_finds_overlapping_patterns(book):
+    stream = book.taam_stream
+    patterns = [
+        codes("maarikh", "tarha"),
+        codes("tarha"),
+        codes("tarha", "tarha"),
+        codes("darga", "tevir", "maarikh"),
+    ]
+    letters = np.arange(len(stream), dtype=np.int32)
+    for pattern, starts in zip(patterns, TaamAutomaton(patterns).scan(stream, letters)):
+        assert starts.tolist() == stream.occurrences(pattern).tolist()
+
+
+def test_automaton_without_meshartim(book):
+    stream = book.taam_stream
+    patterns = [codes("tarha", "atnah"), codes("pashta", "zaqef_qaton")]
+    letters = np.flatnonzero(~stream.has_mesharet).astype(np.int32)
+    for pattern, starts in zip(patterns, TaamAutomaton(patterns).scan(stream, letters)):
+        assert letters[starts].tolist() == stream.occurrences(pattern, False).tolist()
+
+
+@pytest.mark.parametrize("include_meshartim", [True, False])
+def test_find_verses_with_taam_sequences(book, include_meshartim):
+    taam_sequences = [
+        ["tarha", "tarha"],
+        ["maarikh", "tarha"],
+        ["maarikh", "tarha"],
+        ["shalshelet"],
+        ["qadma"],
+        ["not_a_taam"],
+        [],
+    ]
+    batch = book.find_verses_with_taam_sequences(taam_sequences, include_meshartim)
+    assert len(batch) == len(taam_sequences)
+    for taam_sequence, results in zip(taam_sequences, batch):
+        expected = book.find_verses_with_taam_sequence(taam_sequence, include_meshartim)
+        assert list(results) == list(expected)
+        for parasha_name, parasha_result in results.items():
+            assert [
+                [(verse, result.word_idxs) for verse, result in aliyah_result]
+                for aliyah_result in parasha_result
+            ] == [
+                [(verse, result.word_idxs) for verse, result in aliyah_result]
+                for aliyah_result in expected[parasha_name]
+            ]
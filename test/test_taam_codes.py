@@ -0,0 +1,50 @@
+from collections import Counter
+
+import numpy as np
+
+from parsing import Book, Taam
+from parsing.taam_codes import (NUM_TAAM_CODES, encode_taamim,
+                                frequencies_by_name, taam_frequencies,
+                                without_meshartim)
+
+BOOK_FILE_PATH = "data/cantillation/genesis.txt"
+
+
+def test_encode_taamim():
+    taamim = [Taam.from_name("maarikh"), Taam.from_name("tarha")]
+    codes = encode_taamim(taamim)
+    assert codes.dtype == np.uint8
+    assert codes.tolist() == [taam.code for taam in taamim]
+    assert not codes.flags.writeable
+    assert without_meshartim(codes).tolist() == [Taam.from_name("tarha").code]
+
+
+def test_taam_frequencies():
+    codes = encode_taamim(
+        [Taam.from_name("tarha"), Taam.from_name("atnah"), Taam.from_name("tarha")]
+    )
+    frequencies = taam_frequencies(codes)
+    assert len(frequencies) == NUM_TAAM_CODES
+    assert frequencies_by_name(frequencies) == {"tarha": 2, "atnah": 1}
+
+
+def test_container_taam_codes():
+    book = Book.from_text_file(BOOK_FILE_PATH)
+    assert book.taam_codes.tolist() == [taam.code for taam in book.taamim]
+    assert book.taam_codes is book.taam_codes
+
+    parasha = book.parshiot[0]
+    assert parasha.taam_codes_without_meshartim.tolist() == [
+        taam.code for verse in parasha.verses for taam in verse.taamim_without_meshartim
+    ]
+    aliyah = parasha.aliyot[1]
+    assert aliyah.taam_codes.tolist() == [
+        taam.code for verse in aliyah for taam in verse.taamim
+    ]
+
+    assert frequencies_by_name(book.taam_frequencies()) == Counter(
+        taam.name for taam in book.taamim
+    )
+    assert frequencies_by_name(book.taam_frequencies(include_meshartim=False)) == (
+        Counter(taam.name for taam in book.taamim_without_meshartim)
+    )
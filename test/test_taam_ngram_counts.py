@@ -0,0 +1,53 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from parsing.taam_ngram_counts import MAX_PACKED_LENGTH, TaamNGramCounts
+
+
+def count_windows(verses, n, include_meshartim):
+    counts = Counter()
+    for verse in verses:
+        taamim = verse.taamim if include_meshartim else verse.taamim_without_meshartim
+        for i in range(len(taamim) - n + 1):
+            counts[tuple(taam.name for taam in taamim[i : i + n])] += 1
+    return counts
+
+
+def test_windows_do_not_cross_verses():
+    counts = TaamNGramCounts.from_verse_codes(
+        [np.array([1, 2, 1], dtype=np.uint8), np.array([2, 1], dtype=np.uint8)], 2
+    )
+    assert counts.counts(1) == Counter({("atnah",): 3, ("sof_passuq",): 2})
+    assert counts.counts(2) == Counter(
+        {("atnah", "sof_passuq"): 1, ("sof_passuq", "atnah"): 2}
+    )
+    assert counts.counts(4) == Counter()
+    assert counts.count(["sof_passuq", "atnah"]) == 2
+    assert counts.count(["atnah", "atnah"]) == 0
+    assert counts.count(["not_a_taam"]) == 0
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 8, MAX_PACKED_LENGTH + 2])
+@pytest.mark.parametrize("include_meshartim", [True, False])
+def test_counts_match_windows(book, n, include_meshartim):
+    parasha = book.parshiot[0]
+    expected = count_windows(parasha.aliyot[0].verses, n, include_meshartim)
+    assert parasha.aliyot[0].count_n_taam_sequences(n, include_meshartim) == expected
+    expected = count_windows(
+        [verse for aliyah in parasha.aliyot for verse in aliyah.verses],
+        n,
+        include_meshartim,
+    )
+    assert parasha.count_n_taam_sequences(n, include_meshartim) == expected
+
+
+def test_book_counts_are_cached(book):
+    counts = book.taam_ngram_counts()
+    assert book.taam_ngram_counts() is counts
+    assert book.taam_ngram_counts(False) is not counts
+    assert book.count_n_taam_sequences(2) == count_windows(book.verses, 2, True)
+    rows, totals = counts.ngrams(3)
+    assert rows.shape == (len(totals), 3)
+    assert totals.sum() == sum(max(len(verse.taamim) - 2, 0) for verse in book.verses)
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from parsing.taam_ngrams import pack_positions, unpack_positions
+
+
+def letter_taam_names(verse):
+    return [
+        (word_idx, [taam.name for taam in letter.taamim])
+        for word_idx, word in enumerate(verse.taam_words)
+        for letter in word
+        if len(letter.taamim) > 0
+    ]
+
+
+def test_taam_stream(book):
+    stream = book.taam_stream
+    verse = book.verses[0]
+    letters = [
+        (word_idx, letter)
+        for word_idx, word in enumerate(verse.taam_words)
+        for letter in word
+        if len(letter.taamim) > 0
+    ]
+    assert stream.verse_offsets[1] == len(letters)
+    assert stream.words[: len(letters)].tolist() == [w for w, _ in letters]
+    assert stream.verses[: len(letters)].tolist() == [0] * len(letters)
+
+
+def test_pack_positions():
+    verses, words = np.array([0, 7, 1532]), np.array([3, 0, 41])
+    unpacked = unpack_positions(pack_positions(verses, words))
+    assert unpacked[0].tolist() == verses.tolist()
+    assert unpacked[1].tolist() == words.tolist()
+
+
+def test_ngram_positions(book):
+    index = book.taam_ngram_index
+    expected = set()
+    for ordinal, verse in enumerate(book.verses):
+        letters = letter_taam_names(verse)
+        for (word_idx, first), (_, second) in zip(letters, letters[1:]):
+            if "zarqa" in first and "segolta" in second:
+                expected.add((ordinal, word_idx))
+    verses, words = unpack_positions(index.positions(["zarqa", "segolta"]))
+    assert list(zip(verses.tolist(), words.tolist())) == sorted(expected)
+
+
+def test_long_sequence(book):
+    # the taamim of a whole verse are longer than the longest indexed n-gram
+    verse = book.verses[6]
+    taam_sequence = [names[0] for _, names in letter_taam_names(verse)]
+    assert len(taam_sequence) > book.taam_ngram_index.max_n
+    matches = book.taam_ngram_index.find(taam_sequence)
+    assert 6 in matches
+    assert matches[6] == verse.find_taam_sequence(taam_sequence).word_idxs
+
+
+@pytest.mark.parametrize(
+    "taam_sequence",
+    [["maarikh", "tarha"], ["tarha", "tarha"], ["darga", "tevir"], ["qadma"]],
+)
+@pytest.mark.parametrize("include_meshartim", [True, False])
+def test_find_matches_verses(book, taam_sequence, include_meshartim):
+    matches = book.taam_ngram_index.find(taam_sequence, include_meshartim)
+    expected = {}
+    for ordinal, verse in enumerate(book.verses):
+        word_idxs = verse.find_taam_sequence(taam_sequence, include_meshartim).word_idxs
+        if word_idxs:
+            expected[ordinal] = word_idxs
+    if not include_meshartim and taam_sequence == ["qadma"]:
+        assert matches is None
+    else:
+        assert matches == expected
+
+
+@pytest.mark.parametrize(
+    "taam_sequence", [["shalshelet"], ["maarikh", "tarha"], ["azla", "gerish"]]
+)
+@pytest.mark.parametrize("include_meshartim", [True, False])
+def test_indexed_search_matches_full_scan(book, taam_sequence, include_meshartim):
+    results = book.find_verses_with_taam_sequence(taam_sequence, include_meshartim)
+    for parasha in book.parshiot:
+        expected = parasha.find_verses_with_taam_sequence(
+            taam_sequence, include_meshartim
+        )
+        assert [
+            [(verse, result.word_idxs) for verse, result in aliyah_result]
+            for aliyah_result in results[parasha.name]
+        ] == [
+            [(verse, result.word_idxs) for verse, result in aliyah_result]
+            for aliyah_result in expected
+        ]
@@ -0,0 +1,67 @@
+import pytest
+
+from parsing.taam_pages import paginate
+
+
+def flatten(results):
+    return [
+        (parasha_name, verse, verse_result.word_idxs)
+        for parasha_name, parasha_results in results.items()
+        for aliyah_results in parasha_results
+        for verse, verse_result in aliyah_results
+    ]
+
+
+@pytest.mark.parametrize(
+    "taam_sequence",
+    # without Meshartim, ["maarikh"] is empty and every verse is searched
+    [["maarikh", "tarha"], ["zarqa", "segolta"], ["not_a_taam"], ["maarikh"]],
+)
+@pytest.mark.parametrize("include_meshartim", [True, False])
+def test_hits_are_in_canonical_order(book, taam_sequence, include_meshartim):
+    expected = flatten(
+        book.find_verses_with_taam_sequence(taam_sequence, include_meshartim)
+    )
+    hits = book.iter_verses_with_taam_sequence(taam_sequence, include_meshartim)
+    assert [(hit.parasha, hit.verse, hit.word_idxs) for hit in hits] == expected
+
+
+def test_hits_know_their_aliyah(book):
+    for hit in book.iter_verses_with_taam_sequence(["pazer_gadol"]):
+        parasha = next(p for p in book.parshiot if p.name == hit.parasha)
+        aliyah = parasha.aliyot[hit.aliyah]
+        assert hit.verse in aliyah.verses
+        assert hit.result.verse is hit.verse
+
+
+def test_pages_resume_from_cursor(book):
+    taam_sequence = ["maarikh", "tarha"]
+    hits = list(book.iter_verses_with_taam_sequence(taam_sequence))
+    paged, cursor = [], 0
+    while cursor is not None:
+        page = book.page_verses_with_taam_sequence(
+            taam_sequence, limit=50, cursor=cursor
+        )
+        assert 0 < len(page) <= 50
+        paged.extend(page)
+        cursor = page.next_cursor
+    assert [hit.ordinal for hit in paged] == [hit.ordinal for hit in hits]
+
+    page = book.page_verses_with_taam_sequence(taam_sequence, limit=5, offset=10)
+    assert [hit.ordinal for hit in page] == [hit.ordinal for hit in hits[10:15]]
+    assert page.next_cursor == hits[15].ordinal
+
+
+def test_paginate_stops_early():
+    consumed = []
+
+    def hits():
+        for ordinal in range(100):
+            consumed.append(ordinal)
+            yield type("Hit", (), {"ordinal": ordinal})()
+
+    page = paginate(hits(), limit=3, offset=2)
+    assert [hit.ordinal for hit in page] == [2, 3, 4]
+    assert page.next_cursor == 5
+    assert consumed == list(range(6))
+    assert paginate(iter([]), limit=3).next_cursor is None
@@ -0,0 +1,104 @@
+import pytest
+
+from parsing.symbols import TAAMIM_NAMES_TO_CODES
+from parsing.taam_pattern import TaamPattern, compile_taam_pattern
+
+ATNAH = TAAMIM_NAMES_TO_CODES["atnah"]
+
+
+def verse_taamim(stream, ordinal, include_meshartim=True):
+    start, stop = stream.verse_offsets[ordinal], stream.verse_offsets[ordinal + 1]
+    return [
+        (stream.letter_codes[position], int(stream.words[position]))
+        for position in range(start, stop)
+        if include_meshartim or not stream.has_mesharet[position]
+    ]
+
+
+def test_compile_is_cached():
+    assert compile_taam_pattern("tevir") is compile_taam_pattern("tevir")
+
+
+@pytest.mark.parametrize(
+    "pattern", ["", "tevir?", "not_a_taam", "{tevir|not_a_taam}", "(tevir", "tevir)"]
+)
+def test_invalid_patterns(pattern):
+    with pytest.raises(AssertionError):
+        TaamPattern(pattern)
+
+
+@pytest.mark.parametrize(
+    "taam_sequence",
+    [["tevir"], ["qadma", "azla"], ["maarikh", "tarha", "atnah"], ["shalshelet"]],
+)
+def test_plain_pattern_matches_sequence(book, taam_sequence):
+    # without overlapping or repeated taamim, both searches find the same verses
+    pattern_results = book.find_verses_with_taam_pattern(" ".join(taam_sequence))
+    sequence_results = book.find_verses_with_taam_sequence(taam_sequence)
+    assert {
+        name: [[verse for verse, _ in aliyah] for aliyah in parasha]
+        for name, parasha in pattern_results.items()
+    } == {
+        name: [[verse for verse, _ in aliyah] for aliyah in parasha]
+        for name, parasha in sequence_results.items()
+    }
+
+
+def test_anchors(book):
+    stream = book.taam_stream
+    first = compile_taam_pattern("^ .").find(stream)
+    last = compile_taam_pattern("sof_passuq $").find(stream)
+    after_atnah = compile_taam_pattern("atnah @ .").find(stream)
+    assert len(first) == len(last) == stream.num_verses
+    for ordinal in range(stream.num_verses):
+        taamim = verse_taamim(stream, ordinal)
+        assert first[ordinal] == [[taamim[0][1]]]
+        assert last[ordinal] == [[taamim[-1][1]]]
+        atnah = [i for i, (codes, _) in enumerate(taamim) if ATNAH in codes]
+        assert (ordinal in after_atnah) == any(i + 1 < len(taamim) for i in atnah)
+
+
+def test_sets_and_repeats(book):
+    stream = book.taam_stream
+
+    def verses(pattern):
+        return set(compile_taam_pattern(pattern).find(stream))
+
+    def occurrence_verses(*taam_names):
+        codes = [TAAMIM_NAMES_TO_CODES[taam_name] for taam_name in taam_names]
+        return set(stream.verses[stream.occurrences(codes)].tolist())
+
+    assert verses("{tevir|tarha}") == verses("tevir") | verses("tarha")
+    assert verses("darga{1,2} tevir") == occurrence_verses("darga", "tevir")
+    assert verses("maarikh? tarha") == occurrence_verses("tarha")
+    assert verses("(pashta zaqef_qaton){2}") == occurrence_verses(
+        "pashta", "zaqef_qaton", "pashta", "zaqef_qaton"
+    )
+    matches = compile_taam_pattern("darga{1,2} tevir").find(stream)
+    assert all(len(words) <= 3 for seqs in matches.values() for words in seqs)
+
+
+def test_without_meshartim(book):
+    stream = book.taam_stream
+    assert compile_taam_pattern("maarikh tarha").find(stream, False) == {}
+    assert compile_taam_pattern("tarha atnah").find(stream, False).keys() >= (
+        compile_taam_pattern("tarha atnah").find(stream).keys()
+    )
+
+
+def test_matches_only_start_where_they_can(book):
+    stream = book.taam_stream
+    pattern = TaamPattern(". tarha")
+    matches = pattern.match_verse(stream, 0)
+    taamim = verse_taamim(stream, 0)
+    tarha = TAAMIM_NAMES_TO_CODES["tarha"]
+    expected = [
+        sorted({taamim[i - 1][1], taamim[i][1]})
+        for i in range(1, len(taamim))
+        if tarha in taamim[i][0]
+    ]
+    assert matches == expected
+    # a verse without a match is only scanned backwards
+    pattern = TaamPattern("shalshelet")
+    assert pattern.match_verse(stream, 0) == []
+    assert len(pattern._transitions) == 0
@@ -0,0 +1,100 @@
+import pytest
+
+from parsing import TaamSearchEngine, load_books
+from parsing.book import BookTaamSequenceResult
+from parsing.symbols import TAAMIM_NAMES_TO_CODES
+from parsing.taam_stream import TaamStream
+
+
+@pytest.fixture(scope="module")
+def books():
+    return load_books(["Genesis", "Exodus"])
+
+
+@pytest.fixture(scope="module")
+def engine(books):
+    return TaamSearchEngine(books)
+
+
+def test_concatenated_stream(books, engine):
+    genesis, exodus = books
+    stream = engine.stream
+    assert stream.num_verses == len(genesis.verses) + len(exodus.verses)
+    assert len(stream) == len(genesis.taam_stream) + len(exodus.taam_stream)
+    first = len(genesis.verses)
+    assert stream.verse_offsets[first] == len(genesis.taam_stream)
+    assert stream.verses[len(genesis.taam_stream)] == first
+    assert stream.resume[len(genesis.taam_stream)] == len(genesis.taam_stream) + int(
+        exodus.taam_stream.resume[0]
+    )
+
+
+def test_occurrences(books):
+    stream = books[0].taam_stream
+    codes = [TAAMIM_NAMES_TO_CODES["darga"], TAAMIM_NAMES_TO_CODES["tevir"]]
+    expected = [
+        i
+        for i in range(len(stream) - 1)
+        if stream.verses[i] == stream.verses[i + 1]
+        and codes[0] in stream.letter_codes[i]
+        and codes[1] in stream.letter_codes[i + 1]
+    ]
+    assert stream.occurrences(codes).tolist() == expected
+
+
+@pytest.mark.parametrize(
+    "taam_sequence",
+    [["maarikh", "tarha"], ["tarha", "tarha"], ["shalshelet"], ["darga", "tevir"], []],
+)
+@pytest.mark.parametrize("include_meshartim", [True, False])
+def test_engine_matches_books(books, engine, taam_sequence, include_meshartim):
+    results = engine.find_verses_with_taam_sequence(taam_sequence, include_meshartim)
+    assert list(results) == ["Genesis", "Exodus"]
+    for book in books:
+        assert isinstance(results[book.name], BookTaamSequenceResult)
+        for parasha in book.parshiot:
+            expected = parasha.find_verses_with_taam_sequence(
+                taam_sequence, include_meshartim
+            )
+            assert [
+                [(verse, result.word_idxs) for verse, result in aliyah_result]
+                for aliyah_result in results[book.name].parasha_results[parasha.name]
+            ] == [
+                [(verse, result.word_idxs) for verse, result in aliyah_result]
+                for aliyah_result in expected
+            ]
+
+
+def test_match_verses_single_stream(books):
+    stream = TaamStream.from_verses(books[0].verses[:7])
+    codes = [TAAMIM_NAMES_TO_CODES["maarikh"], TAAMIM_NAMES_TO_CODES["tarha"]]
+    matches = stream.match_verses(range(7), codes)
+    for ordinal, verse in enumerate(books[0].verses[:7]):
+        word_idxs = verse.find_taam_sequence(["maarikh", "tarha"]).word_idxs
+        assert matches.get(ordinal, []) == word_idxs
+
+
+@pytest.mark.parametrize("pattern", ["^ . {tevir|tarha}?", "darga{1,2} tevir", "@ ."])
+def test_engine_patterns_match_books(books, engine, pattern):
+    results = engine.find_verses_with_taam_pattern(pattern)
+    for book in books:
+        expected = book.find_verses_with_taam_pattern(pattern)
+        assert {
+            name: [[(verse, result.word_idxs) for verse, result in a] for a in p]
+            for name, p in results[book.name].parasha_results.items()
+        } == {
+            name: [[(verse, result.word_idxs) for verse, result in a] for a in p]
+            for name, p in expected.items()
+        }
+
+
+def test_engine_suffix_array(books, engine):
+    suffix_array = engine.suffix_array()
+    assert engine.suffix_array() is suffix_array
+    assert len(suffix_array.verse_offsets) == len(engine.verses) + 1
+    verses, _ = suffix_array.positions(["shalshelet"])
+    assert set(verses.tolist()) == set(
+        ordinal
+        for ordinal, verse in enumerate(engine.verses)
+        if any(taam.name == "shalshelet" for taam in verse.taamim)
+    )
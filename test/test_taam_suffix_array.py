@@ -0,0 +1,87 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from parsing.symbols import TAAMIM_CODES_TO_NAMES
+from parsing.taam_suffix_array import TaamSuffixArray
+
+
+@pytest.fixture(scope="module", params=[True, False])
+def include_meshartim(request):
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def suffix_array(book, include_meshartim):
+    return TaamSuffixArray.from_verses(book.verses, include_meshartim)
+
+
+def verse_names(verse, include_meshartim):
+    codes = verse.taam_codes if include_meshartim else verse.taam_codes_without_meshartim
+    return [TAAMIM_CODES_TO_NAMES[code] for code in codes.tolist()]
+
+
+def count_ngrams(book, n, include_meshartim):
+    counts = Counter()
+    for verse in book.verses:
+        names = verse_names(verse, include_meshartim)
+        counts.update(tuple(names[i : i + n]) for i in range(len(names) - n + 1))
+    return counts
+
+
+def test_suffixes_are_sorted(suffix_array):
+    data = suffix_array.text.tobytes()
+    suffixes = suffix_array.suffixes.tolist()
+    assert sorted(suffixes) == list(range(len(suffix_array)))
+    assert all(data[a:] < data[b:] for a, b in zip(suffixes[:50], suffixes[1:51]))
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 6])
+def test_count(book, suffix_array, include_meshartim, n):
+    expected = count_ngrams(book, n, include_meshartim)
+    for taam_sequence, count in expected.items():
+        assert suffix_array.count(list(taam_sequence)) == count
+    assert suffix_array.count(["not_a_taam"]) == 0
+
+
+def test_positions(book, suffix_array, include_meshartim):
+    taam_sequence = ["pashta", "zaqef_qaton"]
+    verses, starts = suffix_array.positions(taam_sequence)
+    expected = [
+        (ordinal, i)
+        for ordinal, verse in enumerate(book.verses)
+        for i, names in enumerate(
+            zip(*[verse_names(verse, include_meshartim)[j:] for j in range(2)])
+        )
+        if list(names) == taam_sequence
+    ]
+    assert list(zip(verses.tolist(), starts.tolist())) == expected
+
+
+@pytest.mark.parametrize("n", [2, 4])
+def test_frequent_sequences(book, suffix_array, include_meshartim, n):
+    expected = {
+        taam_sequence: count
+        for taam_sequence, count in count_ngrams(book, n, include_meshartim).items()
+        if count >= 3
+    }
+    assert suffix_array.frequent_sequences(3, n, n) == expected
+
+
+def test_longest_repeated_sequences(book, suffix_array):
+    longest = suffix_array.longest_repeated_sequences()
+    assert len(longest) > 0
+    length = len(longest[0])
+    assert all(suffix_array.count(list(seq)) >= 2 for seq in longest)
+    assert suffix_array.frequent_sequences(2, length + 1) == {}
+    assert set(suffix_array.frequent_sequences(2, length)) == set(longest)
+
+
+def test_save_and_load(suffix_array, tmp_path):
+    path = str(tmp_path / "taamim.npz")
+    suffix_array.save(path)
+    loaded = TaamSuffixArray.load(path)
+    assert np.array_equal(loaded.suffixes, suffix_array.suffixes)
+    assert np.array_equal(loaded.lcp, suffix_array.lcp)
+    assert loaded.count(["tevir"]) == suffix_array.count(["tevir"])
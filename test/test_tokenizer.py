@@ -0,0 +1,21 @@
+from parsing import Letter, Niqud, Taam
+from parsing.tokenizer import tokenize_word
+
+
+def test_tokenize_word():
+    letters = tokenize_word("בְּרֵאשִׁ֖ית")
+    assert "".join(letter.letter for letter in letters) == "בראשית"
+    assert letters[0].nequdot == [Niqud.from_name("sheva"), Niqud.from_name("dagesh")]
+    assert letters[3].taamim == [Taam.from_name("tarha")]
+    assert letters[3].nequdot == [Niqud.from_name("hiriq"), Niqud.from_name("shin_dot")]
+
+
+def test_tokenize_word_matches_letter_from_string():
+    assert repr(tokenize_word("שִׁ֖")) == repr([Letter.from_string("שִׁ֖")])
+
+
+def test_tokenize_word_skips_leading_marks():
+    letters = tokenize_word("׃‫אָ")
+    assert len(letters) == 1
+    assert letters[0].nequdot == [Niqud.from_name("qamats")]
+    assert tokenize_word("׃1") == []
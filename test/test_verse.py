@@ -78,6 +78,15 @@ def test_find_taam_sequence_with_maqaf():
     ).word_idxs == [[7, 8]]
 
 
+def test_count_and_has_taam_sequence():
+    verse = Verse.from_string(0, "בְּרֵאשִׁ֖ית בָּרָ֣א אֱלֹהִ֑ים אֵ֥ת הַשָּׁמַ֖יִם וְאֵ֥ת הָאָֽרֶץ׃")
+    assert verse.count_taam_sequence(["tarha"], include_meshartim=False) == 2
+    assert verse.count_taam_sequence(["maarikh", "tarha"]) == 1
+    assert verse.has_taam_sequence(["tarha", "atnah", "tarha"], include_meshartim=False)
+    assert verse.count_taam_sequence(["tarha", "atnah", "tarha"]) == 0
+    assert not verse.has_taam_sequence(["tarha", "atnah", "tarha"])
+
+
 def test_count_taam():
     verse = Verse.from_string(0, "בְּרֵאשִׁ֖ית בָּרָ֣א אֱלֹהִ֑ים אֵ֥ת הַשָּׁמַ֖יִם וְאֵ֥ת הָאָֽרֶץ׃")
     assert verse.count_taam("tarha") == 2
@@ -92,3 +101,20 @@ def test_word_getters():
         print(word)
     assert len(verse.taam_words) == 11
     assert len(verse.words) == 13
+
+
+def test_word_views_are_memoized():
+    verse = Verse.from_string(
+        0, "וַיִּקְרָ֨א אֱלֹהִ֤ים ׀ לָאוֹר֙ י֔וֹם וְלַחֹ֖שֶׁךְ קָ֣רָא לָ֑יְלָה וַֽיְהִי־עֶ֥רֶב וַֽיְהִי־בֹ֖קֶר י֥וֹם אֶחָֽד׃"
+    )
+    assert verse.taam_words is verse.taam_words
+    assert verse.words is verse.words
+
+
+def test_taam_words_with_note_after_maqaf():
+    # Deuteronomy 29:19 has a "[c]" note between a maqaf and the next word
+    verse = Verse.from_string(0, "וְרָ֤בְצָה־‪[c]‬ בּוֹ֙ כָּל־הָ֣אָלָ֔ה")
+    assert [str(word) for word in verse.taam_words] == [
+        "וְרָ֤בְצָה־בּוֹ֙",
+        "כָּל־הָ֣אָלָ֔ה",
+    ]
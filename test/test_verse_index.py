@@ -0,0 +1,29 @@
+from parsing.verse_index import VerseRange
+
+
+def test_verse_index(book):
+    index = book.verse_index
+    assert len(index) == 1533
+    assert index.ordinal(1, 1) == 0
+    assert index.ordinal(2, 1) == 31
+    assert index.verses[index.ordinal(12, 13)] is book.chapters[11].verses[12]
+
+    verses = index.range((1, 30), (2, 2))
+    assert (verses.start, verses.stop) == (29, 33)
+    # the ends of a range do not need to exist
+    assert len(index.range((1, 30), (1, 99))) == 2
+    assert len(index.range((3, 1), (2, 1))) == 0
+
+
+def test_aliyot_are_ranges(book):
+    lech_lecha = book.parshiot[2]
+    first_aliyah = lech_lecha.aliyot[0]
+    assert isinstance(first_aliyah.verses, VerseRange)
+    assert first_aliyah.start == book.verse_index.ordinal(12, 1)
+    assert first_aliyah.stop == book.verse_index.ordinal(12, 13) + 1
+    assert list(first_aliyah) == book.verses[first_aliyah.start : first_aliyah.stop]
+    assert first_aliyah.verses[-1] is book.chapters[11].verses[12]
+
+    assert lech_lecha.verses.start == first_aliyah.start
+    assert lech_lecha.verses.stop == lech_lecha.aliyot[-1].stop
+    assert len(lech_lecha.verses) == len(lech_lecha)